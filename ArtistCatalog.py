@@ -0,0 +1,145 @@
+# Needed for establishing a connection to the Redis database
+from db_config import getRedisConnection
+
+class ArtistCatalog:
+
+    """
+    CLASS ABSTRACT: ArtistCatalog
+
+    DESCRIPTION:
+        This class reads the artists to ingest from a text file (one name per line) or from a Redis set.
+        Names are yielded one at a time, so catalogs of any size can be streamed straight into the
+        ingest pipeline. Blank lines, # comments and repeated names are skipped.
+    """
+
+    def __init__(self, redis_connection = None):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type ArtistCatalog.
+
+        ARGS:
+            self - the class object
+            redis_connection - optional Redis connection for Redis set catalogs (defaults to a connection from the shared pool, created when first needed)
+
+        RETURNS: None
+        """
+
+        self.__redis_connection = redis_connection
+
+    def __getRedisConnection(self):
+
+        """
+        FUNCTION ABSTRACT: __getRedisConnection()
+
+        DESCRIPTION: This function returns the Redis connection, connecting on first use (so that file catalogs never touch Redis).
+
+        ARGS: self - the class object
+
+        RETURNS: redis_connection - the Redis connection
+        """
+
+        if (self.__redis_connection == None):
+
+            self.__redis_connection = getRedisConnection()
+
+        return self.__redis_connection
+
+    def readFile(self, path):
+
+        """
+        FUNCTION ABSTRACT: readFile()
+
+        DESCRIPTION: This function yields the artist names listed in a text file, one per line.
+
+        ARGS:
+            self - the class object
+            path - path of the text file (UTF-8)
+
+        RETURNS: artist_names - generator of artist names
+        """
+
+        # Define the set of names already yielded
+        seen_names = set()
+
+        with open(path, "r", encoding = "utf-8") as file:
+
+            for line in file:
+
+                artist_name = line.strip()
+
+                # Skip blank lines, comments and repeated names
+                if ((artist_name == "") or (artist_name.startswith("#") == True) or (artist_name in seen_names)):
+
+                    continue
+
+                seen_names.add(artist_name)
+
+                yield artist_name
+
+    def readRedisSet(self, key, batch_size = 1000):
+
+        """
+        FUNCTION ABSTRACT: readRedisSet()
+
+        DESCRIPTION: This function yields the artist names stored in a Redis set, walking it with a cursor-based SSCAN (batch_size names per round trip).
+
+        ARGS:
+            self - the class object
+            key - key of the Redis set
+            batch_size - SSCAN COUNT hint
+
+        RETURNS: artist_names - generator of artist names
+        """
+
+        # Define the set of names already yielded (SSCAN may return a name more than once while the set is being changed)
+        seen_names = set()
+
+        for artist_name in self.__getRedisConnection().sscan_iter(key, count = batch_size):
+
+            if (artist_name in seen_names):
+
+                continue
+
+            seen_names.add(artist_name)
+
+            yield artist_name
+
+    def storeRedisSet(self, key, artist_names, batch_size = 1000):
+
+        """
+        FUNCTION ABSTRACT: storeRedisSet()
+
+        DESCRIPTION: This function adds artist names to a Redis set, batch_size names per round trip.
+
+        ARGS:
+            self - the class object
+            key - key of the Redis set
+            artist_names - iterable of artist names
+            batch_size - number of names added per round trip
+
+        RETURNS: added_count - the number of names that were not in the set yet
+        """
+
+        # Define a counter for the number of added names, and the batch of names being collected
+        added_count = 0
+        batch = []
+
+        for artist_name in artist_names:
+
+            batch.append(artist_name)
+
+            # If the batch is full, add it to the set
+            if (len(batch) >= batch_size):
+
+                added_count = added_count + self.__getRedisConnection().sadd(key, *batch)
+
+                batch = []
+
+        # Add whatever is left over in the last, partially filled batch
+        if (len(batch) > 0):
+
+            added_count = added_count + self.__getRedisConnection().sadd(key, *batch)
+
+        return added_count
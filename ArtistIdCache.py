@@ -0,0 +1,194 @@
+# Needed for establishing a connection to the Redis database
+from db_config import getRedisConnection
+
+# Needed for the in-memory least-recently-used cache
+from collections import OrderedDict
+
+# Needed for sharing the cache safely between worker threads
+import threading
+
+class ArtistIdCache:
+
+    """
+    CLASS ABSTRACT: ArtistIdCache
+
+    DESCRIPTION:
+        This class caches the Spotify ID resolved for each artist name, so that repeated runs can skip the
+        /v1/search request. Names are looked up in a small in-memory least-recently-used cache first and in
+        the Redis database second, where entries expire after a time-to-live.
+    """
+
+    def __init__(self, redis_connection = None, ttl = 604800, lru_size = 10000):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type ArtistIdCache.
+
+        ARGS:
+            self - the class object
+            redis_connection - Redis connection to cache IDs in (defaults to a connection from the shared pool, see getRedisConnection())
+            ttl - number of seconds an artist ID stays cached in the Redis database (defaults to one week)
+            lru_size - maximum number of artist IDs kept in the in-memory cache
+
+        RETURNS: None
+        """
+
+        # Initialize the Redis database connection
+        self.__redis_connection = redis_connection if redis_connection != None else getRedisConnection()
+
+        self.__ttl = ttl
+        self.__lru_size = lru_size
+
+        # Define the in-memory cache (ordered from least to most recently used) and the lock that guards it
+        self.__lru = OrderedDict()
+        self.__lock = threading.Lock()
+
+        # Define the counters exposed through getStatistics()
+        self.__statistics = {"memory_hits": 0, "redis_hits": 0, "misses": 0}
+
+    def formatKey(self, artist_name):
+
+        """
+        FUNCTION ABSTRACT: formatKey()
+
+        DESCRIPTION: This function returns the cache key for an artist name (Spotify search ignores case and surrounding spaces, so the key does too).
+
+        ARGS:
+            self - the class object
+            artist_name - name of the artist
+
+        RETURNS: formatted_key - the cache key for the artist name
+        """
+
+        # Versioned, so that IDs cached before search queries were URL-encoded (wrong for names containing &, + or #) are never read
+        return f"artist_id:v2:{artist_name.strip().casefold()}"
+
+    def __remember(self, key, artist_id):
+
+        """
+        FUNCTION ABSTRACT: __remember()
+
+        DESCRIPTION: This function stores an artist ID in the in-memory cache, evicting the least recently used entry when the cache is full.
+
+        ARGS:
+            self - the class object
+            key - the cache key for the artist name
+            artist_id - Spotify ID of the artist
+
+        RETURNS: None
+        """
+
+        with self.__lock:
+
+            self.__lru[key] = artist_id
+            self.__lru.move_to_end(key)
+
+            # If the cache grew past its limit, evict the least recently used entry
+            if (len(self.__lru) > self.__lru_size):
+
+                self.__lru.popitem(last = False)
+
+    def get(self, artist_name):
+
+        """
+        FUNCTION ABSTRACT: get()
+
+        DESCRIPTION: This function looks up the cached Spotify ID for an artist name.
+
+        ARGS:
+            self - the class object
+            artist_name - name of the artist
+
+        RETURNS: artist_id - Spotify ID of the artist (or None if the name is not cached)
+        """
+
+        # Format the cache key for this artist name
+        key = self.formatKey(artist_name)
+
+        # Check the in-memory cache first
+        with self.__lock:
+
+            if (key in self.__lru):
+
+                self.__lru.move_to_end(key)
+                self.__statistics["memory_hits"] = self.__statistics["memory_hits"] + 1
+
+                return self.__lru[key]
+
+        try:
+
+            # Check the Redis database second
+            artist_id = self.__redis_connection.get(key)
+
+        except Exception as error:
+
+            # An unreachable cache only costs a search request. Output an error message and treat it as a miss.
+            print(f"ERROR: Could not read the artist ID cache: {error}")
+
+            artist_id = None
+
+        # If the Redis database did not have the artist name either, record the miss
+        if (artist_id == None):
+
+            with self.__lock:
+
+                self.__statistics["misses"] = self.__statistics["misses"] + 1
+
+            return None
+
+        # Keep the ID in memory for the rest of this run
+        self.__remember(key, artist_id)
+
+        with self.__lock:
+
+            self.__statistics["redis_hits"] = self.__statistics["redis_hits"] + 1
+
+        return artist_id
+
+    def set(self, artist_name, artist_id):
+
+        """
+        FUNCTION ABSTRACT: set()
+
+        DESCRIPTION: This function caches the Spotify ID for an artist name in memory and in the Redis database.
+
+        ARGS:
+            self - the class object
+            artist_name - name of the artist
+            artist_id - Spotify ID of the artist
+
+        RETURNS: None
+        """
+
+        # Format the cache key for this artist name
+        key = self.formatKey(artist_name)
+
+        # Keep the ID in memory
+        self.__remember(key, artist_id)
+
+        try:
+
+            # Store the ID in the Redis database, letting Redis expire it after the time-to-live
+            self.__redis_connection.set(key, artist_id, ex = self.__ttl)
+
+        except Exception as error:
+
+            # An unreachable cache only costs a search request next run. Output an error message and continue.
+            print(f"ERROR: Could not write the artist ID cache: {error}")
+
+    def getStatistics(self):
+
+        """
+        FUNCTION ABSTRACT: getStatistics()
+
+        DESCRIPTION: This function returns a snapshot of the cache counters.
+
+        ARGS: self - the class object
+
+        RETURNS: statistics - Python dictionary with the memory_hits, redis_hits and misses counts
+        """
+
+        with self.__lock:
+
+            return dict(self.__statistics)
@@ -0,0 +1,225 @@
+# Needed for creating the output directory and building file names
+import os
+
+# Needed for turning artist names into safe file names
+import re
+
+# Needed for rendering charts in parallel across processes
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Needed for selecting the non-interactive backend and closing rendered figures
+import matplotlib
+
+class ChartRenderer:
+
+    """
+    CLASS ABSTRACT: ChartRenderer
+
+    DESCRIPTION:
+        This class renders the analysis charts to image files instead of displaying them, so it can run on
+        hosts without a display. It uses matplotlib's non-interactive Agg backend, and independent charts
+        (the three analyses, plus one popularity distribution per artist) are rendered in parallel on a pool
+        of worker processes. The dataframe and results are sent to each worker once, not once per chart.
+    """
+
+    # Define the TrackPlotter each worker process renders with (set by initializeWorker() in every worker)
+    worker_plotter = None
+
+    def __init__(self, track_dataframe, results, output_dir = "charts", formats = ("png",), processes = None):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type ChartRenderer.
+
+        ARGS:
+            self - the class object
+            track_dataframe - the track dataframe the results were computed from
+            results - TrackAnalysisResults returned by TrackAnalyzer
+            output_dir - directory the chart files are written to
+            formats - file formats to write each chart in (e.g. ("png", "svg"))
+            processes - number of worker processes (None = one per CPU, 1 = render in this process)
+
+        RETURNS: None
+        """
+
+        self.__track_dataframe = track_dataframe
+        self.__results = results
+        self.__output_dir = output_dir
+        self.__formats = formats
+        self.__processes = processes if processes != None else (os.cpu_count() or 1)
+
+    @staticmethod
+    def initializeWorker(track_dataframe, results):
+
+        """
+        FUNCTION ABSTRACT: initializeWorker()
+
+        DESCRIPTION: This function prepares a worker process: it selects the non-interactive backend and creates the worker's TrackPlotter.
+
+        ARGS:
+            track_dataframe - the track dataframe the results were computed from
+            results - TrackAnalysisResults returned by TrackAnalyzer
+
+        RETURNS: None
+        """
+
+        # Select the non-interactive backend before anything is drawn
+        matplotlib.use("Agg")
+
+        # Needed for building the charts (imported after the backend is selected)
+        from TrackPlotter import TrackPlotter
+
+        ChartRenderer.worker_plotter = TrackPlotter(track_dataframe, results)
+
+    @staticmethod
+    def renderChart(method_name, arguments, paths):
+
+        """
+        FUNCTION ABSTRACT: renderChart()
+
+        DESCRIPTION: This function builds one chart with the worker's TrackPlotter and saves it to every requested file.
+
+        ARGS:
+            method_name - name of the TrackPlotter method that builds the chart
+            arguments - list of arguments for that method
+            paths - list of file paths to save the chart to (the format is taken from each extension)
+
+        RETURNS: paths - the file paths that were written
+        """
+
+        # Needed for closing the figure once it is saved, so that memory does not grow with every chart
+        import matplotlib.pyplot as plot
+
+        # Build the chart
+        chart = getattr(ChartRenderer.worker_plotter, method_name)(*arguments)
+
+        try:
+
+            # Save the chart in every requested format
+            for path in paths:
+
+                chart.save(path, bbox_inches = "tight")
+
+        finally:
+
+            plot.close("all")
+
+        return paths
+
+    def formatFileName(self, name):
+
+        """
+        FUNCTION ABSTRACT: formatFileName()
+
+        DESCRIPTION: This function turns a chart name (e.g. an artist name such as "AC/DC") into a safe file name.
+
+        ARGS:
+            self - the class object
+            name - the chart name
+
+        RETURNS: file_name - the name with every character other than letters, digits, "-" and "_" replaced by "_"
+        """
+
+        return re.sub(r"[^\w\-]+", "_", name).strip("_") or "chart"
+
+    def getJobs(self, include_artists = False):
+
+        """
+        FUNCTION ABSTRACT: getJobs()
+
+        DESCRIPTION: This function lists every chart to render, along with the files to save it to.
+
+        ARGS:
+            self - the class object
+            include_artists - flag for whether to render one popularity distribution chart per artist
+
+        RETURNS: jobs - list of (TrackPlotter method name, arguments, file paths) tuples
+        """
+
+        # Define the three analysis charts
+        charts = [
+            ("duration_vs_popularity", "plotDurationVsPopularity", []),
+            ("explicit_vs_popularity", "plotExplicitVsPopularity", []),
+            ("artist_vs_popularity", "plotArtistVsPopularity", [])
+        ]
+
+        # Define one chart per artist, if requested
+        if (include_artists == True):
+
+            for artist_name in self.__results.artists.artists:
+
+                charts.append((os.path.join("artists", self.formatFileName(str(artist_name))), "plotArtistDistribution", [artist_name]))
+
+        # Pair each chart with its file paths (one per format)
+        return [(method_name, arguments, [os.path.join(self.__output_dir, f"{name}.{extension}") for extension in self.__formats])
+                for name, method_name, arguments in charts]
+
+    def render(self, include_artists = False):
+
+        """
+        FUNCTION ABSTRACT: render()
+
+        DESCRIPTION: This function renders every chart to files, in parallel when more than one process is used. A failed chart does not stop the others.
+
+        ARGS:
+            self - the class object
+            include_artists - flag for whether to render one popularity distribution chart per artist
+
+        RETURNS:
+            written_paths - list of the file paths that were written
+            errors - list of (file paths, error message) pairs for the charts that failed
+        """
+
+        # Define every chart to render, and create the directories they are saved in
+        jobs = self.getJobs(include_artists)
+
+        for method_name, arguments, paths in jobs:
+
+            for path in paths:
+
+                os.makedirs(os.path.dirname(path), exist_ok = True)
+
+        # Define empty lists to pack with the written paths and the errors
+        written_paths = []
+        errors = []
+
+        # If only one process was requested, render every chart in this process
+        if (self.__processes <= 1):
+
+            ChartRenderer.initializeWorker(self.__track_dataframe, self.__results)
+
+            for method_name, arguments, paths in jobs:
+
+                try:
+
+                    written_paths.extend(ChartRenderer.renderChart(method_name, arguments, paths))
+
+                except Exception as error:
+
+                    print(f"ERROR: Could not render {paths}: {error}")
+
+                    errors.append((paths, str(error)))
+
+            return written_paths, errors
+
+        # Otherwise, render the charts on a pool of worker processes, each given the dataframe and results once
+        with ProcessPoolExecutor(max_workers = min(self.__processes, len(jobs)), initializer = ChartRenderer.initializeWorker,
+                                 initargs = (self.__track_dataframe, self.__results)) as executor:
+
+            futures = {executor.submit(ChartRenderer.renderChart, method_name, arguments, paths): paths for method_name, arguments, paths in jobs}
+
+            # As each chart finishes (in whatever order they complete)...
+            for future in as_completed(futures):
+
+                try:
+
+                    written_paths.extend(future.result())
+
+                except Exception as error:
+
+                    print(f"ERROR: Could not render {futures[future]}: {error}")
+
+                    errors.append((futures[future], str(error)))
+
+        return written_paths, errors
@@ -0,0 +1,341 @@
+# Needed for the bounded queue between the fetch and write stages
+import queue
+
+# Needed for running the fetch and write stages concurrently
+import threading
+
+# Needed for measuring the throughput of each stage
+import time
+
+class IngestPipeline:
+
+    """
+    CLASS ABSTRACT: IngestPipeline
+
+    DESCRIPTION:
+        This class streams tracks from the Spotify API into the Redis database. Fetch workers retrieve each
+        artist's top tracks and put them on a bounded queue; write workers take them off the queue and store
+        them in batches. A full queue blocks the fetch workers (backpressure), so memory stays flat no matter
+        how many artists are ingested, and fetching overlaps with writing.
+    """
+
+    # Define the marker that tells a write worker there is nothing left to write
+    __END_OF_STREAM = object()
+
+    # Define how often (in seconds) a worker blocked on the full queue checks that a write worker is still running
+    __LIVENESS_INTERVAL = 1.0
+
+    def __init__(self, spotify_accessor, redis_accessor, fetch_workers = 8, write_workers = 2, queue_size = 100, batch_size = 500):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type IngestPipeline.
+
+        ARGS:
+            self - the class object
+            spotify_accessor - SpotifyDataAccessor used to fetch each artist's top tracks
+            redis_accessor - RedisDataAccessor used to store the tracks
+            fetch_workers - number of threads fetching from the Spotify API
+            write_workers - number of threads writing to the Redis database
+            queue_size - maximum number of artists fetched but not yet written (bounds memory use)
+            batch_size - approximate number of tracks written to the Redis database per batch
+
+        RETURNS: None
+        """
+
+        self.__spotify_accessor = spotify_accessor
+        self.__redis_accessor = redis_accessor
+        self.__fetch_workers = fetch_workers
+        self.__write_workers = write_workers
+        self.__queue_size = queue_size
+        self.__batch_size = batch_size
+
+    def run(self, artist_names, by_id = False):
+
+        """
+        FUNCTION ABSTRACT: run()
+
+        DESCRIPTION:
+            This function ingests the top tracks of every artist and blocks until everything has been written.
+            artist_names is consumed lazily, so it can be a generator over a catalog of any size. A batch that
+            fails is recorded in the write errors and the rest are still written; if every write worker stops
+            anyway, a RuntimeError is raised instead of blocking forever on the full queue.
+
+        ARGS:
+            self - the class object
+            artist_names - iterable of artist names (or of Spotify artist IDs, when by_id is True)
+            by_id - flag for whether artist_names holds Spotify artist IDs (True = IDs, skipping search entirely)
+
+        RETURNS:
+            statistics - Python dictionary containing the following fields:
+                + fetch - artists fetched / failed, tracks fetched, busy and elapsed seconds, and artists per second
+                + write - batches and tracks written, written / unchanged / expired counts, errors, busy and elapsed seconds, and tracks per second
+                + queue_high_water - the largest number of artists waiting on the queue at once
+                + elapsed_seconds - total wall-clock time of the run
+        """
+
+        # Define the bounded queue between the stages, and the shared iterator the fetch workers take artists from
+        self.__queue = queue.Queue(maxsize = self.__queue_size)
+        self.__artists = iter(artist_names)
+        self.__by_id = by_id
+
+        # Define the lock guarding the shared iterator and the statistics
+        self.__lock = threading.Lock()
+
+        # Define the statistics of each stage
+        self.__fetch_statistics = {"artists": 0, "failed": 0, "tracks": 0, "busy_seconds": 0.0}
+        self.__write_statistics = {"batches": 0, "tracks": 0, "written": 0, "unchanged": 0, "expired": 0, "errors": [], "busy_seconds": 0.0}
+        self.__queue_high_water = 0
+
+        # Define a flag for whether every write worker stopped before being told to
+        self.__write_stopped = False
+
+        # Start the clock and every worker thread
+        start = time.perf_counter()
+
+        fetch_threads = [threading.Thread(target = self.__fetchWorker, daemon = True) for _ in range(self.__fetch_workers)]
+        write_threads = [threading.Thread(target = self.__writeWorker, daemon = True) for _ in range(self.__write_workers)]
+
+        self.__write_threads = write_threads
+
+        for thread in fetch_threads + write_threads:
+
+            thread.start()
+
+        # Wait for every fetch worker to run out of artists
+        for thread in fetch_threads:
+
+            thread.join()
+
+        fetch_elapsed = time.perf_counter() - start
+
+        # Tell every write worker that nothing more is coming, then wait for them to flush their last batches
+        for _ in write_threads:
+
+            if (self.__putItem(self.__END_OF_STREAM) == False):
+
+                break
+
+        for thread in write_threads:
+
+            thread.join()
+
+        # If every write worker stopped early, fetched tracks were left on the queue unwritten
+        if ((self.__write_stopped == True) or (self.__queue.empty() == False)):
+
+            raise RuntimeError(f"Every write worker stopped before the run finished; {self.__queue.qsize()} fetched artists were not written")
+
+        elapsed = time.perf_counter() - start
+
+        # Add the elapsed time and throughput of each stage to the statistics
+        self.__fetch_statistics["elapsed_seconds"] = fetch_elapsed
+        self.__fetch_statistics["artists_per_second"] = self.__fetch_statistics["artists"] / fetch_elapsed if fetch_elapsed > 0 else 0.0
+
+        self.__write_statistics["elapsed_seconds"] = elapsed
+        self.__write_statistics["tracks_per_second"] = self.__write_statistics["tracks"] / elapsed if elapsed > 0 else 0.0
+
+        # Return the statistics of the run
+        return {
+            "fetch": self.__fetch_statistics,
+            "write": self.__write_statistics,
+            "queue_high_water": self.__queue_high_water,
+            "elapsed_seconds": elapsed
+        }
+
+    def __fetchWorker(self):
+
+        """
+        FUNCTION ABSTRACT: __fetchWorker()
+
+        DESCRIPTION: This function takes artists off the shared iterator, fetches their top tracks, and puts them on the queue until no artists are left.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        while True:
+
+            # Take the next artist off the shared iterator (generators cannot be advanced by two threads at once)
+            with self.__lock:
+
+                artist_name = next(self.__artists, None)
+
+            # If there are no artists left, this worker is done
+            if (artist_name == None):
+
+                return
+
+            # Fetch the artist's top tracks, timing the fetch
+            fetch_start = time.perf_counter()
+
+            try:
+
+                if (self.__by_id == True):
+
+                    tracks = self.__spotify_accessor.getTopTracksForArtistId(artist_name)
+
+                else:
+
+                    tracks = self.__spotify_accessor.getTopTracksForArtist(artist_name)
+
+            except Exception as error:
+
+                # Something went wrong for this artist only. Output an error message and keep going with the rest.
+                print(f"ERROR: Could not retrieve top tracks for {artist_name}: {error}")
+
+                tracks = None
+
+            fetch_seconds = time.perf_counter() - fetch_start
+
+            with self.__lock:
+
+                self.__fetch_statistics["busy_seconds"] = self.__fetch_statistics["busy_seconds"] + fetch_seconds
+
+                # If the artist could not be retrieved, record the failure and move on to the next artist
+                if (tracks == None):
+
+                    self.__fetch_statistics["failed"] = self.__fetch_statistics["failed"] + 1
+
+                    continue
+
+                self.__fetch_statistics["artists"] = self.__fetch_statistics["artists"] + 1
+                self.__fetch_statistics["tracks"] = self.__fetch_statistics["tracks"] + len(tracks)
+
+            # Put the tracks on the queue (blocks while the queue is full, which keeps the fetch workers from running ahead)
+            if (self.__putItem((artist_name, tracks)) == False):
+
+                # Every write worker stopped, so nothing would ever be written. Stop fetching.
+                return
+
+            with self.__lock:
+
+                self.__queue_high_water = max(self.__queue_high_water, self.__queue.qsize())
+
+    def __putItem(self, item):
+
+        """
+        FUNCTION ABSTRACT: __putItem()
+
+        DESCRIPTION:
+            This function puts an item on the queue, blocking while the queue is full. While blocked, it checks
+            every __LIVENESS_INTERVAL seconds that a write worker is still running to take items off, so that the
+            run fails instead of hanging when every write worker has stopped.
+
+        ARGS:
+            self - the class object
+            item - the (artist, tracks) pair (or end-of-stream marker) to put on the queue
+
+        RETURNS: put_check - boolean flag (True = the item was put on the queue, False = every write worker had stopped)
+        """
+
+        while True:
+
+            try:
+
+                self.__queue.put(item, timeout = self.__LIVENESS_INTERVAL)
+
+                return True
+
+            except queue.Full:
+
+                # If no write worker is left to take items off the queue, give up
+                if (not any(thread.is_alive() for thread in self.__write_threads)):
+
+                    with self.__lock:
+
+                        self.__write_stopped = True
+
+                    return False
+
+    def __writeWorker(self):
+
+        """
+        FUNCTION ABSTRACT: __writeWorker()
+
+        DESCRIPTION: This function takes fetched artists off the queue and stores them in batches until it is told nothing more is coming.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        # Define the pending batch of (artist, tracks) pairs and its track count
+        batch = []
+        batch_track_count = 0
+
+        while True:
+
+            # Take the next artist off the queue (blocks while the queue is empty)
+            item = self.__queue.get()
+
+            # If nothing more is coming, write the last, partially filled batch and stop
+            if (item is self.__END_OF_STREAM):
+
+                if (len(batch) > 0):
+
+                    self.__writeBatch(batch, batch_track_count)
+
+                return
+
+            batch.append(item)
+            batch_track_count = batch_track_count + len(item[1])
+
+            # If the batch is full, write it
+            if (batch_track_count >= self.__batch_size):
+
+                self.__writeBatch(batch, batch_track_count)
+
+                batch = []
+                batch_track_count = 0
+
+    def __writeBatch(self, batch, batch_track_count):
+
+        """
+        FUNCTION ABSTRACT: __writeBatch()
+
+        DESCRIPTION: This function stores one batch of artists' tracks and adds the result to the write statistics.
+
+        ARGS:
+            self - the class object
+            batch - list of (artist, tracks) pairs to store
+            batch_track_count - number of tracks in the batch
+
+        RETURNS: None
+        """
+
+        # Store the batch, timing the write
+        write_start = time.perf_counter()
+
+        try:
+
+            summary, batch_errors = self.__redis_accessor.storeTracksBatched(batch, self.__batch_size)
+
+        except Exception as error:
+
+            # The whole batch failed. Output an error message, record every track in it as failed, and keep draining the queue.
+            print(f"ERROR: A batch of {len(batch)} artists could not be stored: {error}")
+
+            summary = {}
+            batch_errors = [{
+                "batch": self.__write_statistics["batches"],
+                "keys": [self.__redis_accessor.formatKey(track["id"]) for artist_name, tracks in batch for track in tracks if track.get("id") != None],
+                "errors": [str(error)]
+            }]
+
+            batch_track_count = 0
+
+        write_seconds = time.perf_counter() - write_start
+
+        # Add the result to the write statistics
+        with self.__lock:
+
+            self.__write_statistics["busy_seconds"] = self.__write_statistics["busy_seconds"] + write_seconds
+            self.__write_statistics["batches"] = self.__write_statistics["batches"] + 1
+            self.__write_statistics["tracks"] = self.__write_statistics["tracks"] + batch_track_count
+            self.__write_statistics["errors"].extend(batch_errors)
+
+            for name, count in summary.items():
+
+                self.__write_statistics[name] = self.__write_statistics[name] + count
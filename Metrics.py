@@ -0,0 +1,529 @@
+# Needed for writing the summary when the program exits
+import atexit
+
+# Needed for finding the histogram bucket an observation falls into
+import bisect
+
+# Needed for the no-op timer handed out while metrics are disabled
+import contextlib
+
+# Needed for the optional profiler hook
+import cProfile
+
+# Needed for writing the JSON summary
+import json
+
+# Needed for writing the summary to standard output when no file is given
+import sys
+
+# Needed for keeping the metrics consistent when several worker threads record at once
+import threading
+
+# Needed for timing calls
+import time
+
+class Histogram:
+
+    """
+    CLASS ABSTRACT: Histogram
+
+    DESCRIPTION:
+        This class counts observations (e.g. call latencies in seconds) into fixed, cumulative buckets, in the
+        same layout as a Prometheus histogram. Percentiles are estimated from the buckets.
+    """
+
+    # Define the default bucket upper bounds, in seconds (1 ms to 30 s)
+    DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, buckets = DEFAULT_BUCKETS):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type Histogram.
+
+        ARGS:
+            self - the class object
+            buckets - sorted tuple of bucket upper bounds (an unbounded +Inf bucket is always added)
+
+        RETURNS: None
+        """
+
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+
+        """
+        FUNCTION ABSTRACT: observe()
+
+        DESCRIPTION: This function adds one observation to the histogram.
+
+        ARGS:
+            self - the class object
+            value - the observed value
+
+        RETURNS: None
+        """
+
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def getCumulativeCounts(self):
+
+        """
+        FUNCTION ABSTRACT: getCumulativeCounts()
+
+        DESCRIPTION: This function returns the number of observations at or below each bucket's upper bound.
+
+        ARGS: self - the class object
+
+        RETURNS: cumulative_counts - list of (upper bound, count) pairs, ending with ("+Inf", total count)
+        """
+
+        cumulative_counts = []
+        running_count = 0
+
+        for upper_bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+
+            running_count = running_count + count
+            cumulative_counts.append((upper_bound, running_count))
+
+        return cumulative_counts
+
+    def getPercentile(self, percentile):
+
+        """
+        FUNCTION ABSTRACT: getPercentile()
+
+        DESCRIPTION: This function estimates a percentile as the upper bound of the bucket it falls into.
+
+        ARGS:
+            self - the class object
+            percentile - the percentile to estimate (0 - 100)
+
+        RETURNS: value - the estimated percentile (None if nothing was observed, "+Inf" if it is past the last bucket)
+        """
+
+        if (self.count == 0):
+
+            return None
+
+        target = self.count * percentile / 100
+
+        for upper_bound, count in self.getCumulativeCounts():
+
+            if (count >= target):
+
+                return upper_bound
+
+class MetricsTimer:
+
+    """
+    CLASS ABSTRACT: MetricsTimer
+
+    DESCRIPTION: This class times a block of code (used as a with statement) and records its duration in a histogram.
+    """
+
+    def __init__(self, registry, name, labels):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type MetricsTimer.
+
+        ARGS:
+            self - the class object
+            registry - MetricsRegistry the duration is recorded in
+            name - name of the histogram
+            labels - Python dictionary of label name -> value (or None)
+
+        RETURNS: None
+        """
+
+        self.__registry = registry
+        self.__name = name
+        self.__labels = labels
+
+    def __enter__(self):
+
+        """
+        FUNCTION ABSTRACT: __enter__()
+
+        DESCRIPTION: This function starts the clock at the top of the with block.
+
+        ARGS: self - the class object
+
+        RETURNS: self - the timer
+        """
+
+        self.__start = time.perf_counter()
+
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+
+        """
+        FUNCTION ABSTRACT: __exit__()
+
+        DESCRIPTION: This function records the duration of the with block (whether or not it raised).
+
+        ARGS:
+            self - the class object
+            exception_type - type of the exception raised in the block (or None)
+            exception - the exception raised in the block (or None)
+            traceback - traceback of the exception (or None)
+
+        RETURNS: False - so that any exception raised in the block is not swallowed
+        """
+
+        self.__registry.observe(self.__name, time.perf_counter() - self.__start, self.__labels)
+
+        return False
+
+class MetricsRegistry:
+
+    """
+    CLASS ABSTRACT: MetricsRegistry
+
+    DESCRIPTION:
+        This class collects counters (e.g. requests, bytes, cache hits) and histograms (e.g. per-call latency)
+        for every stage of the pipeline, and writes a machine-readable summary (JSON or Prometheus text format)
+        when the program exits. It is disabled by default: every recording call then returns after a single
+        flag check, and timer() hands out a shared no-op context, so the instrumentation costs close to
+        nothing. An optional cProfile hook profiles the main thread for the same run.
+    """
+
+    # Define the no-op context handed out by timer() while disabled
+    NULL_TIMER = contextlib.nullcontext()
+
+    def __init__(self):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type MetricsRegistry.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        self.enabled = False
+
+        self.__counters = {}
+        self.__histograms = {}
+        self.__lock = threading.Lock()
+
+        self.__profiler = None
+
+    def enable(self, output_path = None, output_format = None, profile_path = None):
+
+        """
+        FUNCTION ABSTRACT: enable()
+
+        DESCRIPTION: This function starts recording, and arranges for the summary (and profile) to be written when the program exits.
+
+        ARGS:
+            self - the class object
+            output_path - optional path of the file the summary is written to ("-" or None = standard output)
+            output_format - "json" or "prometheus" (defaults to prometheus for paths ending in .prom, JSON otherwise)
+            profile_path - optional path of the file the cProfile statistics of the main thread are written to
+
+        RETURNS: None
+        """
+
+        # If no format was given, choose it from the file extension
+        if (output_format == None):
+
+            output_format = "prometheus" if (output_path or "").endswith(".prom") else "json"
+
+        self.enabled = True
+
+        # Start profiling the main thread, if requested
+        if (profile_path != None):
+
+            self.__profiler = cProfile.Profile()
+            self.__profiler.enable()
+
+        atexit.register(self.writeSummary, output_path, output_format, profile_path)
+
+    def formatKey(self, name, labels):
+
+        """
+        FUNCTION ABSTRACT: formatKey()
+
+        DESCRIPTION: This function returns the key a metric is stored under.
+
+        ARGS:
+            self - the class object
+            name - name of the metric
+            labels - Python dictionary of label name -> value (or None)
+
+        RETURNS: key - (name, sorted tuple of label pairs)
+        """
+
+        return (name, tuple(sorted(labels.items())) if labels else ())
+
+    def increment(self, name, value = 1, labels = None):
+
+        """
+        FUNCTION ABSTRACT: increment()
+
+        DESCRIPTION: This function adds to a counter (does nothing while disabled).
+
+        ARGS:
+            self - the class object
+            name - name of the counter (e.g. spotify_requests_total)
+            value - amount to add
+            labels - optional Python dictionary of label name -> value
+
+        RETURNS: None
+        """
+
+        if (self.enabled == False):
+
+            return
+
+        key = self.formatKey(name, labels)
+
+        with self.__lock:
+
+            self.__counters[key] = self.__counters.get(key, 0) + value
+
+    def observe(self, name, value, labels = None):
+
+        """
+        FUNCTION ABSTRACT: observe()
+
+        DESCRIPTION: This function adds an observation to a histogram (does nothing while disabled).
+
+        ARGS:
+            self - the class object
+            name - name of the histogram (e.g. redis_round_trip_seconds)
+            value - the observed value
+            labels - optional Python dictionary of label name -> value
+
+        RETURNS: None
+        """
+
+        if (self.enabled == False):
+
+            return
+
+        key = self.formatKey(name, labels)
+
+        with self.__lock:
+
+            if (key not in self.__histograms):
+
+                self.__histograms[key] = Histogram()
+
+            self.__histograms[key].observe(value)
+
+    def timer(self, name, labels = None):
+
+        """
+        FUNCTION ABSTRACT: timer()
+
+        DESCRIPTION: This function returns a context that records the duration of its with block in a histogram (a shared no-op context while disabled).
+
+        ARGS:
+            self - the class object
+            name - name of the histogram (e.g. stage_seconds)
+            labels - optional Python dictionary of label name -> value
+
+        RETURNS: timer - the context to use in a with statement
+        """
+
+        if (self.enabled == False):
+
+            return self.NULL_TIMER
+
+        return MetricsTimer(self, name, labels)
+
+    def getCacheHitRates(self):
+
+        """
+        FUNCTION ABSTRACT: getCacheHitRates()
+
+        DESCRIPTION: This function computes each cache's hit rate from the cache_requests_total counter.
+
+        ARGS: self - the class object
+
+        RETURNS: hit_rates - Python dictionary of cache name -> share of lookups that were hits (0 - 1)
+        """
+
+        totals = {}
+        hits = {}
+
+        for (name, labels), value in self.__counters.items():
+
+            if (name != "cache_requests_total"):
+
+                continue
+
+            labels = dict(labels)
+
+            totals[labels["cache"]] = totals.get(labels["cache"], 0) + value
+
+            if (labels["result"] == "hit"):
+
+                hits[labels["cache"]] = hits.get(labels["cache"], 0) + value
+
+        return {cache: hits.get(cache, 0) / total for cache, total in totals.items() if total > 0}
+
+    def getSummary(self):
+
+        """
+        FUNCTION ABSTRACT: getSummary()
+
+        DESCRIPTION: This function returns every metric recorded so far.
+
+        ARGS: self - the class object
+
+        RETURNS:
+            summary - Python dictionary containing the following fields:
+                + counters - name -> list of {labels, value}
+                + histograms - name -> list of {labels, count, sum, mean, p50, p95, p99, buckets}
+                + cache_hit_rates - cache name -> hit rate
+        """
+
+        with self.__lock:
+
+            counters = {}
+            histograms = {}
+
+            for (name, labels), value in sorted(self.__counters.items()):
+
+                counters.setdefault(name, []).append({"labels": dict(labels), "value": value})
+
+            for (name, labels), histogram in sorted(self.__histograms.items(), key = lambda item: item[0]):
+
+                histograms.setdefault(name, []).append({
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "mean": histogram.sum / histogram.count if histogram.count > 0 else None,
+                    "p50": histogram.getPercentile(50),
+                    "p95": histogram.getPercentile(95),
+                    "p99": histogram.getPercentile(99),
+                    "buckets": {str(upper_bound): count for upper_bound, count in histogram.getCumulativeCounts()}
+                })
+
+            return {"counters": counters, "histograms": histograms, "cache_hit_rates": self.getCacheHitRates()}
+
+    def formatLabels(self, labels, extra_labels = ()):
+
+        """
+        FUNCTION ABSTRACT: formatLabels()
+
+        DESCRIPTION: This function formats labels in the Prometheus text format (e.g. {endpoint="search",le="0.1"}).
+
+        ARGS:
+            self - the class object
+            labels - tuple of (label name, value) pairs
+            extra_labels - tuple of additional (label name, value) pairs
+
+        RETURNS: formatted_labels - the formatted labels (an empty string if there are none)
+        """
+
+        pairs = list(labels) + list(extra_labels)
+
+        if (len(pairs) == 0):
+
+            return ""
+
+        escaped = [(name, str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")) for name, value in pairs]
+
+        return "{" + ",".join(f"{name}=\"{value}\"" for name, value in escaped) + "}"
+
+    def formatPrometheus(self):
+
+        """
+        FUNCTION ABSTRACT: formatPrometheus()
+
+        DESCRIPTION: This function returns every metric recorded so far in the Prometheus text exposition format.
+
+        ARGS: self - the class object
+
+        RETURNS: text - the metrics, one sample per line
+        """
+
+        lines = []
+
+        with self.__lock:
+
+            counter_names = sorted({name for name, labels in self.__counters.keys()})
+            histogram_names = sorted({name for name, labels in self.__histograms.keys()})
+
+            for metric_name in counter_names:
+
+                lines.append(f"# TYPE {metric_name} counter")
+
+                for (name, labels), value in sorted(self.__counters.items()):
+
+                    if (name == metric_name):
+
+                        lines.append(f"{name}{self.formatLabels(labels)} {value}")
+
+            for metric_name in histogram_names:
+
+                lines.append(f"# TYPE {metric_name} histogram")
+
+                for (name, labels), histogram in sorted(self.__histograms.items(), key = lambda item: item[0]):
+
+                    if (name != metric_name):
+
+                        continue
+
+                    for upper_bound, count in histogram.getCumulativeCounts():
+
+                        lines.append(f"{name}_bucket{self.formatLabels(labels, (('le', upper_bound),))} {count}")
+
+                    lines.append(f"{name}_sum{self.formatLabels(labels)} {histogram.sum}")
+                    lines.append(f"{name}_count{self.formatLabels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def writeSummary(self, output_path = None, output_format = "json", profile_path = None):
+
+        """
+        FUNCTION ABSTRACT: writeSummary()
+
+        DESCRIPTION: This function writes the summary (and the profile, if one was being recorded). It runs automatically at exit once enable() is called.
+
+        ARGS:
+            self - the class object
+            output_path - optional path of the file the summary is written to ("-" or None = standard output)
+            output_format - "json" or "prometheus"
+            profile_path - optional path of the file the cProfile statistics are written to
+
+        RETURNS: None
+        """
+
+        # Stop the profiler and save its statistics (readable with python -m pstats)
+        if (self.__profiler != None):
+
+            self.__profiler.disable()
+            self.__profiler.dump_stats(profile_path)
+
+            self.__profiler = None
+
+        text = self.formatPrometheus() if output_format == "prometheus" else json.dumps(self.getSummary(), indent = 4) + "\n"
+
+        if ((output_path == None) or (output_path == "-")):
+
+            sys.stdout.write(text)
+
+            return
+
+        with open(output_path, "w") as file:
+
+            file.write(text)
+
+# Define the registry shared by every module (disabled until enable() is called)
+metrics = MetricsRegistry()
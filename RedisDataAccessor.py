@@ -1,14 +1,31 @@
 # Needed for establishing a connection to the Redis database
 from db_config import getRedisConnection
 
-# Needed to serialize JSON strings
+# Needed to decode tracks stored as JSON strings by earlier versions, and to hash track contents
 import json
 
+# Needed for computing content hashes of tracks (to skip rewriting unchanged tracks)
+import hashlib
+
+# Needed for recording when tracks set to expire will be deleted
+import time
+
+# Needed for generating the random identity of the dataset
+import uuid
+
 # Needed to insert JSON values into the Redis database
 from redis.commands.json.path import Path
 
-# Needed for using dataframes
-import pandas
+# Needed for creating and querying the RediSearch index over the tracks
+from redis.commands.search.field import NumericField, TagField
+from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+from redis.commands.search.query import Query
+from redis.commands.search.aggregation import AggregateRequest, Asc, Desc
+from redis.commands.search import reducers
+from redis.exceptions import ResponseError
+
+# Needed for recording Redis round trips and their latencies
+from Metrics import metrics
 
 class RedisDataAccessor:
 
@@ -18,56 +35,456 @@ class RedisDataAccessor:
     DESCRIPTION: This class stores and retrieves data from the Redis database. 
     """
 
-    def __init__(self):
+    # Define the JSONPath projection of every dataframe column (a track belongs to its first listed, primary artist, here, in formatRow() and in the RediSearch index)
+    COLUMN_PATHS = {
+        "Track Name": "$.name",
+        "Artist Name": "$.artists[0].name",
+        "Album Name": "$.album.name",
+        "Duration (ms)": "$.duration_ms",
+        "Explicit": "$.explicit",
+        "Popularity": "$.popularity"
+    }
+
+    # Define the name of the RediSearch index over the tracks
+    INDEX_NAME = "idx:tracks"
+
+    # Define the key of the hash holding each stored track's content hash (track ID -> hash)
+    CONTENT_HASH_KEY = "tracks:content_hash"
+
+    # Define the key of the dataset version counter (bumped whenever an ingest changes the stored tracks)
+    VERSION_KEY = "tracks:version"
+
+    # Define the key of the sorted set holding when each track set to expire will be deleted (track ID -> Unix time)
+    EXPIRY_KEY = "tracks:expiry"
+
+    # Define the key of the dataset's random identity (set once, so that a flushed or different database is told apart from this one
+    # even when its version counter has reached the same number)
+    DATASET_ID_KEY = "tracks:dataset_id"
+
+    # Define the Lua script that sets dropped tracks to expire. It runs atomically on the server, so a track is only set to
+    # expire if no artist lists it at that moment, even with several ingests writing at the same time.
+    #     KEYS: content hash key, expiry key, version key, then a (track key, track artists key) pair per dropped track
+    #     ARGV: expire_ttl, Unix time the tracks will be deleted, 1 to bump the version regardless (0 otherwise), then the dropped track IDs
+    EXPIRE_SCRIPT = """
+        local expired_count = 0
+
+        for index = 4, #KEYS, 2 do
+
+            local track_id = ARGV[3 + (index - 2) / 2]
+
+            if (redis.call("SCARD", KEYS[index + 1]) == 0) and (redis.call("EXPIRE", KEYS[index], ARGV[1]) == 1) then
+
+                redis.call("HDEL", KEYS[1], track_id)
+                redis.call("ZADD", KEYS[2], ARGV[2], track_id)
+
+                expired_count = expired_count + 1
+
+            end
+
+        end
+
+        if (expired_count > 0) or (ARGV[3] == "1") then
+
+            redis.call("INCR", KEYS[3])
+
+        end
+
+        return expired_count
+    """
+
+    def __init__(self, create_index = True, expire_ttl = 172800, redis_connection = None):
 
         """
         FUNCTION ABSTRACT: Constructor
 
         DESCRIPTION: Creates an object of type RedisDataAccessor.
 
-        ARGS: self - the class object
+        ARGS:
+            self - the class object
+            create_index - flag for whether to create the RediSearch index over the tracks if it does not exist yet
+            expire_ttl - number of seconds a track is kept after it falls out of an artist's top tracks (defaults to two days)
+            redis_connection - optional Redis connection to use (defaults to a connection from the shared pool, see getRedisConnection())
 
         RETURNS: None
         """
 
         # Initialize the Redis database connection
-        self.__redis_connection = getRedisConnection()
+        self.__redis_connection = redis_connection if redis_connection != None else getRedisConnection()
+
+        self.__expire_ttl = expire_ttl
+
+        # Register the expiry script (loaded into Redis the first time it is sent)
+        self.__expire_script = self.__redis_connection.register_script(self.EXPIRE_SCRIPT)
+
+        # Create the RediSearch index (Redis keeps it up to date on every write from then on)
+        if (create_index == True):
 
-        # Flush all records from the Redis database for a fresh run
-        self.__redis_connection.flushall()
+            self.createSearchIndex()
 
-    def storeTracks(self, key, tracks):
+    def formatKey(self, track_id):
+
+        """
+        FUNCTION ABSTRACT: formatKey()
+
+        DESCRIPTION: This function returns the key a track is stored under (keyed by its Spotify ID, so storing a track again overwrites it).
+
+        ARGS:
+            self - the class object
+            track_id - Spotify ID of the track
+
+        RETURNS: formatted_key - the key for the track
+        """
+
+        return f"track:{track_id}"
+
+    def formatArtistKey(self, artist_key):
+
+        """
+        FUNCTION ABSTRACT: formatArtistKey()
+
+        DESCRIPTION: This function returns the key of the set holding the IDs of an artist's current top tracks.
+
+        ARGS:
+            self - the class object
+            artist_key - the name (or Spotify ID) the artist's tracks were fetched under
+
+        RETURNS: formatted_key - the key for the artist's set of track IDs
+        """
+
+        return f"artist_tracks:{artist_key}"
+
+    def formatTrackArtistsKey(self, track_id):
+
+        """
+        FUNCTION ABSTRACT: formatTrackArtistsKey()
+
+        DESCRIPTION: This function returns the key of the set holding every artist whose current top tracks include a track (the reverse of formatArtistKey()).
+
+        ARGS:
+            self - the class object
+            track_id - Spotify ID of the track
+
+        RETURNS: formatted_key - the key for the track's set of artists
+        """
+
+        return f"track_artists:{track_id}"
+
+    def hashTrack(self, track):
+
+        """
+        FUNCTION ABSTRACT: hashTrack()
+
+        DESCRIPTION: This function computes a content hash of a track, used to detect whether a stored track has changed.
+
+        ARGS:
+            self - the class object
+            track - the track to hash
+
+        RETURNS: content_hash - hexadecimal SHA-1 digest of the track's canonical JSON encoding
+        """
+
+        return hashlib.sha1(json.dumps(track, sort_keys = True, separators = (",", ":")).encode("utf-8")).hexdigest()
+
+    def storeTracks(self, tracks, artist_key = None, batch_size = 500):
 
         """
         FUNCTION ABSTRACT: storeTracks()
 
-        DESCRIPTION: This function uses the Redis database connection to store a Python dictionary of tracks.
+        DESCRIPTION:
+            This function uses the Redis database connection to upsert a Python dictionary of tracks. The tracks
+            are written through storeTracksBatched(), so a whole artist costs two network round trips.
 
         ARGS:
             self - the class object
-            key - the current numerical key for the tracks (i.e. the next index in the Redis database)
             tracks - the tracks to store
+            artist_key - the name (or Spotify ID) the tracks were fetched under (None = do not track the artist's top tracks)
+            batch_size - maximum number of tracks sent to the Redis database in one round trip
 
-        RETURNS: updated_key - the updated numerical key for the tracks
+        RETURNS: summary - Python dictionary with the written, unchanged and expired track counts (see storeTracksBatched())
         """
 
-        # Save off the key at its current numerical value for incrementing (needed to create unique key values for each track)
-        updated_key = key
+        # Call storeTracksBatched() with this artist's tracks as the only list of tracks
+        summary, batch_errors = self.storeTracksBatched([(artist_key, tracks)], batch_size)
+
+        # Return the summary of what was written
+        return summary
+
+    def storeTracksBatched(self, tracks_by_artist, batch_size = 500):
+
+        """
+        FUNCTION ABSTRACT: storeTracksBatched()
+
+        DESCRIPTION:
+            This function upserts several artists' tracks using pipelined writes. Tracks are keyed by their
+            Spotify ID and only rewritten when their content hash changed, so re-running an ingest only touches
+            the delta. Tracks that fell out of an artist's top tracks are set to expire after expire_ttl seconds
+            (unless they come back first). Artists are grouped into batches of about batch_size tracks, and each
+            batch costs two round trips: one to read the stored hashes, one to write. A failed write does not
+            stop the rest of the batch.
+
+        ARGS:
+            self - the class object
+            tracks_by_artist - Python dictionary (or iterable of pairs) of artist key -> list of tracks, where the
+                               artist key is the name (or Spotify ID) the tracks were fetched under, or None
+            batch_size - approximate number of tracks sent to the Redis database in one round trip
+
+        RETURNS:
+            summary - Python dictionary with the number of tracks written, unchanged and expired
+            batch_errors - list of Python dictionaries, one per batch that had failures, containing the following fields:
+                + batch - the number of the batch (starting at 0)
+                + keys - the keys that could not be written
+                + errors - the error message for each of those keys
+        """
+
+        # Define the summary of what was written and an empty list to pack with the errors of each batch
+        summary = {"written": 0, "unchanged": 0, "expired": 0}
+        batch_errors = []
+
+        # Define the pending batch of (artist key, tracks) pairs, its track count, and a counter for the number of batches sent
+        batch = []
+        batch_track_count = 0
+        batch_number = 0
+
+        # Accept either a dictionary or an iterable of pairs
+        artist_items = tracks_by_artist.items() if isinstance(tracks_by_artist, dict) else tracks_by_artist
+
+        # For each artist's list of tracks (an artist's tracks always stay together in one batch)...
+        for artist_key, tracks in artist_items:
+
+            # If no tracks were retrieved for this artist, skip it
+            if (tracks == None):
+
+                continue
+
+            batch.append((artist_key, tracks))
+            batch_track_count = batch_track_count + len(tracks)
+
+            # If the batch is full, send it
+            if (batch_track_count >= batch_size):
+
+                self.__writeBatch(batch, batch_number, summary, batch_errors)
+
+                batch = []
+                batch_track_count = 0
+                batch_number = batch_number + 1
+
+        # Send whatever is left over in the last, partially filled batch
+        if (len(batch) > 0):
+
+            self.__writeBatch(batch, batch_number, summary, batch_errors)
+
+        # Count the tracks by what happened to them
+        if (metrics.enabled == True):
+
+            for result, count in summary.items():
+
+                metrics.increment("redis_tracks_total", count, {"result": result})
+
+        # Return the summary and the errors of every failed batch
+        return summary, batch_errors
+
+    def __writeBatch(self, batch, batch_number, summary, batch_errors):
+
+        """
+        FUNCTION ABSTRACT: __writeBatch()
+
+        DESCRIPTION:
+            This function upserts one batch of artists' tracks. The first round trip reads the stored content
+            hashes and each artist's current set of top track IDs; the second writes only the changed tracks,
+            updates the artist sets and each track's set of artists, and sets the tracks that no artist lists
+            anymore to expire (decided on the server, so that concurrent batches and ingests never expire a track
+            another artist still lists). A track listed by several artists is written and counted once.
+
+        ARGS:
+            self - the class object
+            batch - list of (artist key, tracks) pairs to store
+            batch_number - the number of the batch (used for error reporting)
+            summary - Python dictionary of written / unchanged / expired counts to add this batch's counts to
+            batch_errors - list that the errors of this batch are appended to
+
+        RETURNS: None
+        """
+
+        # Save off every track with an ID (tracks without one, such as local files, cannot be keyed), once each even if several artists in the batch list it
+        unique_tracks = {}
+
+        for artist_key, artist_tracks in batch:
+
+            for track in artist_tracks:
+
+                if ((track.get("id") != None) and (track["id"] not in unique_tracks)):
+
+                    unique_tracks[track["id"]] = track
+
+        tracks = list(unique_tracks.values())
+
+        # Define the artist keys whose top tracks are tracked
+        artist_keys = [artist_key for artist_key, artist_tracks in batch if artist_key != None]
+
+        # Read the stored content hashes and the artists' current track IDs in one round trip
+        pipeline = self.__redis_connection.pipeline(transaction = False)
+
+        pipeline.hmget(self.CONTENT_HASH_KEY, [track["id"] for track in tracks] or ["-"])
+
+        for artist_key in artist_keys:
 
-        # For each track in tracks...
-        for track in tracks:
+            pipeline.smembers(self.formatArtistKey(artist_key))
 
-            # Use the key value passed in to create a unique key value (this is why we declare a key_index in main.py and pass / return it)
-            formatted_key = f"track:{updated_key}"
+        try:
 
-            # Store the key / track pair in the Redis database
-            self.__redis_connection.json().set(formatted_key, Path.root_path(), json.dumps(track))
+            with metrics.timer("redis_round_trip_seconds", {"operation": "read_hashes"}):
 
-            # Increment the key index
-            updated_key = updated_key + 1
+                results = pipeline.execute()
 
-        # Return the updated key index, now adjusted for however many tracks were saved off
-        return updated_key
+        except Exception as error:
+
+            # The batch could not be read at all. Output an error message and record every key in it as failed.
+            print(f"ERROR: Batch {batch_number} could not be stored: {error}")
+
+            batch_errors.append({"batch": batch_number, "keys": [self.formatKey(track["id"]) for track in tracks], "errors": [str(error)]})
+
+            return
+
+        stored_hashes = results[0]
+        previous_ids = dict(zip(artist_keys, results[1:]))
+
+        # Define a non-transactional pipeline for the writes, and the key each queued command is for (for error reporting)
+        pipeline = self.__redis_connection.pipeline(transaction = False)
+        command_keys = []
+
+        # Define the IDs of every track still in some artist's top tracks in this batch, and the IDs some artist dropped
+        current_batch_ids = {track["id"] for track in tracks}
+        dropped_ids = set()
+
+        # For each artist whose top tracks are tracked (queued before the tracks, so that an ingest expiring a track at the same time sees it listed)...
+        for artist_key, artist_tracks in batch:
+
+            if (artist_key == None):
+
+                continue
+
+            # Determine which tracks dropped out of the artist's top tracks
+            current_ids = {track["id"] for track in artist_tracks if track.get("id") != None}
+            removed_ids = previous_ids[artist_key] - current_ids
+
+            # Replace the artist's set of track IDs, and record the artist in (or remove it from) each track's set of artists
+            artist_set_key = self.formatArtistKey(artist_key)
+
+            if (len(current_ids) > 0):
+
+                pipeline.sadd(artist_set_key, *current_ids)
+                command_keys.append(artist_set_key)
+
+            if (len(removed_ids) > 0):
+
+                pipeline.srem(artist_set_key, *removed_ids)
+                command_keys.append(artist_set_key)
+
+            for track_id in current_ids:
+
+                pipeline.sadd(self.formatTrackArtistsKey(track_id), artist_key)
+                command_keys.append(self.formatTrackArtistsKey(track_id))
+
+            for track_id in removed_ids:
+
+                pipeline.srem(self.formatTrackArtistsKey(track_id), artist_key)
+                command_keys.append(self.formatTrackArtistsKey(track_id))
+
+            dropped_ids.update(removed_ids)
+
+        # Define the content hashes to store for the changed tracks
+        changed_hashes = {}
+
+        # For each track in the batch...
+        for track, stored_hash in zip(tracks, stored_hashes):
+
+            formatted_key = self.formatKey(track["id"])
+            content_hash = self.hashTrack(track)
+
+            # If the track changed (or is new), rewrite it
+            if (content_hash != stored_hash):
+
+                pipeline.json().set(formatted_key, Path.root_path(), track)
+                command_keys.append(formatted_key)
+
+                changed_hashes[track["id"]] = content_hash
+
+            else:
+
+                summary["unchanged"] = summary["unchanged"] + 1
+
+            # Cancel any pending expiry, in case the track had dropped out of a top 10 and has come back
+            pipeline.persist(formatted_key)
+            command_keys.append(formatted_key)
+
+        summary["written"] = summary["written"] + len(changed_hashes)
+
+        # Forget the pending expiries cancelled above, and the expiries that have already passed
+        now = time.time()
+
+        if (len(tracks) > 0):
+
+            pipeline.zrem(self.EXPIRY_KEY, *[track["id"] for track in tracks])
+            command_keys.append(self.EXPIRY_KEY)
+
+        pipeline.zremrangebyscore(self.EXPIRY_KEY, "-inf", now)
+        command_keys.append(self.EXPIRY_KEY)
+
+        # Store the content hashes of the changed tracks (queued after the writes, so a hash is only kept if the write before it was sent)
+        if (len(changed_hashes) > 0):
+
+            pipeline.hset(self.CONTENT_HASH_KEY, mapping = changed_hashes)
+            command_keys.append(self.CONTENT_HASH_KEY)
+
+        # Define the dropped tracks that may have to expire (tracks in this batch are current, even those stored without an artist)
+        expiring_ids = sorted(dropped_ids - current_batch_ids)
+
+        # Let the server set each dropped track that no artist lists anymore to expire (and forget its hash, so that it is
+        # rewritten if it comes back after expiring), then bump the dataset version if any track changed or was set to expire
+        script_index = None
+
+        if ((len(expiring_ids) > 0) or (len(changed_hashes) > 0)):
+
+            script_keys = [self.CONTENT_HASH_KEY, self.EXPIRY_KEY, self.VERSION_KEY]
+
+            for track_id in expiring_ids:
+
+                script_keys.extend([self.formatKey(track_id), self.formatTrackArtistsKey(track_id)])
+
+            script_arguments = [self.__expire_ttl, now + self.__expire_ttl, 1 if len(changed_hashes) > 0 else 0] + expiring_ids
+
+            self.__expire_script(keys = script_keys, args = script_arguments, client = pipeline)
+
+            script_index = len(command_keys)
+            command_keys.append(self.VERSION_KEY)
+
+        try:
+
+            # Send the whole batch in one round trip, collecting per-command errors instead of raising on the first one
+            with metrics.timer("redis_round_trip_seconds", {"operation": "write"}):
+
+                results = pipeline.execute(raise_on_error = False)
+
+        except Exception as error:
+
+            # The batch could not be sent at all. Record every key in it as failed.
+            results = [error] * len(command_keys)
+
+        # Count the tracks the server set to expire
+        if ((script_index != None) and (isinstance(results[script_index], Exception) == False)):
+
+            summary["expired"] = summary["expired"] + results[script_index]
+
+        # Collect the keys whose commands failed
+        failed_keys = [formatted_key for formatted_key, result in zip(command_keys, results) if isinstance(result, Exception)]
+        failed_errors = [str(result) for result in results if isinstance(result, Exception)]
+
+        # If any commands failed, output an error message and record them
+        if (len(failed_keys) > 0):
+
+            print(f"ERROR: {len(failed_keys)} of {len(command_keys)} writes in batch {batch_number} failed...")
+
+            batch_errors.append({"batch": batch_number, "keys": failed_keys, "errors": failed_errors})
 
     def retrieveTrack(self, key):
 
@@ -83,57 +500,706 @@ class RedisDataAccessor:
         RETURNS: track - the track retrieved from the Redis database for the given key
         """
 
-        # Retrieve the track data from the Redis database
-        track = self.__redis_connection.json().get(key)
+        # Retrieve the track data from the Redis database (stored as a native JSON document, so it arrives decoded)
+        with metrics.timer("redis_round_trip_seconds", {"operation": "get"}):
+
+            track_data = self.__redis_connection.json().get(key)
 
-        # Decode the data from JSON
-        track_data = json.loads(track)
+        # If the track was stored as a JSON string by an earlier version, decode it
+        if (isinstance(track_data, str)):
+
+            track_data = json.loads(track_data)
 
         # Return the retrieved track data
         return track_data
-    
-    def populateDataFrame(self):
+
+    def migrateLegacyTracks(self, batch_size = 1000):
 
         """
-        FUNCTION ABSTRACT: populateDataFrame()
+        FUNCTION ABSTRACT: migrateLegacyTracks()
+
+        DESCRIPTION:
+            This function rewrites every track that an earlier version stored as a JSON-encoded string into a
+            native JSON document, so that it can be projected and indexed server-side, and moves every track that
+            an earlier version stored under a numbered key (track:0, track:1, ...) to its Spotify ID key. Tracks
+            that are already native documents under ID keys are left untouched, so the migration is safe to run
+            more than once.
+
+        ARGS:
+            self - the class object
+            batch_size - number of tracks read and rewritten per round trip
+
+        RETURNS: migrated_count - the number of tracks that were rewritten
+        """
+
+        # Define a counter for the number of rewritten tracks
+        migrated_count = 0
+
+        # For every batch of keys in the Redis database...
+        for keys in self.scanTrackKeys(batch_size):
+
+            # Retrieve each document's root in one round trip (a legacy track comes back as a single string)
+            with metrics.timer("redis_round_trip_seconds", {"operation": "migrate_read"}):
+
+                roots = self.__redis_connection.json().mget(keys, "$")
+
+            # Select the keys whose root is a string (i.e. a double-encoded track) or that are numbered, along with the track
+            legacy_tracks = [(key, value[0]) for key, value in zip(keys, roots)
+                             if ((value != None) and ((isinstance(value[0], str)) or (key.split(":", 1)[1].isdigit())))]
+
+            # If no track in this batch needs migrating, move on to the next batch
+            if (len(legacy_tracks) == 0):
+
+                continue
+
+            # Define a non-transactional pipeline to rewrite every legacy track in one round trip
+            pipeline = self.__redis_connection.pipeline(transaction = False)
+
+            # Queue up a rewrite of each legacy track as a native JSON document
+            for key, track in legacy_tracks:
+
+                # Decode the track if it was double-encoded
+                if (isinstance(track, str)):
+
+                    track = json.loads(track)
+
+                # Determine the key the track belongs under
+                formatted_key = self.formatKey(track["id"]) if key.split(":", 1)[1].isdigit() else key
+
+                pipeline.json().set(formatted_key, Path.root_path(), track)
+
+                # If the track moved to its ID key, delete the numbered key
+                if (formatted_key != key):
+
+                    pipeline.unlink(key)
+
+            # Send the rewrites
+            with metrics.timer("redis_round_trip_seconds", {"operation": "migrate_write"}):
+
+                pipeline.execute()
+
+            migrated_count = migrated_count + len(legacy_tracks)
+
+        # If any track was rewritten, bump the dataset version so that local snapshots of it are rebuilt
+        if (migrated_count > 0):
+
+            self.__redis_connection.incr(self.VERSION_KEY)
+
+        # Return the number of rewritten tracks
+        return migrated_count
+
+    def rebuildTrackArtists(self, batch_size = 1000):
+
+        """
+        FUNCTION ABSTRACT: rebuildTrackArtists()
+
+        DESCRIPTION:
+            This function rebuilds each track's set of artists (see formatTrackArtistsKey()) from the artists' sets of
+            track IDs. Tracks stored by earlier versions have no such set, so a track dropped by one artist would be
+            set to expire even if another artist still lists it. Adding artists to a set is idempotent, so this is
+            safe to run more than once.
+
+        ARGS:
+            self - the class object
+            batch_size - number of artist sets read (and their tracks' sets updated) per round trip
+
+        RETURNS: artist_count - the number of artist sets read
+        """
+
+        # Define a counter for the number of artist sets read
+        artist_count = 0
+        cursor = 0
+
+        while True:
+
+            # Retrieve the next page of artist set keys
+            with metrics.timer("redis_round_trip_seconds", {"operation": "scan"}):
+
+                cursor, artist_set_keys = self.__redis_connection.scan(cursor, match = self.formatArtistKey("*"), count = batch_size)
+
+            if (len(artist_set_keys) > 0):
+
+                # Read the track IDs of every artist in the page in one round trip
+                pipeline = self.__redis_connection.pipeline(transaction = False)
+
+                for artist_set_key in artist_set_keys:
+
+                    pipeline.smembers(artist_set_key)
+
+                track_ids_by_artist = pipeline.execute()
+
+                # Record each artist in its tracks' sets of artists in one round trip
+                pipeline = self.__redis_connection.pipeline(transaction = False)
+
+                for artist_set_key, track_ids in zip(artist_set_keys, track_ids_by_artist):
+
+                    artist_key = artist_set_key[len(self.formatArtistKey("")):]
+
+                    for track_id in track_ids:
+
+                        pipeline.sadd(self.formatTrackArtistsKey(track_id), artist_key)
+
+                pipeline.execute()
+
+                artist_count = artist_count + len(artist_set_keys)
+
+            # If the cursor is back at 0, every key has been walked
+            if (cursor == 0):
 
-        DESCRIPTION: This function returns data retrieved from the Redis database as a dataframe object.
+                break
+
+        # Return the number of artist sets read
+        return artist_count
+
+    def getDatasetVersion(self):
+
+        """
+        FUNCTION ABSTRACT: getDatasetVersion()
+
+        DESCRIPTION:
+            This function returns the dataset version counter, which every ingest that rewrites a track (or sets
+            one to expire) bumps. Comparing it against a saved version tells whether the stored tracks changed.
 
         ARGS: self - the class object
 
-        RETURNS: populated_dataframe - a dataframe containing all of the records from the Redis database
+        RETURNS: version - the dataset version (0 if nothing was ingested yet)
+        """
+
+        with metrics.timer("redis_round_trip_seconds", {"operation": "get_version"}):
+
+            return int(self.__redis_connection.get(self.VERSION_KEY) or 0)
+
+    def getDatasetState(self):
+
+        """
+        FUNCTION ABSTRACT: getDatasetState()
+
+        DESCRIPTION:
+            This function returns the dataset's identity and version counter together with the time the next track
+            set to expire will be deleted, in one round trip. The version counter restarts from 0 on a flushed or
+            different database, so a copy of the dataset is only current while both its identity and version match.
+            Deleting an expired track does not bump the version, so it is also only current until that time.
+
+        ARGS: self - the class object
+
+        RETURNS:
+            dataset_id - the random identity of the dataset (created on first use)
+            version - the dataset version (0 if nothing was ingested yet)
+            next_expiry - Unix time the next track set to expire will be deleted (None if no track is set to expire)
+        """
+
+        # Read the identity (creating it if the database has none yet), the version and the earliest expiry that has not passed yet
+        pipeline = self.__redis_connection.pipeline(transaction = False)
+
+        pipeline.set(self.DATASET_ID_KEY, uuid.uuid4().hex, nx = True)
+        pipeline.get(self.DATASET_ID_KEY)
+        pipeline.get(self.VERSION_KEY)
+        pipeline.zrangebyscore(self.EXPIRY_KEY, f"({time.time()}", "+inf", start = 0, num = 1, withscores = True)
+
+        with metrics.timer("redis_round_trip_seconds", {"operation": "get_version"}):
+
+            created, dataset_id, version, next_expiries = pipeline.execute()
+
+        return dataset_id, int(version or 0), (next_expiries[0][1] if len(next_expiries) > 0 else None)
+    
+    def scanTrackKeys(self, batch_size = 1000):
+
+        """
+        FUNCTION ABSTRACT: scanTrackKeys()
+
+        DESCRIPTION:
+            This function walks every track key in the Redis database with a cursor-based SCAN and yields the
+            keys in batches. A large COUNT is used so that each SCAN round trip returns many keys.
+
+        ARGS:
+            self - the class object
+            batch_size - number of keys per yielded batch (also used as the SCAN COUNT hint)
+
+        RETURNS: keys - generator of lists of track keys
         """
 
-        # Define an empty list to pack with each Redis database item
-        track_list = []
+        # Define the batch of keys being collected, and the SCAN cursor (0 = start of a new walk)
+        keys = []
+        cursor = 0
+
+        while True:
+
+            # Retrieve the next page of track keys (one round trip)
+            with metrics.timer("redis_round_trip_seconds", {"operation": "scan"}):
+
+                cursor, page = self.__redis_connection.scan(cursor, match = "track:*", count = batch_size)
+
+            # For every track key in the page...
+            for key in page:
+
+                keys.append(key)
+
+                # If the batch is full, hand it to the caller and start a new one
+                if (len(keys) >= batch_size):
+
+                    yield keys
 
-        # For every key in the Redis database...
-        for key in self.__redis_connection.scan_iter("track:*"):
+                    keys = []
+
+            # If the cursor is back at 0, every key has been walked
+            if (cursor == 0):
+
+                break
+
+        # Hand over whatever is left over in the last, partially filled batch
+        if (len(keys) > 0):
+
+            yield keys
+
+    def formatRow(self, track):
+
+        """
+        FUNCTION ABSTRACT: formatRow()
 
-            # Call retrieveTrack() to retrieve the track stored under that specific key
-            track = self.retrieveTrack(key)
+        DESCRIPTION: This function formats a full track document into the row of data needed for the dataframe.
 
-            # For each item in the ["artists"] list in the track...
-            for item in track["artists"]:
+        ARGS:
+            self - the class object
+            track - the track retrieved from the Redis database
+
+        RETURNS: formatted_row - Python dictionary with one value per dataframe column
+        """
+
+        # Format the row of data (the track belongs to its first listed, primary artist, as in COLUMN_PATHS and the RediSearch index)
+        return {
+            "Track Name": track["name"],
+            "Artist Name": track["artists"][0]["name"],
+            "Album Name": track["album"]["name"],
+            "Duration (ms)": track["duration_ms"],
+            "Explicit": track["explicit"],
+            "Popularity": track["popularity"]
+        }
+
+    def retrieveTrackColumns(self, keys):
+
+        """
+        FUNCTION ABSTRACT: retrieveTrackColumns()
+
+        DESCRIPTION:
+            This function retrieves the dataframe columns for a batch of track keys in one round trip. One
+            JSON.MGET per column is pipelined, each projecting a single field through JSONPath, so only the six
+            needed fields travel over the network instead of the full album / artist payload.
+
+        ARGS:
+            self - the class object
+            keys - list of already-formatted track keys
+
+        RETURNS: columns - Python dictionary of column name -> list of values (one value per track found)
+        """
 
-                # Save the artist's name (this is done only for artists because this particular element of track is uniquely formatted as a list)
-                artist_name = item["name"]
+        # Define a non-transactional pipeline to send every column request in one round trip
+        pipeline = self.__redis_connection.pipeline(transaction = False)
 
-            # Format the row of data to be saved off in the list
-            formatted_row = {
-                "Track Name": track["name"],
-                "Artist Name": artist_name,
-                "Album Name": track["album"]["name"],
-                "Duration (ms)": track["duration_ms"],
-                "Explicit": track["explicit"],
-                "Popularity": track["popularity"]
-            }
+        # Queue up one JSON.MGET per column
+        for path in self.COLUMN_PATHS.values():
 
-            # Append the formatted row onto the list
-            track_list.append(formatted_row)
+            pipeline.json().mget(keys, path)
 
-        # Define a dataframe using the list created above
-        populated_dataframe = pandas.DataFrame.from_dict(track_list)
+        # Send the requests and pair each column name with its results
+        with metrics.timer("redis_round_trip_seconds", {"operation": "read_columns"}):
+
+            results = dict(zip(self.COLUMN_PATHS.keys(), pipeline.execute()))
+
+        # Define an empty list to pack with each column
+        columns = {column: [] for column in self.COLUMN_PATHS.keys()}
+
+        # Define an empty list to pack with the keys still holding string-encoded documents
+        legacy_keys = []
+
+        # For each key in the batch...
+        for index, key in enumerate(keys):
+
+            # Retrieve the track name projected for this key
+            names = results["Track Name"][index]
+
+            # If the key was deleted since it was scanned, skip it
+            if (names == None):
+
+                continue
+
+            # If nothing could be projected, the key still holds a string-encoded document (see migrateLegacyTracks()) and has to be decoded in full
+            if (len(names) == 0):
+
+                legacy_keys.append(key)
+
+                continue
+
+            # If any other field is missing from the track, skip it (every column has to stay the same length)
+            if (any(len(results[column][index]) == 0 for column in self.COLUMN_PATHS.keys())):
+
+                continue
+
+            # Append each projected field onto its column
+            for column in self.COLUMN_PATHS.keys():
+
+                columns[column].append(results[column][index][0])
+
+        # If any string-encoded documents were found...
+        if (len(legacy_keys) > 0):
+
+            # Retrieve the full documents in one round trip, decode them, and append them onto the columns
+            with metrics.timer("redis_round_trip_seconds", {"operation": "read_legacy"}):
+
+                legacy_tracks = self.__redis_connection.json().mget(legacy_keys, Path.root_path())
+
+            for track in legacy_tracks:
+
+                if (track != None):
+
+                    for column, value in self.formatRow(json.loads(track)).items():
+
+                        columns[column].append(value)
+
+        # Return the populated columns
+        return columns
+
+    def populateDataFrame(self, batch_size = 1000, arrow = False):
+
+        """
+        FUNCTION ABSTRACT: populateDataFrame()
+
+        DESCRIPTION:
+            This function returns data retrieved from the Redis database as a dataframe object. Keys are
+            scanned and their fields fetched in batches of batch_size, so loading costs a few round trips per
+            batch instead of a few per track. The dataframe is built column by column with compact types
+            (see TrackFrameBuilder).
+
+        ARGS:
+            self - the class object
+            batch_size - number of tracks fetched per batch
+            arrow - flag for the dataframe's backing (True = Apache Arrow columns, False = NumPy / categorical columns)
+
+        RETURNS: populated_dataframe - a dataframe containing all of the records from the Redis database
+        """
+
+        # Needed for building typed dataframes (imported here, so that ingest-only runs never load pandas)
+        from TrackFrameBuilder import TrackFrameBuilder
+
+        # Define the builder that collects each batch's columns
+        frame_builder = TrackFrameBuilder()
+
+        # For every batch of keys in the Redis database...
+        for keys in self.scanTrackKeys(batch_size):
+
+            # Call retrieveTrackColumns() to retrieve the fields stored under those keys, and append them onto the columns
+            frame_builder.appendBatch(self.retrieveTrackColumns(keys))
+
+        # Define a typed dataframe using the columns collected above
+        populated_dataframe = frame_builder.build(arrow)
 
         # Return the populated dataframe
         return populated_dataframe
+
+    def iterDataFrames(self, chunk_size = 10000, arrow = False):
+
+        """
+        FUNCTION ABSTRACT: iterDataFrames()
+
+        DESCRIPTION:
+            This function yields the data in the Redis database as a series of dataframe chunks, walking the keys
+            with a cursor-based SCAN. Only one chunk is held in memory at a time, so datasets larger than memory
+            can be processed (e.g. with IncrementalTrackStatistics). Tracks written during the walk may or may
+            not be included, as with any SCAN.
+
+        ARGS:
+            self - the class object
+            chunk_size - number of tracks per dataframe chunk
+            arrow - flag for each chunk's backing (True = Apache Arrow columns, False = NumPy / categorical columns)
+
+        RETURNS: track_dataframes - generator of typed dataframes (see TrackFrameBuilder), each with up to chunk_size tracks
+        """
+
+        # Needed for building typed dataframes (imported here, so that ingest-only runs never load pandas)
+        from TrackFrameBuilder import TrackFrameBuilder
+
+        # For every batch of keys in the Redis database...
+        for keys in self.scanTrackKeys(chunk_size):
+
+            # Retrieve the fields stored under those keys and build them into their own dataframe
+            frame_builder = TrackFrameBuilder()
+            frame_builder.appendBatch(self.retrieveTrackColumns(keys))
+
+            yield frame_builder.build(arrow)
+
+    def createSearchIndex(self):
+
+        """
+        FUNCTION ABSTRACT: createSearchIndex()
+
+        DESCRIPTION:
+            This function creates the RediSearch index over every track:* JSON document, if it does not exist
+            yet. The index covers the (first) artist's name and explicit flag as TAG fields, and popularity and
+            duration_ms as NUMERIC fields. Redis indexes existing tracks in the background and updates the
+            index on every later write.
+
+        ARGS: self - the class object
+
+        RETURNS: created_check - boolean flag (True = the index was created, False = it already existed)
+        """
+
+        # Define the handle for the index
+        index = self.__redis_connection.ft(self.INDEX_NAME)
+
+        try:
+
+            # If the index can be described, it already exists
+            index.info()
+
+            return False
+
+        except ResponseError:
+
+            # The index does not exist yet. Continue on to create it.
+            pass
+
+        # Define the indexed fields (all sortable, so aggregations read them from the index instead of the documents)
+        fields = [
+            TagField("$.artists[0].name", as_name = "artist", separator = "|", sortable = True),
+            TagField("$.explicit", as_name = "explicit", sortable = True),
+            NumericField("$.popularity", as_name = "popularity", sortable = True),
+            NumericField("$.duration_ms", as_name = "duration_ms", sortable = True)
+        ]
+
+        # Define the index over every JSON document stored under a track:* key
+        definition = IndexDefinition(prefix = ["track:"], index_type = IndexType.JSON)
+
+        # Create the index
+        index.create_index(fields, definition = definition)
+
+        return True
+
+    def escapeTagValue(self, value):
+
+        """
+        FUNCTION ABSTRACT: escapeTagValue()
+
+        DESCRIPTION: This function escapes a value for use in a RediSearch TAG query (e.g. "Guns N' Roses" or "AC/DC").
+
+        ARGS:
+            self - the class object
+            value - the raw tag value
+
+        RETURNS: escaped_value - the value with every punctuation and space character escaped
+        """
+
+        return "".join(character if character.isalnum() else "\\" + character for character in value)
+
+    def __aggregate(self, request):
+
+        """
+        FUNCTION ABSTRACT: __aggregate()
+
+        DESCRIPTION: This function runs an aggregation against the RediSearch index and returns its rows (see __parseRows()).
+
+        ARGS:
+            self - the class object
+            request - the AggregateRequest to run
+
+        RETURNS: rows - list of Python dictionaries, one per aggregated row
+        """
+
+        with metrics.timer("redis_round_trip_seconds", {"operation": "aggregate"}):
+
+            result = self.__redis_connection.ft(self.INDEX_NAME).aggregate(request)
+
+        return self.__parseRows(result)
+
+    def __parseRows(self, result):
+
+        """
+        FUNCTION ABSTRACT: __parseRows()
+
+        DESCRIPTION: This function converts the rows of an aggregation result (flat field / value lists) into Python dictionaries.
+
+        ARGS:
+            self - the class object
+            result - the aggregation result returned by RediSearch
+
+        RETURNS: rows - list of Python dictionaries, with numeric (non-tag) values converted to floats
+        """
+
+        # Define an empty list to pack with each row
+        rows = []
+
+        for row in result.rows:
+
+            # Pair up each field name with the value that follows it
+            formatted_row = {}
+
+            for field, value in zip(row[0::2], row[1::2]):
+
+                # Tag fields are always text, even when they look like a number (e.g. an artist named "1975")
+                if (field in ("artist", "explicit")):
+
+                    formatted_row[field] = value
+
+                    continue
+
+                try:
+
+                    formatted_row[field] = float(value)
+
+                except (TypeError, ValueError):
+
+                    formatted_row[field] = value
+
+            rows.append(formatted_row)
+
+        return rows
+
+    def searchTracks(self, query = "*", sort_by = "popularity", ascending = False, limit = 10):
+
+        """
+        FUNCTION ABSTRACT: searchTracks()
+
+        DESCRIPTION: This function runs a RediSearch query over the tracks and returns the matching track documents.
+
+        ARGS:
+            self - the class object
+            query - RediSearch query string (e.g. "@popularity:[80 +inf]" or "@explicit:{true}")
+            sort_by - indexed field to sort the matches by
+            ascending - flag for the sort order (True = ascending, False = descending)
+            limit - maximum number of tracks to return
+
+        RETURNS: tracks - list of track Python dictionaries
+        """
+
+        # Define the query, sorted and limited server-side
+        search_query = Query(query).sort_by(sort_by, asc = ascending).paging(0, limit)
+
+        # Run the query
+        with metrics.timer("redis_round_trip_seconds", {"operation": "search"}):
+
+            result = self.__redis_connection.ft(self.INDEX_NAME).search(search_query)
+
+        # Decode each matching document from JSON
+        return [json.loads(document.json) for document in result.docs]
+
+    def getTracksForArtist(self, artist_name, limit = 10):
+
+        """
+        FUNCTION ABSTRACT: getTracksForArtist()
+
+        DESCRIPTION: This function returns an artist's most popular stored tracks using the RediSearch index.
+
+        ARGS:
+            self - the class object
+            artist_name - name of the artist
+            limit - maximum number of tracks to return
+
+        RETURNS: tracks - list of track Python dictionaries, most popular first
+        """
+
+        return self.searchTracks(f"@artist:{{{self.escapeTagValue(artist_name)}}}", limit = limit)
+
+    def getPopularityByArtist(self, max_artists = 10000):
+
+        """
+        FUNCTION ABSTRACT: getPopularityByArtist()
+
+        DESCRIPTION: This function aggregates track popularity per artist server-side, so no tracks are moved to the client.
+
+        ARGS:
+            self - the class object
+            max_artists - maximum number of artists to return
+
+        RETURNS:
+            rows - list of Python dictionaries (highest average popularity first) containing the following fields:
+                + artist - name of the artist
+                + track_count - number of stored tracks for the artist
+                + average_popularity - average popularity of those tracks
+                + minimum_popularity - lowest popularity of those tracks
+                + maximum_popularity - highest popularity of those tracks
+        """
+
+        # Define the aggregation: group by artist and reduce popularity
+        request = (AggregateRequest("*")
+                   .group_by("@artist",
+                             reducers.count().alias("track_count"),
+                             reducers.avg("@popularity").alias("average_popularity"),
+                             reducers.min("@popularity").alias("minimum_popularity"),
+                             reducers.max("@popularity").alias("maximum_popularity"))
+                   .sort_by(Desc("@average_popularity"), max = max_artists)
+                   .limit(0, max_artists))
+
+        # Run the aggregation and return its rows
+        return self.__aggregate(request)
+
+    def getDurationBuckets(self, bucket_ms = 60000):
+
+        """
+        FUNCTION ABSTRACT: getDurationBuckets()
+
+        DESCRIPTION: This function aggregates tracks into duration buckets server-side (one minute wide by default).
+
+        ARGS:
+            self - the class object
+            bucket_ms - width of each bucket in milliseconds
+
+        RETURNS:
+            rows - list of Python dictionaries (shortest bucket first) containing the following fields:
+                + duration_bucket - lower bound of the bucket in milliseconds
+                + track_count - number of tracks in the bucket
+                + average_popularity - average popularity of those tracks
+        """
+
+        # Define the aggregation: compute each track's bucket, then group by it
+        request = (AggregateRequest("*")
+                   .apply(duration_bucket = f"floor(@duration_ms / {bucket_ms}) * {bucket_ms}")
+                   .group_by("@duration_bucket",
+                             reducers.count().alias("track_count"),
+                             reducers.avg("@popularity").alias("average_popularity"))
+                   .sort_by(Asc("@duration_bucket"))
+                   .limit(0, 10000))
+
+        # Run the aggregation and return its rows
+        return self.__aggregate(request)
+
+    def getExplicitRatio(self):
+
+        """
+        FUNCTION ABSTRACT: getExplicitRatio()
+
+        DESCRIPTION: This function aggregates the share of explicit tracks, and the average popularity of explicit / clean tracks, server-side.
+
+        ARGS: self - the class object
+
+        RETURNS:
+            explicit_ratio - Python dictionary containing the following fields:
+                + explicit_count - number of explicit tracks
+                + clean_count - number of tracks without explicit language
+                + explicit_ratio - share of tracks that are explicit (0 - 1)
+                + explicit_average_popularity - average popularity of explicit tracks (or None)
+                + clean_average_popularity - average popularity of tracks without explicit language (or None)
+        """
+
+        # Define the aggregation: group by the explicit flag
+        request = (AggregateRequest("*")
+                   .group_by("@explicit",
+                             reducers.count().alias("track_count"),
+                             reducers.avg("@popularity").alias("average_popularity")))
+
+        # Run the aggregation and key its rows by the explicit flag ("true" / "false")
+        rows = {row["explicit"]: row for row in self.__aggregate(request)}
+
+        # Retrieve the counts for each group (a group with no tracks is missing from the result)
+        explicit_row = rows.get("true", {})
+        clean_row = rows.get("false", {})
+
+        explicit_count = int(explicit_row.get("track_count", 0))
+        clean_count = int(clean_row.get("track_count", 0))
+        total_count = explicit_count + clean_count
+
+        # Return the ratio and the popularity of each group
+        return {
+            "explicit_count": explicit_count,
+            "clean_count": clean_count,
+            "explicit_ratio": (explicit_count / total_count) if total_count > 0 else 0.0,
+            "explicit_average_popularity": explicit_row.get("average_popularity"),
+            "clean_average_popularity": clean_row.get("average_popularity")
+        }
@@ -0,0 +1,223 @@
+# Needed for measuring elapsed time while refilling the token bucket
+import time
+
+# Needed for sharing the scheduler safely between worker threads
+import threading
+
+class RequestScheduler:
+
+    """
+    CLASS ABSTRACT: RequestScheduler
+
+    DESCRIPTION:
+        This class schedules requests to the Spotify API using a token bucket. Every request spends one token,
+        tokens refill at a fixed rate, and a 429 (Too Many Requests) response pauses every caller until the
+        Retry-After period has passed. Callers wait in line instead of failing, and counters are kept for
+        throttled, retried and dropped requests.
+    """
+
+    def __init__(self, requests_per_second = 10, burst = None, max_throttle_retries = 5, default_retry_after = 1):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type RequestScheduler.
+
+        ARGS:
+            self - the class object
+            requests_per_second - number of tokens added to the bucket every second (the sustained request rate)
+            burst - maximum number of tokens the bucket can hold (defaults to requests_per_second)
+            max_throttle_retries - number of times a throttled request is queued again before it is dropped
+            default_retry_after - number of seconds to pause when a 429 response has no usable Retry-After header
+
+        RETURNS: None
+        """
+
+        self.__rate = float(requests_per_second)
+        self.__capacity = float(burst if burst != None else requests_per_second)
+        self.__max_throttle_retries = max_throttle_retries
+        self.__default_retry_after = default_retry_after
+
+        # Start with a full bucket and no active pause
+        self.__tokens = self.__capacity
+        self.__last_refill = time.monotonic()
+        self.__paused_until = 0.0
+
+        # Define the condition variable that waiting callers sleep on
+        self.__condition = threading.Condition()
+
+        # Define the counters exposed through getStatistics()
+        self.__statistics = {"requests": 0, "throttled": 0, "retried": 0, "dropped": 0}
+
+    def getMaxThrottleRetries(self):
+
+        """
+        FUNCTION ABSTRACT: getMaxThrottleRetries()
+
+        DESCRIPTION: This function returns how many times a throttled request is queued again before it is dropped.
+
+        ARGS: self - the class object
+
+        RETURNS: max_throttle_retries - the maximum number of throttle retries
+        """
+
+        return self.__max_throttle_retries
+
+    def __refill(self, now):
+
+        """
+        FUNCTION ABSTRACT: __refill()
+
+        DESCRIPTION: This function adds the tokens earned since the last refill, without exceeding the bucket capacity.
+
+        ARGS:
+            self - the class object
+            now - the current monotonic time
+
+        RETURNS: None
+        """
+
+        # Add tokens for the time that has passed since the last refill
+        self.__tokens = min(self.__capacity, self.__tokens + ((now - self.__last_refill) * self.__rate))
+        self.__last_refill = now
+
+    def acquire(self):
+
+        """
+        FUNCTION ABSTRACT: acquire()
+
+        DESCRIPTION:
+            This function blocks until the caller is allowed to send one request, i.e. until no Retry-After pause
+            is active and the bucket holds at least one token.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        with self.__condition:
+
+            while True:
+
+                # Refill the bucket for the time that has passed
+                now = time.monotonic()
+                self.__refill(now)
+
+                # If Spotify asked every caller to back off, wait until that pause is over
+                if (now < self.__paused_until):
+
+                    self.__condition.wait(self.__paused_until - now)
+
+                    continue
+
+                # If a token is available, spend it and let the request through
+                if (self.__tokens >= 1):
+
+                    self.__tokens = self.__tokens - 1
+                    self.__statistics["requests"] = self.__statistics["requests"] + 1
+
+                    return
+
+                # Otherwise, wait for roughly as long as it takes to earn the next token
+                self.__condition.wait((1 - self.__tokens) / self.__rate)
+
+    def parseRetryAfter(self, retry_after):
+
+        """
+        FUNCTION ABSTRACT: parseRetryAfter()
+
+        DESCRIPTION: This function converts a Retry-After header value into a number of seconds to pause.
+
+        ARGS:
+            self - the class object
+            retry_after - the raw Retry-After header value (or None if the header was missing)
+
+        RETURNS: seconds - the number of seconds to pause
+        """
+
+        try:
+
+            # Spotify sends Retry-After as a whole number of seconds
+            return max(0.0, float(retry_after))
+
+        except (TypeError, ValueError):
+
+            # The header was missing or in an unexpected format, so fall back to the default pause
+            return float(self.__default_retry_after)
+
+    def recordThrottle(self, retry_after):
+
+        """
+        FUNCTION ABSTRACT: recordThrottle()
+
+        DESCRIPTION:
+            This function records a 429 response and pauses every caller for the Retry-After period. The bucket is
+            emptied as well, so that requests resume gradually instead of all at once.
+
+        ARGS:
+            self - the class object
+            retry_after - the raw Retry-After header value from the 429 response
+
+        RETURNS: None
+        """
+
+        # Determine how long to pause for
+        seconds = self.parseRetryAfter(retry_after)
+
+        with self.__condition:
+
+            # Extend the pause (never shorten one that another thread already started)
+            self.__paused_until = max(self.__paused_until, time.monotonic() + seconds)
+
+            # Empty the bucket so requests trickle back in at the sustained rate
+            self.__tokens = 0.0
+
+            self.__statistics["throttled"] = self.__statistics["throttled"] + 1
+
+    def recordRetry(self):
+
+        """
+        FUNCTION ABSTRACT: recordRetry()
+
+        DESCRIPTION: This function records that a throttled request was queued to be sent again.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        with self.__condition:
+
+            self.__statistics["retried"] = self.__statistics["retried"] + 1
+
+    def recordDrop(self):
+
+        """
+        FUNCTION ABSTRACT: recordDrop()
+
+        DESCRIPTION: This function records that a request was given up on after too many throttle retries.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        with self.__condition:
+
+            self.__statistics["dropped"] = self.__statistics["dropped"] + 1
+
+    def getStatistics(self):
+
+        """
+        FUNCTION ABSTRACT: getStatistics()
+
+        DESCRIPTION: This function returns a snapshot of the scheduler counters.
+
+        ARGS: self - the class object
+
+        RETURNS: statistics - Python dictionary with the requests, throttled, retried and dropped counts
+        """
+
+        with self.__condition:
+
+            return dict(self.__statistics)
@@ -0,0 +1,258 @@
+# Needed for establishing a connection to the Redis database
+from db_config import getRedisConnection
+
+# Needed to serialize cache entries
+import json
+
+# Needed for deciding whether a cache entry is still fresh
+import time
+
+# Needed for sharing the cache counters safely between worker threads
+import threading
+
+class ResponseCache:
+
+    """
+    CLASS ABSTRACT: ResponseCache
+
+    DESCRIPTION:
+        This class caches Spotify API response payloads in the Redis database along with their ETag and
+        Last-Modified headers. A fresh entry is served without any request; a stale entry is revalidated
+        with a conditional request, so an unchanged payload costs a bodyless 304 response instead of a
+        full download.
+    """
+
+    def __init__(self, redis_connection = None, fresh_ttl = 86400, stale_ttl = 604800):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type ResponseCache.
+
+        ARGS:
+            self - the class object
+            redis_connection - Redis connection to cache responses in (defaults to a connection from the shared pool, see getRedisConnection())
+            fresh_ttl - number of seconds a cached response is served without contacting Spotify (defaults to one day)
+            stale_ttl - number of seconds a cached response is kept for revalidation before Redis expires it (defaults to one week)
+
+        RETURNS: None
+        """
+
+        # Initialize the Redis database connection
+        self.__redis_connection = redis_connection if redis_connection != None else getRedisConnection()
+
+        self.__fresh_ttl = fresh_ttl
+        self.__stale_ttl = max(stale_ttl, fresh_ttl)
+
+        # Define the counters exposed through getStatistics() and the lock that guards them
+        self.__statistics = {"hits": 0, "misses": 0, "revalidated": 0}
+        self.__lock = threading.Lock()
+
+    def formatKey(self, url):
+
+        """
+        FUNCTION ABSTRACT: formatKey()
+
+        DESCRIPTION: This function returns the Redis key a response is cached under.
+
+        ARGS:
+            self - the class object
+            url - URL of the cached request
+
+        RETURNS: formatted_key - the Redis key for the URL
+        """
+
+        return f"http_cache:{url}"
+
+    def get(self, url):
+
+        """
+        FUNCTION ABSTRACT: get()
+
+        DESCRIPTION: This function retrieves the cached entry for a URL.
+
+        ARGS:
+            self - the class object
+            url - URL of the cached request
+
+        RETURNS:
+            entry - Python dictionary (or None if nothing is cached) containing the following fields:
+                + body - the cached response payload
+                + etag - the ETag header of the cached response (or None)
+                + last_modified - the Last-Modified header of the cached response (or None)
+                + stored_at - the time the response was last fetched or revalidated
+        """
+
+        try:
+
+            # Retrieve the cache entry from the Redis database
+            entry = self.__redis_connection.get(self.formatKey(url))
+
+        except Exception as error:
+
+            # An unreachable cache only costs a full request. Output an error message and treat it as a miss.
+            print(f"ERROR: Could not read the response cache: {error}")
+
+            return None
+
+        # If nothing was cached for this URL, there is no entry to return
+        if (entry == None):
+
+            return None
+
+        # Decode the entry from JSON
+        return json.loads(entry)
+
+    def isFresh(self, entry):
+
+        """
+        FUNCTION ABSTRACT: isFresh()
+
+        DESCRIPTION: This function determines whether a cache entry can be served without contacting Spotify.
+
+        ARGS:
+            self - the class object
+            entry - the cache entry returned by get()
+
+        RETURNS: freshness_check - boolean flag (True = fresh, False = stale)
+        """
+
+        return (time.time() - entry["stored_at"]) < self.__fresh_ttl
+
+    def getConditionalHeaders(self, entry):
+
+        """
+        FUNCTION ABSTRACT: getConditionalHeaders()
+
+        DESCRIPTION: This function returns the headers that ask Spotify to answer with 304 if a stale entry is still current.
+
+        ARGS:
+            self - the class object
+            entry - the cache entry returned by get()
+
+        RETURNS: headers - Python dictionary of If-None-Match / If-Modified-Since headers
+        """
+
+        # Define an empty dictionary to pack with the conditional headers
+        headers = {}
+
+        if (entry["etag"] != None):
+
+            headers["If-None-Match"] = entry["etag"]
+
+        if (entry["last_modified"] != None):
+
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        return headers
+
+    def store(self, url, body, etag = None, last_modified = None):
+
+        """
+        FUNCTION ABSTRACT: store()
+
+        DESCRIPTION: This function caches a response payload and its validators for a URL.
+
+        ARGS:
+            self - the class object
+            url - URL of the request
+            body - the response payload
+            etag - the ETag header of the response (or None)
+            last_modified - the Last-Modified header of the response (or None)
+
+        RETURNS: None
+        """
+
+        # Format the entry to be saved off
+        entry = {"body": body, "etag": etag, "last_modified": last_modified, "stored_at": time.time()}
+
+        try:
+
+            # Store the entry in the Redis database, letting Redis expire it once it is too old to revalidate
+            self.__redis_connection.set(self.formatKey(url), json.dumps(entry), ex = self.__stale_ttl)
+
+        except Exception as error:
+
+            # An unreachable cache only costs a full request next run. Output an error message and continue.
+            print(f"ERROR: Could not write the response cache: {error}")
+
+    def refresh(self, url, entry):
+
+        """
+        FUNCTION ABSTRACT: refresh()
+
+        DESCRIPTION: This function marks a stale entry as fresh again after Spotify confirmed it is unchanged (HTTP 304).
+
+        ARGS:
+            self - the class object
+            url - URL of the request
+            entry - the cache entry returned by get()
+
+        RETURNS: None
+        """
+
+        self.store(url, entry["body"], entry["etag"], entry["last_modified"])
+
+    def recordHit(self):
+
+        """
+        FUNCTION ABSTRACT: recordHit()
+
+        DESCRIPTION: This function records that a fresh entry was served without contacting Spotify.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        with self.__lock:
+
+            self.__statistics["hits"] = self.__statistics["hits"] + 1
+
+    def recordMiss(self):
+
+        """
+        FUNCTION ABSTRACT: recordMiss()
+
+        DESCRIPTION: This function records that a full response had to be downloaded.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        with self.__lock:
+
+            self.__statistics["misses"] = self.__statistics["misses"] + 1
+
+    def recordRevalidation(self):
+
+        """
+        FUNCTION ABSTRACT: recordRevalidation()
+
+        DESCRIPTION: This function records that a stale entry was confirmed unchanged by a 304 response.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        with self.__lock:
+
+            self.__statistics["revalidated"] = self.__statistics["revalidated"] + 1
+
+    def getStatistics(self):
+
+        """
+        FUNCTION ABSTRACT: getStatistics()
+
+        DESCRIPTION: This function returns a snapshot of the cache counters.
+
+        ARGS: self - the class object
+
+        RETURNS: statistics - Python dictionary with the hits, misses and revalidated counts
+        """
+
+        with self.__lock:
+
+            return dict(self.__statistics)
@@ -0,0 +1,254 @@
+# Needed for creating the snapshot directory and swapping snapshot files in atomically
+import os
+
+# Needed for using dataframes
+import pandas
+
+# Needed for checking whether a track in the snapshot may have expired since it was written
+import time
+
+class SnapshotCache:
+
+    """
+    CLASS ABSTRACT: SnapshotCache
+
+    DESCRIPTION:
+        This class keeps a local columnar snapshot of the track dataframe, tagged with the identity and version
+        of the dataset it was built from. Loading compares that tag against the Redis database (one small
+        request): if nothing was ingested since, the snapshot is memory-mapped from disk; otherwise the
+        dataframe is rebuilt from the Redis database and the snapshot rewritten. Tracks set to expire are deleted
+        without a version bump, so a snapshot is also rebuilt once the next expiry pending when it was written has
+        passed. Snapshots are written in the Arrow IPC format by default, or as Parquet when the path ends in .parquet.
+    """
+
+    # Define the schema metadata keys the dataset identity and version, and the time the snapshot stops being current, are stored under
+    DATASET_ID_METADATA_KEY = b"dataset_id"
+    VERSION_METADATA_KEY = b"dataset_version"
+    VALID_UNTIL_METADATA_KEY = b"valid_until"
+
+    # Define the schema metadata key the snapshot format is stored under, and the current format (bumped whenever the way the dataframe
+    # is built changes, e.g. format 2 credits each track to its primary artist; snapshots of any other format are rebuilt)
+    FORMAT_METADATA_KEY = b"snapshot_format"
+    SNAPSHOT_FORMAT = b"2"
+
+    def __init__(self, redis_accessor, path = os.path.join("snapshots", "tracks.arrow")):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type SnapshotCache.
+
+        ARGS:
+            self - the class object
+            redis_accessor - RedisDataAccessor used to read the dataset version and rebuild the dataframe
+            path - path of the snapshot file (.arrow for Arrow IPC, .parquet for Parquet)
+
+        RETURNS: None
+        """
+
+        self.__redis_accessor = redis_accessor
+        self.__path = path
+
+    def __isParquet(self):
+
+        """
+        FUNCTION ABSTRACT: __isParquet()
+
+        DESCRIPTION: This function determines whether the snapshot is stored as Parquet (instead of Arrow IPC).
+
+        ARGS: self - the class object
+
+        RETURNS: parquet_check - boolean flag (True = Parquet, False = Arrow IPC)
+        """
+
+        return self.__path.endswith(".parquet")
+
+    def readVersion(self):
+
+        """
+        FUNCTION ABSTRACT: readVersion()
+
+        DESCRIPTION: This function reads the identity and version of the dataset the snapshot was built from, without reading any of its data.
+
+        ARGS: self - the class object
+
+        RETURNS: version - (dataset identity, dataset version) of the snapshot (or None if there is no readable snapshot, or a track in it may have expired since)
+        """
+
+        # If no snapshot was written yet, there is no version to return
+        if (os.path.exists(self.__path) == False):
+
+            return None
+
+        # Needed only for reading snapshots, so that pyarrow stays an optional dependency
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+
+        try:
+
+            # Read only the schema (and its metadata) from the snapshot
+            if (self.__isParquet() == True):
+
+                metadata = pyarrow.parquet.read_schema(self.__path).metadata
+
+            else:
+
+                with pyarrow.memory_map(self.__path, "r") as source:
+
+                    metadata = pyarrow.ipc.open_file(source).schema.metadata
+
+            # If the snapshot was built by an earlier version of the dataframe builder, treat it as missing
+            if (metadata.get(self.FORMAT_METADATA_KEY) != self.SNAPSHOT_FORMAT):
+
+                return None
+
+            # If a track in the snapshot may have been deleted since it was written, treat the snapshot as missing
+            if ((self.VALID_UNTIL_METADATA_KEY in metadata) and (time.time() >= float(metadata[self.VALID_UNTIL_METADATA_KEY]))):
+
+                return None
+
+            # If the snapshot has no dataset identity, it cannot be matched to a dataset, so treat it as missing
+            if (self.DATASET_ID_METADATA_KEY not in metadata):
+
+                return None
+
+            return metadata[self.DATASET_ID_METADATA_KEY].decode("utf-8"), int(metadata[self.VERSION_METADATA_KEY])
+
+        except Exception as error:
+
+            # A broken snapshot only costs a rebuild. Output an error message and treat it as missing.
+            print(f"ERROR: Could not read the snapshot version: {error}")
+
+            return None
+
+    def read(self, arrow = False):
+
+        """
+        FUNCTION ABSTRACT: read()
+
+        DESCRIPTION: This function loads the snapshot into a dataframe, memory-mapping the file instead of reading it into a buffer first.
+
+        ARGS:
+            self - the class object
+            arrow - flag for the dataframe's backing (True = Apache Arrow columns, False = NumPy / categorical columns)
+
+        RETURNS: track_dataframe - the dataframe stored in the snapshot
+        """
+
+        # Needed only for reading snapshots, so that pyarrow stays an optional dependency
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+
+        # Read the table, memory-mapped
+        if (self.__isParquet() == True):
+
+            table = pyarrow.parquet.read_table(self.__path, memory_map = True)
+
+        else:
+
+            with pyarrow.memory_map(self.__path, "r") as source:
+
+                table = pyarrow.ipc.open_file(source).read_all()
+
+        # Convert the table into a dataframe (the pandas metadata stored with it restores categorical columns)
+        if (arrow == True):
+
+            return table.to_pandas(types_mapper = pandas.ArrowDtype)
+
+        return table.to_pandas()
+
+    def write(self, track_dataframe, dataset_id, version, valid_until = None):
+
+        """
+        FUNCTION ABSTRACT: write()
+
+        DESCRIPTION: This function writes a dataframe to the snapshot file, tagged with the identity and version of the dataset it was built from.
+
+        ARGS:
+            self - the class object
+            track_dataframe - the dataframe to store
+            dataset_id - the identity of the dataset the dataframe was built from
+            version - the dataset version the dataframe was built from
+            valid_until - Unix time the next track set to expire is deleted, after which the snapshot is rebuilt (None = no expiry pending)
+
+        RETURNS: None
+        """
+
+        # Needed only for writing snapshots, so that pyarrow stays an optional dependency
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+
+        # Convert the dataframe into a table and tag it with the dataset identity and version (and the time it stops being current)
+        table = pyarrow.Table.from_pandas(track_dataframe, preserve_index = False)
+        metadata = {
+            **(table.schema.metadata or {}),
+            self.DATASET_ID_METADATA_KEY: dataset_id.encode("utf-8"),
+            self.VERSION_METADATA_KEY: str(version).encode("utf-8"),
+            self.FORMAT_METADATA_KEY: self.SNAPSHOT_FORMAT
+        }
+
+        if (valid_until != None):
+
+            metadata[self.VALID_UNTIL_METADATA_KEY] = str(valid_until).encode("utf-8")
+
+        table = table.replace_schema_metadata(metadata)
+
+        # Create the snapshot directory if it does not exist yet
+        directory = os.path.dirname(self.__path)
+
+        if (directory != ""):
+
+            os.makedirs(directory, exist_ok = True)
+
+        # Write the snapshot to a temporary file first, so that readers never see a partially written snapshot
+        temporary_path = self.__path + ".tmp"
+
+        if (self.__isParquet() == True):
+
+            pyarrow.parquet.write_table(table, temporary_path)
+
+        else:
+
+            # Write uncompressed, so that the file can be memory-mapped without decompressing it
+            with pyarrow.OSFile(temporary_path, "wb") as sink:
+
+                with pyarrow.ipc.new_file(sink, table.schema) as writer:
+
+                    writer.write_table(table)
+
+        # Swap the new snapshot in
+        os.replace(temporary_path, self.__path)
+
+    def load(self, arrow = False):
+
+        """
+        FUNCTION ABSTRACT: load()
+
+        DESCRIPTION:
+            This function returns the track dataframe, from the local snapshot if it is still current, or else
+            rebuilt from the Redis database (and saved as the new snapshot).
+
+        ARGS:
+            self - the class object
+            arrow - flag for the dataframe's backing (True = Apache Arrow columns, False = NumPy / categorical columns)
+
+        RETURNS: track_dataframe - a dataframe containing all of the records from the Redis database
+        """
+
+        # Read the current dataset identity and version (and the next pending expiry) first, so that an ingest running during the rebuild triggers another rebuild next time
+        dataset_id, version, next_expiry = self.__redis_accessor.getDatasetState()
+
+        # If the snapshot was built from the current version of this same dataset and none of its tracks may have expired since, load it from disk
+        if (self.readVersion() == (dataset_id, version)):
+
+            return self.read(arrow)
+
+        # Otherwise, rebuild the dataframe from the Redis database and save it as the new snapshot
+        track_dataframe = self.__redis_accessor.populateDataFrame(arrow = arrow)
+
+        self.write(track_dataframe, dataset_id, version, next_expiry)
+
+        return track_dataframe
@@ -1,12 +1,32 @@
 # Needed for encoding Spotify API access token request data
 import base64 
 
-# Needed for sending HTTP requests to Spotify API
-from requests import post, get
+# Needed for sending HTTP requests to Spotify API over a pooled, keep-alive session
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+# Needed for retrying failed HTTP requests with backoff
+from urllib3.util.retry import Retry
 
 # Needed to utilize JSON data returned by Spotify API containing access token
 import json
 
+# Needed for tracking access token expiry and persisting the cached token to disk
+import os
+import time
+
+# Needed for refreshing the cached access token safely from several worker threads
+import threading
+
+# Needed for fetching the top tracks of many artists concurrently
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Needed for keeping requests within Spotify's rate limit
+from RequestScheduler import RequestScheduler
+
+# Needed for recording request latencies, byte counts and cache hit rates
+from Metrics import metrics
+
 class SpotifyDataAccessor:
 
     """
@@ -15,7 +35,11 @@ class SpotifyDataAccessor:
     DESCRIPTION: This class utilizes the Spotify API to query and retrieve data.
     """
 
-    def __init__(self, client_id, client_secret):
+    def __init__(self, client_id, client_secret, pool_size = 10, timeout = 10, max_retries = 3, backoff_factor = 0.5,
+                 requests_per_second = 10, burst = None, max_throttle_retries = 5,
+                 token_refresh_margin = 60, token_cache_file = None, token_cache_redis = None,
+                 artist_id_cache = None, response_cache = None,
+                 api_url = "https://api.spotify.com", accounts_url = "https://accounts.spotify.com"):
 
         """
         FUNCTION ABSTRACT: Constructor
@@ -26,19 +50,345 @@ class SpotifyDataAccessor:
             self - the class object
             client_id - client ID key from Spotify developer account
             client_secret - client secret key from Spotify developer account
+            pool_size - maximum number of keep-alive connections kept open per Spotify host
+            timeout - number of seconds to wait on a Spotify API response before giving up
+            max_retries - number of times a failed request (connection error or 5xx response) is retried
+            backoff_factor - base number of seconds to wait between retries (doubles on every retry)
+            requests_per_second - sustained number of requests per second allowed by the request scheduler
+            burst - maximum number of requests the scheduler lets through at once (defaults to requests_per_second)
+            max_throttle_retries - number of times a request answered with 429 is queued again before it is dropped
+            token_refresh_margin - number of seconds before expiry at which the cached access token is refreshed
+            token_cache_file - optional path of a file the access token is persisted to and shared through
+            token_cache_redis - optional Redis connection the access token is persisted to and shared through
+            artist_id_cache - optional ArtistIdCache used to skip the search request for already-resolved artist names
+            response_cache - optional ResponseCache used to serve and revalidate top-tracks responses
+            api_url - base URL of the Spotify Web API (overridden to point at a local stand-in server, e.g. by the benchmarks)
+            accounts_url - base URL of the Spotify accounts service that issues access tokens
 
         RETURNS: None
         """
 
         self.__client_id = client_id
         self.__client_secret = client_secret
+        self.__timeout = timeout
+        self.__api_url = api_url.rstrip("/")
+        self.__accounts_url = accounts_url.rstrip("/")
+
+        # Create one session shared by every call, so that connections to Spotify are reused instead of reopened
+        self.__session = self.createSession(pool_size, max_retries, backoff_factor)
+
+        # Create one scheduler shared by every call, so that all worker threads share a single request budget
+        self.__scheduler = RequestScheduler(requests_per_second, burst, max_throttle_retries)
+
+        # Define the access token cache (the token is requested lazily on the first call that needs it)
+        self.__access_token = None
+        self.__token_expires_at = 0.0
+        self.__token_refresh_margin = token_refresh_margin
+        self.__token_cache_file = token_cache_file
+        self.__token_cache_redis = token_cache_redis
+        self.__token_lock = threading.Lock()
+
+        # Define the artist name to Spotify ID cache (None = always search)
+        self.__artist_id_cache = artist_id_cache
+
+        # Define the HTTP response cache (None = always download)
+        self.__response_cache = response_cache
+
+    def createSession(self, pool_size, max_retries, backoff_factor):
+
+        """
+        FUNCTION ABSTRACT: createSession()
+
+        DESCRIPTION:
+            This function builds the HTTP session used for every request to the Spotify API. The session
+            keeps a pool of warm keep-alive connections and retries failed requests with exponential backoff.
+
+        ARGS:
+            self - the class object
+            pool_size - maximum number of keep-alive connections kept open per Spotify host
+            max_retries - number of times a failed request (connection error or 5xx response) is retried
+            backoff_factor - base number of seconds to wait between retries (doubles on every retry)
+
+        RETURNS: session - the configured HTTP session
+        """
+
+        # Define the retry policy (only idempotent GETs and the token POST are ever sent, so both are safe to retry)
+        retry = Retry(
+            total = max_retries,
+            backoff_factor = backoff_factor,
+            status_forcelist = [500, 502, 503, 504],
+            allowed_methods = ["GET", "POST"],
+            raise_on_status = False,
+
+            # Hand 429 responses back instead of sleeping on them here, so that the request scheduler pauses every worker
+            respect_retry_after_header = False
+        )
+
+        # Define a connection pool large enough for every worker thread to hold its own connection
+        adapter = HTTPAdapter(pool_connections = pool_size, pool_maxsize = pool_size, max_retries = retry)
+
+        # Mount the adapter on a new session for all HTTPS traffic (and plain HTTP, used by local stand-in servers)
+        session = Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        # Return the configured session
+        return session
+
+    def close(self):
+
+        """
+        FUNCTION ABSTRACT: close()
+
+        DESCRIPTION: This function closes the shared HTTP session and every pooled connection it holds.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        self.__session.close()
+
+    def getRequestStatistics(self):
+
+        """
+        FUNCTION ABSTRACT: getRequestStatistics()
+
+        DESCRIPTION: This function returns the request scheduler counters (requests, throttled, retried and dropped).
+
+        ARGS: self - the class object
+
+        RETURNS: statistics - Python dictionary of request scheduler counters
+        """
+
+        return self.__scheduler.getStatistics()
+
+    def __sendRequest(self, method, url, authorize = True, endpoint = "api", **kwargs):
+
+        """
+        FUNCTION ABSTRACT: __sendRequest()
+
+        DESCRIPTION:
+            This function sends one HTTP request through the shared session once the request scheduler allows it.
+            A 429 (Too Many Requests) response pauses the scheduler for the Retry-After period and queues the
+            request again, until the retry limit is reached and the request is dropped. A 401 (Unauthorized)
+            response discards the cached access token and sends the request once more with a fresh one. If no
+            access token can be retrieved, the request is not sent at all.
+
+        ARGS:
+            self - the class object
+            method - HTTP method of the request (GET or POST)
+            url - URL to send the request to
+            authorize - flag for whether to add the Spotify authorization header (True = add, False = do not add)
+            endpoint - name the request's metrics are recorded under (token, search, top_tracks, ...)
+            kwargs - any other arguments for the request (headers, data, ...)
+
+        RETURNS: response - the HTTP response, or None if the request was dropped after too many 429 responses (or no access token could be retrieved)
+        """
+
+        # Define a counter for the number of times this request has been throttled
+        throttle_count = 0
+
+        # Define a flag for whether the access token has already been refreshed for this request
+        token_refreshed = False
+
+        # Save off any headers passed in so the authorization header can be added to a copy of them
+        headers = dict(kwargs.pop("headers", None) or {})
+
+        while True:
+
+            # Start from the headers passed in for every attempt
+            request_headers = dict(headers)
+
+            # If the request needs authorization, add the header for the current (cached) access token, remembering which token was sent
+            access_token = None
+
+            if (authorize == True):
+
+                access_token = self.getAccessToken()
+
+                # If no access token could be retrieved, fail the request instead of sending it unauthorized (Spotify would answer with 401)
+                if (access_token == None):
+
+                    print(f"ERROR: Request not sent, since no access token could be retrieved: {url}")
+
+                    return None
+
+                request_headers.update(self.getAuthorizationHeader(access_token))
+
+            # Wait for the scheduler to let this request through
+            self.__scheduler.acquire()
+
+            # Send the request over the shared session
+            with metrics.timer("spotify_request_seconds", {"endpoint": endpoint}):
+
+                response = self.__session.request(method, url, headers = request_headers, timeout = self.__timeout, **kwargs)
+
+            # Count the request and the bytes it downloaded
+            if (metrics.enabled == True):
+
+                metrics.increment("spotify_requests_total", 1, {"endpoint": endpoint, "status": str(response.status_code)})
+                metrics.increment("spotify_response_bytes_total", len(response.content), {"endpoint": endpoint})
+
+            # If the access token was rejected (e.g. revoked or expired early), refresh it and send the request once more
+            if ((response.status_code == 401) and (authorize == True) and (token_refreshed == False)):
+
+                self.invalidateAccessToken(access_token)
+                token_refreshed = True
+
+                continue
+
+            # If Spotify did not throttle the request, return the response
+            if (response.status_code != 429):
+
+                return response
+
+            # Spotify throttled the request. Pause every caller for the Retry-After period.
+            self.__scheduler.recordThrottle(response.headers.get("Retry-After"))
+
+            # If this request has already been throttled too many times...
+            if (throttle_count >= self.__scheduler.getMaxThrottleRetries()):
+
+                # Give up on the request. Output an error message and exit the function.
+                print(f"ERROR: Request dropped after being throttled {throttle_count + 1} times: {url}")
+
+                self.__scheduler.recordDrop()
+
+                return None
+
+            # Otherwise, queue the request again
+            throttle_count = throttle_count + 1
+            self.__scheduler.recordRetry()
+
+    def getCacheStatistics(self):
+
+        """
+        FUNCTION ABSTRACT: getCacheStatistics()
+
+        DESCRIPTION: This function returns the counters of every configured cache (artist ID cache and response cache).
+
+        ARGS: self - the class object
+
+        RETURNS: statistics - Python dictionary of cache counters, keyed by cache name
+        """
+
+        # Define an empty dictionary to pack with the counters of each configured cache
+        statistics = {}
+
+        if (self.__artist_id_cache != None):
+
+            statistics["artist_id_cache"] = self.__artist_id_cache.getStatistics()
+
+        if (self.__response_cache != None):
+
+            statistics["response_cache"] = self.__response_cache.getStatistics()
+
+        return statistics
+
+    def __getCachedJson(self, url, endpoint = "api"):
+
+        """
+        FUNCTION ABSTRACT: __getCachedJson()
+
+        DESCRIPTION:
+            This function sends a GET request through the response cache. A fresh cached payload is returned
+            without contacting Spotify, a stale one is revalidated with a conditional request (a 304 response
+            reuses the cached payload), and anything else is downloaded in full and cached.
+
+        ARGS:
+            self - the class object
+            url - URL to send the GET request to
+            endpoint - name the request's metrics are recorded under (see __sendRequest())
+
+        RETURNS: json_request - Python dictionary decoded from the response payload (or None if the request failed)
+        """
+
+        # If no response cache was given, always download the response
+        if (self.__response_cache == None):
+
+            request = self.__sendRequest("GET", url, endpoint = endpoint)
+
+            if (self.checkResponse(request) == False):
+
+                return None
+
+            return json.loads(request.content)
+
+        # Look up the cached entry for this URL
+        entry = self.__response_cache.get(url)
+
+        # If the cached entry is fresh, serve it without contacting Spotify
+        if ((entry != None) and (self.__response_cache.isFresh(entry) == True)):
+
+            self.__response_cache.recordHit()
+            metrics.increment("cache_requests_total", 1, {"cache": "response", "result": "hit"})
+
+            return json.loads(entry["body"])
+
+        # If a stale entry exists, ask Spotify to answer with 304 when it is still current
+        headers = self.__response_cache.getConditionalHeaders(entry) if entry != None else {}
+
+        # Send a GET request to the Spotify API
+        request = self.__sendRequest("GET", url, endpoint = endpoint, headers = headers)
+
+        # If Spotify confirmed the stale entry is unchanged, mark it fresh again and serve it
+        if ((request != None) and (request.status_code == 304) and (entry != None)):
+
+            self.__response_cache.recordRevalidation()
+            metrics.increment("cache_requests_total", 1, {"cache": "response", "result": "revalidated"})
+            self.__response_cache.refresh(url, entry)
+
+            return json.loads(entry["body"])
+
+        # If the request failed, exit the function
+        if (self.checkResponse(request) == False):
+
+            return None
+
+        # Cache the full response along with its validators
+        self.__response_cache.recordMiss()
+        metrics.increment("cache_requests_total", 1, {"cache": "response", "result": "miss"})
+        self.__response_cache.store(url, request.text, request.headers.get("ETag"), request.headers.get("Last-Modified"))
+
+        return json.loads(request.content)
+
+    def checkResponse(self, response):
+
+        """
+        FUNCTION ABSTRACT: checkResponse()
+
+        DESCRIPTION: This function determines whether a request to the Spotify API succeeded.
+
+        ARGS:
+            self - the class object
+            response - the HTTP response returned by __sendRequest() (or None if the request was dropped)
+
+        RETURNS: response_check - boolean flag (True = pass, False = fail)
+        """
+
+        # If the request was dropped, it did not succeed
+        if (response == None):
+
+            return False
+
+        # If Spotify returned an error status, output an error message
+        if (response.status_code != 200):
+
+            print(f"ERROR: Spotify API returned HTTP {response.status_code} for {response.url}")
+
+            return False
+
+        # The request succeeded
+        return True
 
     def requestAccessToken(self):
         
         """
         FUNCTION ABSTRACT: requestAccessToken()
 
-        DESCRIPTION: This function builds and sends a POST request to receive an access token from the Spotify API.
+        DESCRIPTION:
+            This function builds and sends a POST request to receive an access token from the Spotify API.
+            The token is cached along with its expiry time (and persisted, if a token cache was configured).
 
         ARGS: self - the class object
 
@@ -53,7 +403,7 @@ class SpotifyDataAccessor:
         auth_base64 = str(base64.b64encode(auth_bytes), "utf-8")
 
         # Define the URL to request an access key from
-        url = "https://accounts.spotify.com/api/token"
+        url = f"{self.__accounts_url}/api/token"
 
         # Define the headers necessary for the POST request to the above URL
         headers = {"Authorization": "Basic " + auth_base64, "Content-Type": "application/x-www-form-urlencoded"}
@@ -62,7 +412,14 @@ class SpotifyDataAccessor:
         data = {"grant_type": "client_credentials"}
 
         # Send a POST request to the Spotify API to receive an access token (returned in JSON format / stored in request.content)
-        request = post(url, headers = headers, data = data)
+        request = self.__sendRequest("POST", url, authorize = False, endpoint = "token", headers = headers, data = data)
+
+        # If the request failed, there is no access token to return
+        if (self.checkResponse(request) == False):
+
+            print("ERROR: Could not retrieve an access token...")
+
+            return None
 
         # Convert received JSON data into a Python dictionary by using json.loads (load from string)
         json_request = json.loads(request.content)
@@ -70,10 +427,245 @@ class SpotifyDataAccessor:
         # Retrieve the access token from the json_request Python dictionary
         access_token = json_request["access_token"]
 
+        # Cache the access token along with the time it expires at (Spotify tokens are valid for expires_in seconds)
+        self.__access_token = access_token
+        self.__token_expires_at = time.time() + json_request.get("expires_in", 3600)
+
+        # Persist the access token so that other processes can share it
+        self.__saveCachedToken()
+
         # Return the access token
         return access_token
+
+    def getAccessToken(self):
+
+        """
+        FUNCTION ABSTRACT: getAccessToken()
+
+        DESCRIPTION:
+            This function returns a valid access token. The cached token is reused until it is within
+            token_refresh_margin seconds of expiring; it is then taken from the persisted token cache (if
+            another process already refreshed it) or requested again. Only one thread refreshes at a time.
+
+        ARGS: self - the class object
+
+        RETURNS: access_token - access token retrieved from Spotify API (or None if one could not be retrieved)
+        """
+
+        # If the cached token is still valid, return it without taking the lock
+        if (self.__isTokenFresh() == True):
+
+            return self.__access_token
+
+        with self.__token_lock:
+
+            # Another thread may have refreshed the token while this thread waited on the lock
+            if (self.__isTokenFresh() == True):
+
+                return self.__access_token
+
+            # Try the persisted token cache before requesting a new token from Spotify
+            self.__loadCachedToken()
+
+            if (self.__isTokenFresh() == True):
+
+                return self.__access_token
+
+            # Request (and cache) a new access token
+            return self.requestAccessToken()
+
+    def invalidateAccessToken(self, rejected_token = None):
+
+        """
+        FUNCTION ABSTRACT: invalidateAccessToken()
+
+        DESCRIPTION:
+            This function discards the cached access token so that the next call requests a new one. When several
+            threads are rejected with the same old token, only the first discards it; the others find a newer
+            token already cached and keep it.
+
+        ARGS:
+            self - the class object
+            rejected_token - the access token Spotify rejected (None = discard whatever token is cached)
+
+        RETURNS: None
+        """
+
+        with self.__token_lock:
+
+            # If another thread already replaced the rejected token, keep the new one
+            if ((rejected_token != None) and (self.__access_token != rejected_token)):
+
+                return
+
+            self.__access_token = None
+            self.__token_expires_at = 0.0
+
+            # Remove the persisted token too (unless another process already replaced it), so that other processes do not pick up the rejected token
+            try:
+
+                if ((self.__token_cache_redis != None) and (self.__isPersistedToken(self.__token_cache_redis.get(self.__getTokenCacheKey()), rejected_token) == True)):
+
+                    self.__token_cache_redis.delete(self.__getTokenCacheKey())
+
+                if ((self.__token_cache_file != None) and (os.path.exists(self.__token_cache_file))):
+
+                    with open(self.__token_cache_file, "r") as file:
+
+                        cached_token = file.read()
+
+                    if (self.__isPersistedToken(cached_token, rejected_token) == True):
+
+                        os.remove(self.__token_cache_file)
+
+            except Exception as error:
+
+                # A broken token cache only costs one extra token request later. Output an error message and continue.
+                print(f"ERROR: Could not remove the cached access token: {error}")
+
+    def __isPersistedToken(self, cached_token, rejected_token):
+
+        """
+        FUNCTION ABSTRACT: __isPersistedToken()
+
+        DESCRIPTION: This function determines whether a persisted token cache entry holds the rejected access token (and should be removed).
+
+        ARGS:
+            self - the class object
+            cached_token - the JSON-encoded token cache entry (or None if there is none)
+            rejected_token - the access token Spotify rejected (None = any token counts as rejected)
+
+        RETURNS: rejected_check - boolean flag (True = the entry holds the rejected token, False = it is missing or holds another token)
+        """
+
+        if (cached_token == None):
+
+            return False
+
+        if (rejected_token == None):
+
+            return True
+
+        try:
+
+            return json.loads(cached_token)["access_token"] == rejected_token
+
+        except Exception:
+
+            # An unreadable entry is of no use to anyone, so it counts as rejected
+            return True
+
+    def __isTokenFresh(self):
+
+        """
+        FUNCTION ABSTRACT: __isTokenFresh()
+
+        DESCRIPTION: This function determines whether the cached access token is valid for at least token_refresh_margin more seconds.
+
+        ARGS: self - the class object
+
+        RETURNS: freshness_check - boolean flag (True = fresh, False = missing or about to expire)
+        """
+
+        return (self.__access_token != None) and (time.time() < (self.__token_expires_at - self.__token_refresh_margin))
+
+    def __getTokenCacheKey(self):
+
+        """
+        FUNCTION ABSTRACT: __getTokenCacheKey()
+
+        DESCRIPTION: This function returns the Redis key the access token is persisted under (one per Spotify client ID).
+
+        ARGS: self - the class object
+
+        RETURNS: key - the Redis key for the persisted access token
+        """
+
+        return f"spotify:access_token:{self.__client_id}"
+
+    def __loadCachedToken(self):
+
+        """
+        FUNCTION ABSTRACT: __loadCachedToken()
+
+        DESCRIPTION: This function loads the access token and its expiry time from the persisted token cache, if one was configured.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        # Define an empty value to fill from whichever token cache is configured
+        cached_token = None
+
+        try:
+
+            # Prefer the Redis token cache, since it is shared between hosts
+            if (self.__token_cache_redis != None):
+
+                cached_token = self.__token_cache_redis.get(self.__getTokenCacheKey())
+
+            # Otherwise, fall back to the file token cache
+            elif ((self.__token_cache_file != None) and (os.path.exists(self.__token_cache_file))):
+
+                with open(self.__token_cache_file, "r") as file:
+
+                    cached_token = file.read()
+
+            # If a cached token was found, decode it and use it
+            if (cached_token != None):
+
+                token_data = json.loads(cached_token)
+
+                self.__access_token = token_data["access_token"]
+                self.__token_expires_at = token_data["expires_at"]
+
+        except Exception as error:
+
+            # A broken token cache only costs one extra token request. Output an error message and continue.
+            print(f"ERROR: Could not load the cached access token: {error}")
+
+    def __saveCachedToken(self):
+
+        """
+        FUNCTION ABSTRACT: __saveCachedToken()
+
+        DESCRIPTION: This function persists the access token and its expiry time to the token cache, if one was configured.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        # Encode the token and its expiry time as JSON
+        token_data = json.dumps({"access_token": self.__access_token, "expires_at": self.__token_expires_at})
+
+        try:
+
+            # Store the token in Redis, letting Redis expire it when Spotify does
+            if (self.__token_cache_redis != None):
+
+                time_to_live = max(1, int(self.__token_expires_at - time.time()))
+
+                self.__token_cache_redis.set(self.__getTokenCacheKey(), token_data, ex = time_to_live)
+
+            # Store the token on disk, readable only by the current user, and swap it in atomically
+            if (self.__token_cache_file != None):
+
+                temporary_file = self.__token_cache_file + ".tmp"
+
+                with os.fdopen(os.open(temporary_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as file:
+
+                    file.write(token_data)
+
+                os.replace(temporary_file, self.__token_cache_file)
+
+        except Exception as error:
+
+            # A broken token cache only costs one extra token request later. Output an error message and continue.
+            print(f"ERROR: Could not persist the access token: {error}")
     
-    def getAuthorizationHeader(self, access_token):
+    def getAuthorizationHeader(self, access_token = None):
 
         """
         FUNCTION ABSTRACT: getAuthorizationHeader()
@@ -82,11 +674,21 @@ class SpotifyDataAccessor:
 
         ARGS:
             self - the class object
-            access_token - access token retrieved from Spotify API
+            access_token - the access token to authorize with (None = the cached, or refreshed, access token)
 
         RETURNS: authorization header - expected header for any POST requests to the Spotify API
         """
 
+        # Call getAccessToken() to get the cached (or refreshed) access token, unless one was passed in
+        if (access_token == None):
+
+            access_token = self.getAccessToken()
+
+        # If no access token could be retrieved, send no authorization header (Spotify will answer with 401)
+        if (access_token == None):
+
+            return {}
+
         return {"Authorization": "Bearer " + access_token}
     
     def checkTypeLegalities(self, type):
@@ -115,7 +717,7 @@ class SpotifyDataAccessor:
         # Return the result of the type legality check
         return legality_check
     
-    def getSpotifyData(self, access_token, name, type):
+    def getSpotifyData(self, name, type):
 
         """
         FUNCTION ABSTRACT: getSpotifyData()
@@ -126,7 +728,6 @@ class SpotifyDataAccessor:
 
         ARGS:
             self - the class object
-            access_token - access token retrieved from Spotify API
             name - name of the item
             type - type of item (artist, album, or track)
 
@@ -142,19 +743,19 @@ class SpotifyDataAccessor:
             return None
 
         # Define the URL to request a Spotify ID from
-        url = "https://api.spotify.com/v1/search"
+        url = f"{self.__api_url}/v1/search"
 
-        # Call getAuthorizationHeader() to get the headers necessary for the GET request to the above URL
-        headers = self.getAuthorizationHeader(access_token)
+        # Define the query that the Spotify API will use to get a specified item's ID (will always grab the most popular item match).
+        # It is passed as parameters so that requests URL-encodes it (names such as "Simon & Garfunkel" contain &, + or #)
+        query = {"q": name, "type": type, "limit": 1}
 
-        # Define the query that the Spotify API will use to get a specified item's ID (will always grab the most popular item match)
-        query = f"?q={name}&type={type}&limit=1"
+        # Send a GET request to the Spotify API to receive an item id (returned in JSON format / stored in request.content)
+        request = self.__sendRequest("GET", url, endpoint = "search", params = query)
 
-        # Combine the URL and the query into in Spotify's expected format
-        query_url = url + query
+        # If the request failed (e.g. it was dropped after repeated throttling), exit the function
+        if (self.checkResponse(request) == False):
 
-        # Send a GET request to the Spotify API to receive an item id (returned in JSON format / stored in request.content)
-        request = get(query_url, headers = headers)
+            return None
 
         # Convert received JSON data into a Python dictionary by using json.loads (load from string)
         json_request = json.loads(request.content)[type + "s"]["items"]
@@ -170,7 +771,56 @@ class SpotifyDataAccessor:
         # Return the data retrieved for this item
         return json_request[0]
 
-    def getTopTracksForArtist(self, access_token, artist_name):
+    def resolveArtistId(self, artist_name):
+
+        """
+        FUNCTION ABSTRACT: resolveArtistId()
+
+        DESCRIPTION:
+            This function returns the Spotify ID for an artist name. The artist ID cache is checked first,
+            and the Spotify API is only searched (and the result cached) when the name is not cached yet.
+
+        ARGS:
+            self - the class object
+            artist_name - name of the artist
+
+        RETURNS: artist_id - Spotify ID of the artist (or None if no artist with this name exists)
+        """
+
+        # If an artist ID cache was given, check it before searching
+        if (self.__artist_id_cache != None):
+
+            artist_id = self.__artist_id_cache.get(artist_name)
+
+            # If the artist name was cached, no search is needed
+            if (artist_id != None):
+
+                metrics.increment("cache_requests_total", 1, {"cache": "artist_id", "result": "hit"})
+
+                return artist_id
+
+            metrics.increment("cache_requests_total", 1, {"cache": "artist_id", "result": "miss"})
+
+        # Call getSpotifyData() to get the data for a specified artist
+        artist = self.getSpotifyData(artist_name, "artist")
+
+        # If no items were retrieved for this artist, there is no ID to return
+        if (artist == None):
+
+            return None
+
+        # Retrieve the artist's ID from the artist Python dictionary
+        artist_id = artist["id"]
+
+        # Cache the artist ID so that later runs can skip the search
+        if (self.__artist_id_cache != None):
+
+            self.__artist_id_cache.set(artist_name, artist_id)
+
+        # Return the artist's ID
+        return artist_id
+
+    def getTopTracksForArtist(self, artist_name):
 
         """
         FUNCTION ABSTRACT: getTopTracksForArtist()
@@ -181,7 +831,6 @@ class SpotifyDataAccessor:
 
         ARGS:
             self - the class object
-            access_token - access token retrieved from Spotify API
             artist_name - name of the artist
 
         RETURNS:
@@ -196,31 +845,108 @@ class SpotifyDataAccessor:
                 + track_number - number of the track on the album
         """
 
-        # Call getSpotifyData() to get the data for a specified artist
-        artist = self.getSpotifyData(access_token, artist_name, "artist")
+        # Call resolveArtistId() to get the ID for a specified artist (from the cache when possible)
+        artist_id = self.resolveArtistId(artist_name)
 
-        # If no items were retrieved for this artist...
-        if (artist == None):
+        # If no ID was retrieved for this artist...
+        if (artist_id == None):
 
             # Spotify could not find an artist with this name. Output an error message and exit the function
             print("ERROR: Could not retrieve top tracks for this artist...")
 
             return None
+
+        # Call getTopTracksForArtistId() to get the top tracks for the resolved artist ID
+        return self.getTopTracksForArtistId(artist_id)
+
+    def getTopTracksForArtistId(self, artist_id):
+
+        """
+        FUNCTION ABSTRACT: getTopTracksForArtistId()
+
+        DESCRIPTION:
+            This function queries the Spotify API with a provided artist's Spotify ID and retrieves their
+            top 10 most popular tracks, without searching for the artist first.
+
+        ARGS:
+            self - the class object
+            artist_id - Spotify ID of the artist
+
+        RETURNS: json_request - Python dictionary containing the tracks (see getTopTracksForArtist() for the relevant fields)
+        """
         
-        # Retrieve the artist's ID from the artist Python dictionary
-        artist_id = artist["id"]
-        
-        # Define the URL to request the artist's top 10 tracks from, using the artist_id retrieved from getSpotifyData()
-        url = f"https://api.spotify.com/v1/artists/{artist_id}/top-tracks?country=US"
+        # Define the URL to request the artist's top 10 tracks from, using the given artist_id
+        url = f"{self.__api_url}/v1/artists/{artist_id}/top-tracks?country=US"
 
-        # Call getAuthorizationHeader() to get the headers necessary for the GET request to the above URL
-        headers = self.getAuthorizationHeader(access_token)
+        # Send a GET request to the Spotify API (through the response cache) to receive an artist's top 10 tracks
+        json_request = self.__getCachedJson(url, "top_tracks")
 
-        # Send a GET request to the Spotify API to receive an artist's top 10 tracks (returned in JSON format / stored in request.content)
-        request = get(url, headers = headers)
+        # If the request failed (e.g. it was dropped after repeated throttling), exit the function
+        if (json_request == None):
 
-        # Convert received JSON data into a Python dictionary by using json.loads (load from string)
-        json_request = json.loads(request.content)["tracks"]
+            print("ERROR: Could not retrieve top tracks for this artist...")
+
+            return None
+
+        # Retrieve the list of tracks from the json_request Python dictionary
+        json_request = json_request["tracks"]
 
         # Return the Python dictionary containing the top 10 tracks retrieved for this artist
         return json_request
+
+    def getTopTracksForArtists(self, artist_names, max_workers = 8, by_id = False):
+
+        """
+        FUNCTION ABSTRACT: getTopTracksForArtists()
+
+        DESCRIPTION:
+            This function retrieves the top 10 most popular tracks for many artists at once by running
+            getTopTracksForArtist() for each artist on a bounded pool of worker threads. A failure for
+            one artist does not abort the rest of the batch.
+
+        ARGS:
+            self - the class object
+            artist_names - iterable of artist names (or of Spotify artist IDs, when by_id is True)
+            max_workers - maximum number of artists being fetched at the same time
+            by_id - flag for whether artist_names holds Spotify artist IDs (True = IDs, skipping search entirely)
+
+        RETURNS:
+            tracks_by_artist - Python dictionary keyed by artist name (or ID), where each value is the list of
+            tracks returned by getTopTracksForArtist() (or None if the artist could not be retrieved)
+        """
+
+        # Define an empty dictionary to pack with the tracks retrieved for each artist
+        tracks_by_artist = {}
+
+        # Remove duplicate artist names while preserving the order they were given in
+        unique_names = list(dict.fromkeys(artist_names))
+
+        # Choose whether each artist needs resolving by name first or can go straight to its top tracks
+        fetch_function = self.getTopTracksForArtistId if by_id == True else self.getTopTracksForArtist
+
+        # Use a bounded pool of worker threads so that the number of requests in flight stays limited
+        with ThreadPoolExecutor(max_workers = max_workers) as executor:
+
+            # Submit the search-then-top-tracks chain for every artist, remembering which artist each future belongs to
+            futures = {executor.submit(fetch_function, name): name for name in unique_names}
+
+            # As each artist finishes (in whatever order they complete)...
+            for future in as_completed(futures):
+
+                # Look up which artist this future was fetching
+                artist_name = futures[future]
+
+                try:
+
+                    # Save off the tracks retrieved for this artist
+                    tracks_by_artist[artist_name] = future.result()
+
+                except Exception as error:
+
+                    # Something went wrong for this artist only. Output an error message and keep going with the rest of the batch
+                    print(f"ERROR: Could not retrieve top tracks for {artist_name}: {error}")
+
+                    tracks_by_artist[artist_name] = None
+
+        # Return the tracks for every artist, in the same order the artist names were given in
+        return {name: tracks_by_artist[name] for name in unique_names}
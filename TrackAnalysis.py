@@ -0,0 +1,521 @@
+# Needed for vectorized statistics
+import numpy
+
+class LinearFitStatistics:
+
+    """
+    CLASS ABSTRACT: LinearFitStatistics
+
+    DESCRIPTION:
+        This class keeps the sufficient statistics of a straight-line fit of y on x (count, sums, sums of squares
+        and the cross product). They can be accumulated one chunk at a time, so the fit never needs all of the
+        data in memory at once.
+    """
+
+    def __init__(self):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type LinearFitStatistics.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        self.count = 0
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+        self.sum_xx = 0.0
+        self.sum_xy = 0.0
+        self.sum_yy = 0.0
+
+    def update(self, x, y):
+
+        """
+        FUNCTION ABSTRACT: update()
+
+        DESCRIPTION: This function adds a chunk of (x, y) pairs to the sufficient statistics.
+
+        ARGS:
+            self - the class object
+            x - array of x values
+            y - array of y values (the same length as x)
+
+        RETURNS: None
+        """
+
+        # Convert to 64-bit floats, so that products of compact integer columns (e.g. uint8 popularity) cannot overflow
+        x = numpy.asarray(x, dtype = numpy.float64)
+        y = numpy.asarray(y, dtype = numpy.float64)
+
+        self.count = self.count + len(x)
+        self.sum_x = self.sum_x + x.sum()
+        self.sum_y = self.sum_y + y.sum()
+        self.sum_xx = self.sum_xx + numpy.dot(x, x)
+        self.sum_xy = self.sum_xy + numpy.dot(x, y)
+        self.sum_yy = self.sum_yy + numpy.dot(y, y)
+
+    def getFit(self):
+
+        """
+        FUNCTION ABSTRACT: getFit()
+
+        DESCRIPTION: This function solves the least-squares line from the sufficient statistics.
+
+        ARGS: self - the class object
+
+        RETURNS: fit - LinearFitResult holding the count, slope, intercept and correlation (None when undefined)
+        """
+
+        # Define the centered sums of squares and cross products
+        variance_x = self.sum_xx - ((self.sum_x * self.sum_x) / self.count) if self.count > 0 else 0.0
+        variance_y = self.sum_yy - ((self.sum_y * self.sum_y) / self.count) if self.count > 0 else 0.0
+        covariance = self.sum_xy - ((self.sum_x * self.sum_y) / self.count) if self.count > 0 else 0.0
+
+        # If x never varies, no line can be fitted
+        if (variance_x <= 0):
+
+            return LinearFitResult(self.count, None, None, None)
+
+        slope = covariance / variance_x
+        intercept = (self.sum_y - (slope * self.sum_x)) / self.count
+
+        # The correlation is undefined when y never varies
+        r = covariance / numpy.sqrt(variance_x * variance_y) if variance_y > 0 else None
+
+        return LinearFitResult(self.count, float(slope), float(intercept), None if r == None else float(r))
+
+class LinearFitResult:
+
+    """
+    CLASS ABSTRACT: LinearFitResult
+
+    DESCRIPTION: This class holds a straight-line fit of y on x (y = intercept + slope * x).
+    """
+
+    def __init__(self, count, slope, intercept, r):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type LinearFitResult.
+
+        ARGS:
+            self - the class object
+            count - number of points the line was fitted to
+            slope - change in y per unit of x (None if x never varies)
+            intercept - value of y at x = 0 (None if x never varies)
+            r - Pearson correlation coefficient between x and y (None if x or y never varies)
+
+        RETURNS: None
+        """
+
+        self.count = count
+        self.slope = slope
+        self.intercept = intercept
+        self.r = r
+
+    def predict(self, x):
+
+        """
+        FUNCTION ABSTRACT: predict()
+
+        DESCRIPTION: This function evaluates the fitted line.
+
+        ARGS:
+            self - the class object
+            x - value (or array of values) of x
+
+        RETURNS: y - the fitted value(s) of y (None if no line could be fitted)
+        """
+
+        if (self.slope == None):
+
+            return None
+
+        return self.intercept + (self.slope * numpy.asarray(x, dtype = numpy.float64))
+
+class DurationPopularityResult:
+
+    """
+    CLASS ABSTRACT: DurationPopularityResult
+
+    DESCRIPTION: This class holds the result of Analysis 1 (duration vs. popularity).
+    """
+
+    def __init__(self, fit):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type DurationPopularityResult.
+
+        ARGS:
+            self - the class object
+            fit - LinearFitResult of duration (ms) on popularity
+
+        RETURNS: None
+        """
+
+        self.fit = fit
+
+class ExplicitPopularityResult:
+
+    """
+    CLASS ABSTRACT: ExplicitPopularityResult
+
+    DESCRIPTION: This class holds the result of Analysis 2 (explicit language vs. popularity).
+    """
+
+    def __init__(self, fit, explicit_count, explicit_mean, explicit_std, clean_count, clean_mean, clean_std):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type ExplicitPopularityResult.
+
+        ARGS:
+            self - the class object
+            fit - LinearFitResult of the explicit flag (0 / 1) on popularity
+            explicit_count - number of explicit tracks
+            explicit_mean - average popularity of explicit tracks (None if there are none)
+            explicit_std - standard deviation of the popularity of explicit tracks (None if there are none)
+            clean_count - number of tracks without explicit language
+            clean_mean - average popularity of tracks without explicit language (None if there are none)
+            clean_std - standard deviation of the popularity of tracks without explicit language (None if there are none)
+
+        RETURNS: None
+        """
+
+        self.fit = fit
+        self.explicit_count = explicit_count
+        self.explicit_mean = explicit_mean
+        self.explicit_std = explicit_std
+        self.clean_count = clean_count
+        self.clean_mean = clean_mean
+        self.clean_std = clean_std
+
+        # Define the share of tracks that are explicit
+        total_count = explicit_count + clean_count
+        self.explicit_ratio = (explicit_count / total_count) if total_count > 0 else 0.0
+
+class ArtistPopularityResult:
+
+    """
+    CLASS ABSTRACT: ArtistPopularityResult
+
+    DESCRIPTION:
+        This class holds the result of Analysis 3 (artist vs. popularity): the popularity distribution of
+        each artist, as parallel arrays ordered from the highest to the lowest average popularity.
+    """
+
+    # Define the lower edges of the popularity histogram bins (the last bin, 90, also holds 100)
+    BIN_EDGES = numpy.arange(0, 100, 10)
+
+    def __init__(self, artists, counts, means, stds, minimums, maximums, histograms):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type ArtistPopularityResult.
+
+        ARGS:
+            self - the class object
+            artists - array of artist names
+            counts - array of track counts per artist
+            means - array of average popularity per artist
+            stds - array of popularity standard deviations per artist
+            minimums - array of lowest popularity per artist
+            maximums - array of highest popularity per artist
+            histograms - 2-D array of track counts per artist (rows) and popularity bin (columns, see BIN_EDGES)
+
+        RETURNS: None
+        """
+
+        self.artists = artists
+        self.counts = counts
+        self.means = means
+        self.stds = stds
+        self.minimums = minimums
+        self.maximums = maximums
+        self.histograms = histograms
+
+    def toDict(self):
+
+        """
+        FUNCTION ABSTRACT: toDict()
+
+        DESCRIPTION: This function returns the result as a Python dictionary keyed by artist name.
+
+        ARGS: self - the class object
+
+        RETURNS: artists - Python dictionary of artist name -> count / mean / std / min / max / histogram
+        """
+
+        return {
+            str(artist): {
+                "count": int(self.counts[index]),
+                "mean": float(self.means[index]),
+                "std": float(self.stds[index]),
+                "min": float(self.minimums[index]),
+                "max": float(self.maximums[index]),
+                "histogram": self.histograms[index].tolist()
+            }
+            for index, artist in enumerate(self.artists)
+        }
+
+class TrackAnalysisResults:
+
+    """
+    CLASS ABSTRACT: TrackAnalysisResults
+
+    DESCRIPTION: This class holds the results of all three analyses.
+    """
+
+    def __init__(self, duration, explicit, artists):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type TrackAnalysisResults.
+
+        ARGS:
+            self - the class object
+            duration - DurationPopularityResult of Analysis 1
+            explicit - ExplicitPopularityResult of Analysis 2
+            artists - ArtistPopularityResult of Analysis 3
+
+        RETURNS: None
+        """
+
+        self.duration = duration
+        self.explicit = explicit
+        self.artists = artists
+
+class IncrementalTrackStatistics:
+
+    """
+    CLASS ABSTRACT: IncrementalTrackStatistics
+
+    DESCRIPTION:
+        This class computes the statistics behind the three analyses (duration vs. popularity, explicit language
+        vs. popularity, artist vs. popularity) incrementally, one dataframe chunk at a time, e.g. over
+        RedisDataAccessor.iterDataFrames(). Memory use is bounded by the chunk size and the number of artists,
+        not by the number of tracks.
+    """
+
+    def __init__(self):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type IncrementalTrackStatistics.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        # Define the line fits of duration on popularity and of the explicit flag on popularity
+        self.__duration_fit = LinearFitStatistics()
+        self.__explicit_fit = LinearFitStatistics()
+
+        # Define the popularity count / sum / sum of squares of explicit and clean tracks
+        self.__explicit_groups = {True: [0, 0.0, 0.0], False: [0, 0.0, 0.0]}
+
+        # Define the popularity count / sum / sum of squares / minimum / maximum / histogram of each artist
+        self.__artist_groups = {}
+
+    def update(self, track_dataframe):
+
+        """
+        FUNCTION ABSTRACT: update()
+
+        DESCRIPTION: This function adds one dataframe chunk to the running statistics.
+
+        ARGS:
+            self - the class object
+            track_dataframe - a typed track dataframe chunk (see TrackFrameBuilder)
+
+        RETURNS: None
+        """
+
+        # Retrieve the columns as arrays (no copies for NumPy-backed columns)
+        popularity = track_dataframe["Popularity"].to_numpy(dtype = numpy.float64)
+        duration = track_dataframe["Duration (ms)"].to_numpy(dtype = numpy.float64)
+        explicit = track_dataframe["Explicit"].to_numpy(dtype = bool)
+
+        # Add the chunk to both line fits
+        self.__duration_fit.update(popularity, duration)
+        self.__explicit_fit.update(popularity, explicit)
+
+        # Add the chunk's popularity to the explicit and clean groups
+        for flag, mask in ((True, explicit), (False, ~explicit)):
+
+            group = self.__explicit_groups[flag]
+            values = popularity[mask]
+
+            group[0] = group[0] + len(values)
+            group[1] = group[1] + values.sum()
+            group[2] = group[2] + numpy.dot(values, values)
+
+        # Reduce the chunk's popularity per artist in one vectorized pass, then merge it into the running per-artist totals
+        # (the category codes are widened first: they are stored as int8 / int16, which would overflow in the histogram bin arithmetic below)
+        artist_column = track_dataframe["Artist Name"].astype("category")
+        unique_names = artist_column.cat.categories
+        codes = artist_column.cat.codes.to_numpy().astype(numpy.int64)
+
+        counts = numpy.bincount(codes, minlength = len(unique_names))
+        sums = numpy.bincount(codes, weights = popularity, minlength = len(unique_names))
+        sums_of_squares = numpy.bincount(codes, weights = popularity * popularity, minlength = len(unique_names))
+
+        minimums = numpy.full(len(unique_names), numpy.inf)
+        maximums = numpy.full(len(unique_names), -numpy.inf)
+        numpy.minimum.at(minimums, codes, popularity)
+        numpy.maximum.at(maximums, codes, popularity)
+
+        # Count each artist's tracks per popularity bin in the same pass (bin = artist code * bin count + popularity bin)
+        bin_count = len(ArtistPopularityResult.BIN_EDGES)
+        bins = numpy.minimum(popularity // 10, bin_count - 1).astype(numpy.int64)
+        histograms = numpy.bincount((codes * bin_count) + bins, minlength = len(unique_names) * bin_count).reshape(len(unique_names), bin_count)
+
+        for index, name in enumerate(unique_names):
+
+            # Skip artists that only appear in the chunk's categories, not in its rows
+            if (counts[index] == 0):
+
+                continue
+
+            group = self.__artist_groups.setdefault(name, [0, 0.0, 0.0, numpy.inf, -numpy.inf, numpy.zeros(bin_count, dtype = numpy.int64)])
+
+            group[0] = group[0] + int(counts[index])
+            group[1] = group[1] + sums[index]
+            group[2] = group[2] + sums_of_squares[index]
+            group[3] = min(group[3], minimums[index])
+            group[4] = max(group[4], maximums[index])
+            group[5] = group[5] + histograms[index]
+
+    def __summarize(self, count, total, total_of_squares):
+
+        """
+        FUNCTION ABSTRACT: __summarize()
+
+        DESCRIPTION: This function converts a count, sum and sum of squares into a mean and (population) standard deviation.
+
+        ARGS:
+            self - the class object
+            count - number of values
+            total - sum of the values
+            total_of_squares - sum of the squared values
+
+        RETURNS:
+            mean - the mean of the values (None when count is 0)
+            std - the standard deviation of the values (None when count is 0)
+        """
+
+        if (count == 0):
+
+            return None, None
+
+        mean = total / count
+
+        return float(mean), float(numpy.sqrt(max(0.0, (total_of_squares / count) - (mean * mean))))
+
+    def getResults(self):
+
+        """
+        FUNCTION ABSTRACT: getResults()
+
+        DESCRIPTION: This function returns the results of all three analyses over the chunks added so far.
+
+        ARGS: self - the class object
+
+        RETURNS: results - TrackAnalysisResults holding the duration, explicit and artist results
+        """
+
+        # Summarize the popularity of explicit and clean tracks
+        explicit_mean, explicit_std = self.__summarize(*self.__explicit_groups[True])
+        clean_mean, clean_std = self.__summarize(*self.__explicit_groups[False])
+
+        explicit = ExplicitPopularityResult(self.__explicit_fit.getFit(),
+                                            self.__explicit_groups[True][0], explicit_mean, explicit_std,
+                                            self.__explicit_groups[False][0], clean_mean, clean_std)
+
+        # Stack each artist's running totals into arrays, then summarize every artist at once
+        names = list(self.__artist_groups.keys())
+        groups = list(self.__artist_groups.values())
+
+        counts = numpy.array([group[0] for group in groups], dtype = numpy.int64)
+        sums = numpy.array([group[1] for group in groups], dtype = numpy.float64)
+        sums_of_squares = numpy.array([group[2] for group in groups], dtype = numpy.float64)
+
+        means = sums / numpy.maximum(counts, 1)
+        stds = numpy.sqrt(numpy.maximum(0.0, (sums_of_squares / numpy.maximum(counts, 1)) - (means * means)))
+
+        # Order the artists from the highest to the lowest average popularity
+        order = numpy.argsort(-means, kind = "stable")
+
+        artists = ArtistPopularityResult(
+            numpy.array(names, dtype = object)[order],
+            counts[order],
+            means[order],
+            stds[order],
+            numpy.array([group[3] for group in groups], dtype = numpy.float64)[order],
+            numpy.array([group[4] for group in groups], dtype = numpy.float64)[order],
+            numpy.array([group[5] for group in groups], dtype = numpy.int64).reshape(len(groups), len(ArtistPopularityResult.BIN_EDGES))[order]
+        )
+
+        return TrackAnalysisResults(DurationPopularityResult(self.__duration_fit.getFit()), explicit, artists)
+
+class TrackAnalyzer:
+
+    """
+    CLASS ABSTRACT: TrackAnalyzer
+
+    DESCRIPTION:
+        This class is the entry point for the three analyses. It computes the duration / popularity line fit,
+        the explicit / clean popularity comparison, and the per-artist popularity distributions in a single
+        vectorized NumPy pass over the dataframe columns (without copying column subsets into new dataframes),
+        and returns plain result objects. Plotting is left to TrackPlotter.
+    """
+
+    def analyze(self, track_dataframe):
+
+        """
+        FUNCTION ABSTRACT: analyze()
+
+        DESCRIPTION: This function runs all three analyses over a whole track dataframe.
+
+        ARGS:
+            self - the class object
+            track_dataframe - a typed track dataframe (see TrackFrameBuilder)
+
+        RETURNS: results - TrackAnalysisResults holding the duration, explicit and artist results
+        """
+
+        return self.analyzeChunks([track_dataframe])
+
+    def analyzeChunks(self, track_dataframes):
+
+        """
+        FUNCTION ABSTRACT: analyzeChunks()
+
+        DESCRIPTION: This function runs all three analyses over a series of dataframe chunks (e.g. RedisDataAccessor.iterDataFrames()).
+
+        ARGS:
+            self - the class object
+            track_dataframes - iterable of typed track dataframes
+
+        RETURNS: results - TrackAnalysisResults holding the duration, explicit and artist results
+        """
+
+        # Fold every chunk into one set of running statistics
+        statistics = IncrementalTrackStatistics()
+
+        for track_dataframe in track_dataframes:
+
+            statistics.update(track_dataframe)
+
+        return statistics.getResults()
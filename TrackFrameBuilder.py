@@ -0,0 +1,169 @@
+# Needed for compact, typed column storage
+import numpy
+
+# Needed for using dataframes
+import pandas
+
+class TrackFrameBuilder:
+
+    """
+    CLASS ABSTRACT: TrackFrameBuilder
+
+    DESCRIPTION:
+        This class builds a typed track dataframe column by column from batches of fetched values. Numeric
+        columns are converted to compact NumPy arrays as each batch arrives (instead of being held as Python
+        objects until the end), artist and album names become categoricals, popularity an 8-bit integer and
+        explicit a boolean. The dataframe can optionally be backed by Apache Arrow.
+    """
+
+    # Define the dataframe columns, in order
+    COLUMNS = ["Track Name", "Artist Name", "Album Name", "Duration (ms)", "Explicit", "Popularity"]
+
+    # Define the compact type of each numeric column (durations fit in 32 bits, popularity is 0 - 100)
+    NUMERIC_TYPES = {"Duration (ms)": numpy.int32, "Explicit": numpy.bool_, "Popularity": numpy.uint8}
+
+    # Define the text columns with few distinct values, stored as categoricals
+    CATEGORICAL_COLUMNS = ["Artist Name", "Album Name"]
+
+    def __init__(self):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type TrackFrameBuilder.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        # Define the text values of each text column, and the typed array chunks of each numeric column
+        self.__text_columns = {column: [] for column in self.COLUMNS if column not in self.NUMERIC_TYPES}
+        self.__numeric_chunks = {column: [] for column in self.NUMERIC_TYPES}
+
+        self.__row_count = 0
+
+    def getRowCount(self):
+
+        """
+        FUNCTION ABSTRACT: getRowCount()
+
+        DESCRIPTION: This function returns the number of rows appended so far.
+
+        ARGS: self - the class object
+
+        RETURNS: row_count - the number of rows
+        """
+
+        return self.__row_count
+
+    def appendBatch(self, columns):
+
+        """
+        FUNCTION ABSTRACT: appendBatch()
+
+        DESCRIPTION: This function appends a batch of rows, given as one list of values per column.
+
+        ARGS:
+            self - the class object
+            columns - Python dictionary of column name -> list of values (every list the same length)
+
+        RETURNS: None
+        """
+
+        # Extend each text column with the batch's values
+        for column, values in self.__text_columns.items():
+
+            values.extend(columns[column])
+
+        # Convert each numeric column of the batch to its compact type right away
+        for column, chunks in self.__numeric_chunks.items():
+
+            chunks.append(numpy.asarray(columns[column], dtype = self.NUMERIC_TYPES[column]))
+
+        self.__row_count = self.__row_count + len(columns[self.COLUMNS[0]])
+
+    def build(self, arrow = False):
+
+        """
+        FUNCTION ABSTRACT: build()
+
+        DESCRIPTION: This function builds the typed dataframe from every batch appended so far.
+
+        ARGS:
+            self - the class object
+            arrow - flag for the dataframe's backing (True = Apache Arrow columns, False = NumPy / categorical columns)
+
+        RETURNS: track_dataframe - the typed dataframe
+        """
+
+        # Join each numeric column's chunks into one array
+        numeric_columns = {}
+
+        for column, chunks in self.__numeric_chunks.items():
+
+            numeric_columns[column] = numpy.concatenate(chunks) if len(chunks) > 0 else numpy.empty(0, dtype = self.NUMERIC_TYPES[column])
+
+        # If an Arrow-backed dataframe was requested, build it through an Arrow table
+        if (arrow == True):
+
+            return self.__buildArrow(numeric_columns)
+
+        # Define each column with its compact type
+        typed_columns = {}
+
+        for column in self.COLUMNS:
+
+            if (column in numeric_columns):
+
+                typed_columns[column] = numeric_columns[column]
+
+            elif (column in self.CATEGORICAL_COLUMNS):
+
+                typed_columns[column] = pandas.Categorical(self.__text_columns[column])
+
+            else:
+
+                typed_columns[column] = pandas.array(self.__text_columns[column], dtype = object)
+
+        # Define the dataframe directly from the typed columns
+        return pandas.DataFrame(typed_columns)
+
+    def __buildArrow(self, numeric_columns):
+
+        """
+        FUNCTION ABSTRACT: __buildArrow()
+
+        DESCRIPTION: This function builds an Arrow-backed dataframe, with categorical columns dictionary-encoded.
+
+        ARGS:
+            self - the class object
+            numeric_columns - Python dictionary of numeric column name -> joined NumPy array
+
+        RETURNS: track_dataframe - the Arrow-backed dataframe
+        """
+
+        # Needed only for Arrow-backed dataframes, so that pyarrow stays an optional dependency
+        import pyarrow
+
+        # Define each column as an Arrow array
+        arrays = []
+
+        for column in self.COLUMNS:
+
+            if (column in numeric_columns):
+
+                arrays.append(pyarrow.array(numeric_columns[column]))
+
+            elif (column in self.CATEGORICAL_COLUMNS):
+
+                arrays.append(pyarrow.array(self.__text_columns[column], type = pyarrow.string()).dictionary_encode())
+
+            else:
+
+                arrays.append(pyarrow.array(self.__text_columns[column], type = pyarrow.string()))
+
+        # Define the Arrow table and convert it without copying into NumPy types
+        table = pyarrow.table(arrays, names = self.COLUMNS)
+
+        return table.to_pandas(types_mapper = pandas.ArrowDtype)
@@ -0,0 +1,204 @@
+# Needed for building the fitted line data
+import pandas
+
+# Needed for plotting data
+import seaborn as seaborn
+import seaborn.objects as seaborn_objects
+
+class TrackPlotter:
+
+    """
+    CLASS ABSTRACT: TrackPlotter
+
+    DESCRIPTION:
+        This class plots the results of the three analyses. Fitted lines are drawn from the precomputed
+        TrackAnalysisResults instead of being refitted inside the plotting call, and the track dataframe is
+        plotted as-is (seaborn only reads the columns it is given).
+    """
+
+    # Color codes for plotting data
+    red = '#ef4444'
+    green = '#84cc16'
+    orange = '#fb923c'
+    blue = '#22d3ee'
+    gray = '#475569'
+
+    def __init__(self, track_dataframe, results):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type TrackPlotter.
+
+        ARGS:
+            self - the class object
+            track_dataframe - the track dataframe the results were computed from
+            results - TrackAnalysisResults returned by TrackAnalyzer
+
+        RETURNS: None
+        """
+
+        self.__track_dataframe = track_dataframe
+        self.__results = results
+
+    def getTheme(self):
+
+        """
+        FUNCTION ABSTRACT: getTheme()
+
+        DESCRIPTION: This function returns the theme shared by every plot.
+
+        ARGS: self - the class object
+
+        RETURNS: theme - Python dictionary of matplotlib style settings
+        """
+
+        return {**seaborn.axes_style("whitegrid"), "grid.linestyle": ":"}
+
+    def getFitLine(self, fit, y_column):
+
+        """
+        FUNCTION ABSTRACT: getFitLine()
+
+        DESCRIPTION: This function returns the end points of a fitted line over the popularity range, for plotting.
+
+        ARGS:
+            self - the class object
+            fit - LinearFitResult of y_column on popularity
+            y_column - name of the column the line was fitted to
+
+        RETURNS: fit_dataframe - dataframe with the line's two end points (empty if no line could be fitted)
+        """
+
+        # If no line could be fitted, there is nothing to draw
+        if (fit.slope == None):
+
+            return pandas.DataFrame({"Popularity": [], y_column: []})
+
+        return pandas.DataFrame({"Popularity": [0, 100], y_column: fit.predict([0, 100])})
+
+    def plotDurationVsPopularity(self):
+
+        """
+        FUNCTION ABSTRACT: plotDurationVsPopularity()
+
+        DESCRIPTION: This function plots Analysis 1, duration vs. popularity, with its fitted line.
+
+        ARGS: self - the class object
+
+        RETURNS: plot - the seaborn plot
+        """
+
+        return (seaborn_objects.Plot(data = self.__track_dataframe, x = "Popularity", y = "Duration (ms)")
+                .add(seaborn_objects.Dot(alpha = 0.5, color = self.red))
+                .add(seaborn_objects.Line(color = self.red, linewidth = 3),
+                     data = self.getFitLine(self.__results.duration.fit, "Duration (ms)"), x = "Popularity", y = "Duration (ms)")
+                .label(x = "Popularity (0 - 100)", y = "Duration (ms)")
+                .theme(self.getTheme()))
+
+    def plotExplicitVsPopularity(self):
+
+        """
+        FUNCTION ABSTRACT: plotExplicitVsPopularity()
+
+        DESCRIPTION: This function plots Analysis 2, explicit language vs. popularity, with its fitted line.
+
+        ARGS: self - the class object
+
+        RETURNS: plot - the seaborn plot
+        """
+
+        # Plot the explicit flag as 0 / 1, so that the boolean dots and the fitted line share one numeric scale
+        explicit = self.__track_dataframe["Explicit"].astype("float64")
+
+        return (seaborn_objects.Plot(data = self.__track_dataframe, x = "Popularity", y = explicit)
+                .add(seaborn_objects.Dot(alpha = 0.5, color = self.red))
+                .add(seaborn_objects.Line(color = self.red, linewidth = 3),
+                     data = self.getFitLine(self.__results.explicit.fit, "Explicit"), x = "Popularity", y = "Explicit")
+                .label(x = "Popularity (0 - 100)", y = "Explicit (true / false)")
+                .theme(self.getTheme()))
+
+    def plotArtistVsPopularity(self):
+
+        """
+        FUNCTION ABSTRACT: plotArtistVsPopularity()
+
+        DESCRIPTION: This function plots Analysis 3, artist vs. popularity, with each artist's average popularity.
+
+        ARGS: self - the class object
+
+        RETURNS: plot - the seaborn plot
+        """
+
+        # Define the average popularity of each artist, as computed by the analysis
+        means_dataframe = pandas.DataFrame({"Artist Name": self.__results.artists.artists, "Popularity": self.__results.artists.means})
+
+        return (seaborn_objects.Plot(data = self.__track_dataframe, x = "Artist Name", y = "Popularity")
+                .add(seaborn_objects.Dot(alpha = 0.5, color = self.red))
+                .add(seaborn_objects.Dash(color = self.gray, linewidth = 3), data = means_dataframe, x = "Artist Name", y = "Popularity")
+                .label(x = "Artist Name", y = "Popularity (0 - 100)")
+                .theme(self.getTheme()))
+
+    def plotArtistDistribution(self, artist_name):
+
+        """
+        FUNCTION ABSTRACT: plotArtistDistribution()
+
+        DESCRIPTION: This function plots one artist's popularity distribution (the histogram computed by the analysis).
+
+        ARGS:
+            self - the class object
+            artist_name - name of the artist
+
+        RETURNS: plot - the seaborn plot
+        """
+
+        # Find the artist's row in the analysis results
+        artists = self.__results.artists
+        index = list(artists.artists).index(artist_name)
+
+        # Define the number of tracks in each popularity bin
+        histogram_dataframe = pandas.DataFrame({
+            "Popularity": [f"{edge}-{edge + 9 if edge < 90 else 100}" for edge in artists.BIN_EDGES],
+            "Tracks": artists.histograms[index]
+        })
+
+        return (seaborn_objects.Plot(data = histogram_dataframe, x = "Popularity", y = "Tracks")
+                .add(seaborn_objects.Bar(color = self.blue))
+                .label(title = f"{artist_name} (average popularity {artists.means[index]:.1f})", x = "Popularity (0 - 100)", y = "Tracks")
+                .layout(size = (8, 4.5))
+                .theme(self.getTheme()))
+
+    def getPlots(self):
+
+        """
+        FUNCTION ABSTRACT: getPlots()
+
+        DESCRIPTION: This function returns every plot, keyed by chart name.
+
+        ARGS: self - the class object
+
+        RETURNS: plots - Python dictionary of chart name -> seaborn plot
+        """
+
+        return {
+            "duration_vs_popularity": self.plotDurationVsPopularity(),
+            "explicit_vs_popularity": self.plotExplicitVsPopularity(),
+            "artist_vs_popularity": self.plotArtistVsPopularity()
+        }
+
+    def showAll(self):
+
+        """
+        FUNCTION ABSTRACT: showAll()
+
+        DESCRIPTION: This function displays every plot, one after the other.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        for plot in self.getPlots().values():
+
+            plot.show()
@@ -0,0 +1,170 @@
+# Needed for reading command line options
+import argparse
+
+# Needed for importing the application's modules from the repository root
+import os
+import sys
+
+# Needed for timing dataframe construction and groupbys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Needed for building dataframes the old way
+import pandas
+
+# Needed for building dataframes the typed, columnar way
+from TrackFrameBuilder import TrackFrameBuilder
+
+# Needed for generating synthetic tracks to load
+from SyntheticTrackGenerator import SyntheticTrackGenerator
+
+class DataFrameMemoryBenchmark:
+
+    """
+    CLASS ABSTRACT: DataFrameMemoryBenchmark
+
+    DESCRIPTION:
+        This class compares the old way of building the track dataframe (a list of per-row dictionaries passed
+        to DataFrame.from_dict) against the typed, columnar TrackFrameBuilder, measuring build time, memory
+        use and the time of a per-artist popularity groupby.
+    """
+
+    def __init__(self, row_count = 100000, batch_size = 1000):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type DataFrameMemoryBenchmark.
+
+        ARGS:
+            self - the class object
+            row_count - number of synthetic tracks to load
+            batch_size - number of tracks per batch handed to TrackFrameBuilder (as populateDataFrame() does)
+
+        RETURNS: None
+        """
+
+        self.__batch_size = batch_size
+
+        # Generate the rows up front, so that generation time is not measured
+        self.__rows = []
+
+        for track in SyntheticTrackGenerator().generateTracks(row_count):
+
+            self.__rows.append({
+                "Track Name": track["name"],
+                "Artist Name": track["artists"][0]["name"],
+                "Album Name": track["album"]["name"],
+                "Duration (ms)": track["duration_ms"],
+                "Explicit": track["explicit"],
+                "Popularity": track["popularity"]
+            })
+
+    def buildRowWise(self):
+
+        """
+        FUNCTION ABSTRACT: buildRowWise()
+
+        DESCRIPTION: This function builds the dataframe the old way, from a list of per-row dictionaries.
+
+        ARGS: self - the class object
+
+        RETURNS: track_dataframe - the dataframe
+        """
+
+        return pandas.DataFrame.from_dict(list(self.__rows))
+
+    def buildColumnar(self, arrow):
+
+        """
+        FUNCTION ABSTRACT: buildColumnar()
+
+        DESCRIPTION: This function builds the dataframe with TrackFrameBuilder, one batch of columns at a time.
+
+        ARGS:
+            self - the class object
+            arrow - flag for the dataframe's backing (True = Apache Arrow columns, False = NumPy / categorical columns)
+
+        RETURNS: track_dataframe - the dataframe
+        """
+
+        frame_builder = TrackFrameBuilder()
+
+        for start in range(0, len(self.__rows), self.__batch_size):
+
+            batch = self.__rows[start:start + self.__batch_size]
+
+            frame_builder.appendBatch({column: [row[column] for row in batch] for column in TrackFrameBuilder.COLUMNS})
+
+        return frame_builder.build(arrow)
+
+    def measure(self, build_function):
+
+        """
+        FUNCTION ABSTRACT: measure()
+
+        DESCRIPTION: This function builds a dataframe and measures its build time, memory use, and per-artist groupby time.
+
+        ARGS:
+            self - the class object
+            build_function - function that builds the dataframe
+
+        RETURNS: result - Python dictionary with build_ms, memory_mb and groupby_ms
+        """
+
+        start = time.perf_counter()
+        track_dataframe = build_function()
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        track_dataframe.groupby("Artist Name", observed = True)["Popularity"].mean()
+        groupby_seconds = time.perf_counter() - start
+
+        return {
+            "build_ms": build_seconds * 1e3,
+            "memory_mb": track_dataframe.memory_usage(deep = True).sum() / 2 ** 20,
+            "groupby_ms": groupby_seconds * 1e3
+        }
+
+    def run(self, include_arrow = False):
+
+        """
+        FUNCTION ABSTRACT: run()
+
+        DESCRIPTION: This function measures every way of building the dataframe and outputs a comparison table.
+
+        ARGS:
+            self - the class object
+            include_arrow - flag for whether to also measure the Arrow-backed dataframe (requires pyarrow)
+
+        RETURNS: results - Python dictionary of measurements, keyed by build method
+        """
+
+        results = {
+            "row-wise (before)": self.measure(self.buildRowWise),
+            "columnar (after)": self.measure(lambda: self.buildColumnar(False))
+        }
+
+        if (include_arrow == True):
+
+            results["columnar arrow"] = self.measure(lambda: self.buildColumnar(True))
+
+        print(f"Dataframe memory benchmark ({len(self.__rows)} tracks)")
+
+        for label, result in results.items():
+
+            print(f"  {label:<18} " + "  ".join(f"{name}={value:,.1f}" for name, value in result.items()))
+
+        return results
+
+if __name__ == "__main__":
+
+    # Define the command line options
+    parser = argparse.ArgumentParser(description = "Compare row-wise and typed columnar track dataframes.")
+    parser.add_argument("--rows", type = int, default = 100000, help = "number of synthetic tracks to load")
+    parser.add_argument("--arrow", action = "store_true", help = "also measure the Arrow-backed dataframe")
+
+    arguments = parser.parse_args()
+
+    DataFrameMemoryBenchmark(arguments.rows).run(arguments.arrow)
@@ -0,0 +1,342 @@
+# Needed for reading command line options
+import argparse
+
+# Needed for encoding responses
+import json
+
+# Needed for running the server in its own process (so that generating responses does not compete with the client for the GIL)
+import multiprocessing
+
+# Needed for throttling a random share of requests
+import random
+
+# Needed for parsing artist indexes out of search queries
+import re
+
+# Needed for simulating network latency
+import time
+
+# Needed for serving HTTP requests, one thread per connection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# Needed for generating synthetic artists and tracks to serve
+from SyntheticTrackGenerator import SyntheticTrackGenerator
+
+class FakeSpotifyRequestHandler(BaseHTTPRequestHandler):
+
+    """
+    CLASS ABSTRACT: FakeSpotifyRequestHandler
+
+    DESCRIPTION:
+        This class answers the three Spotify endpoints the application uses (token, search and top tracks)
+        with synthetic data. Artists are named "Artist <index>" and get the ID <index> zero-padded to 22
+        digits, and every artist's tracks are generated from a seed derived from its index, so the same
+        artist always returns the same tracks.
+    """
+
+    # Keep connections alive between requests, as Spotify does
+    protocol_version = "HTTP/1.1"
+
+    # Send the headers and body without waiting on delayed ACKs (otherwise every keep-alive response stalls for ~40 ms)
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+
+        """
+        FUNCTION ABSTRACT: log_message()
+
+        DESCRIPTION: This function silences the per-request log line (it would dominate the benchmark output).
+
+        ARGS:
+            self - the class object
+            format - the log message format
+            args - the log message arguments
+
+        RETURNS: None
+        """
+
+        pass
+
+    def sendJson(self, status, payload, headers = None):
+
+        """
+        FUNCTION ABSTRACT: sendJson()
+
+        DESCRIPTION: This function sends a JSON response.
+
+        ARGS:
+            self - the class object
+            status - HTTP status code of the response
+            payload - Python dictionary to encode as the response body
+            headers - optional Python dictionary of extra response headers
+
+        RETURNS: None
+        """
+
+        body = json.dumps(payload).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+
+        for name, value in (headers or {}).items():
+
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(body)
+
+    def simulateNetwork(self):
+
+        """
+        FUNCTION ABSTRACT: simulateNetwork()
+
+        DESCRIPTION: This function waits for the configured latency and throttles a random share of requests with a 429 response.
+
+        ARGS: self - the class object
+
+        RETURNS: throttled_check - boolean flag (True = the request was answered with 429, False = it may be served)
+        """
+
+        # Simulate the round trip to Spotify
+        if (self.server.latency > 0):
+
+            time.sleep(self.server.latency)
+
+        # Throttle a random share of requests, as Spotify does when the rate limit is exceeded
+        if (random.random() < self.server.throttle_rate):
+
+            self.sendJson(429, {"error": {"status": 429, "message": "API rate limit exceeded"}}, {"Retry-After": str(self.server.retry_after)})
+
+            return True
+
+        return False
+
+    def generateArtist(self, artist_index):
+
+        """
+        FUNCTION ABSTRACT: generateArtist()
+
+        DESCRIPTION: This function generates the artist with the given index, along with the generator for its tracks.
+
+        ARGS:
+            self - the class object
+            artist_index - index of the artist
+
+        RETURNS:
+            artist - Python dictionary containing the artist
+            generator - SyntheticTrackGenerator seeded for this artist
+        """
+
+        generator = SyntheticTrackGenerator(seed = artist_index)
+
+        return generator.generateArtist(artist_index, artist_id = f"{artist_index:022d}"), generator
+
+    def do_POST(self):
+
+        """
+        FUNCTION ABSTRACT: do_POST()
+
+        DESCRIPTION: This function answers access token requests (POST /api/token).
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        # Read (and ignore) the request body, so that the connection can be reused
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if (urlsplit(self.path).path != "/api/token"):
+
+            self.sendJson(404, {"error": {"status": 404, "message": "Not found"}})
+
+            return
+
+        self.sendJson(200, {"access_token": "benchmark-token", "token_type": "Bearer", "expires_in": 3600})
+
+    def do_GET(self):
+
+        """
+        FUNCTION ABSTRACT: do_GET()
+
+        DESCRIPTION: This function answers search requests (GET /v1/search) and top-tracks requests (GET /v1/artists/<id>/top-tracks).
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        if (self.simulateNetwork() == True):
+
+            return
+
+        url = urlsplit(self.path)
+
+        # Search: only "Artist <index>" names exist
+        if (url.path == "/v1/search"):
+
+            match = re.fullmatch(r"Artist (\d+)", parse_qs(url.query).get("q", [""])[0])
+
+            items = [self.generateArtist(int(match.group(1)))[0]] if match != None else []
+
+            self.sendJson(200, {"artists": {"items": items, "total": len(items)}})
+
+            return
+
+        # Top tracks: the artist ID is the artist's index
+        match = re.fullmatch(r"/v1/artists/(\d{22})/top-tracks", url.path)
+
+        if (match == None):
+
+            self.sendJson(404, {"error": {"status": 404, "message": "Not found"}})
+
+            return
+
+        artist, generator = self.generateArtist(int(match.group(1)))
+
+        self.sendJson(200, {"tracks": [generator.generateTrack(artist) for _ in range(self.server.tracks_per_artist)]})
+
+class FakeSpotifyServer:
+
+    """
+    CLASS ABSTRACT: FakeSpotifyServer
+
+    DESCRIPTION:
+        This class runs a local stand-in for the Spotify API in a separate process, so that the fetch and
+        ingest paths can be benchmarked without credentials or network access. Point SpotifyDataAccessor at
+        it by passing getUrl() as both api_url and accounts_url.
+    """
+
+    def __init__(self, latency = 0.0, throttle_rate = 0.0, retry_after = 1, tracks_per_artist = 10, port = 0):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type FakeSpotifyServer.
+
+        ARGS:
+            self - the class object
+            latency - number of seconds every search / top-tracks request waits before it is answered
+            throttle_rate - share of search / top-tracks requests answered with 429 (0 - 1)
+            retry_after - Retry-After value (in seconds) sent with every 429 response
+            tracks_per_artist - number of tracks returned for every artist (Spotify returns a top 10)
+            port - port to listen on (0 = any free port)
+
+        RETURNS: None
+        """
+
+        self.__options = {"latency": latency, "throttle_rate": throttle_rate, "retry_after": retry_after, "tracks_per_artist": tracks_per_artist}
+        self.__port = port
+        self.__process = None
+
+    @staticmethod
+    def serve(options, port, connection):
+
+        """
+        FUNCTION ABSTRACT: serve()
+
+        DESCRIPTION: This function runs the server until its process is terminated, after sending the port it listens on back through connection.
+
+        ARGS:
+            options - Python dictionary of server options (see the constructor)
+            port - port to listen on (0 = any free port)
+            connection - optional pipe connection the port is sent back through
+
+        RETURNS: None
+        """
+
+        server = ThreadingHTTPServer(("127.0.0.1", port), FakeSpotifyRequestHandler)
+        server.daemon_threads = True
+
+        # Expose the options to the request handlers
+        for name, value in options.items():
+
+            setattr(server, name, value)
+
+        if (connection != None):
+
+            connection.send(server.server_address[1])
+            connection.close()
+
+        server.serve_forever()
+
+    def start(self):
+
+        """
+        FUNCTION ABSTRACT: start()
+
+        DESCRIPTION: This function starts the server process and waits until it is listening.
+
+        ARGS: self - the class object
+
+        RETURNS: url - base URL of the server (e.g. http://127.0.0.1:54321)
+        """
+
+        receiver, sender = multiprocessing.Pipe(duplex = False)
+
+        self.__process = multiprocessing.Process(target = FakeSpotifyServer.serve, args = (self.__options, self.__port, sender), daemon = True)
+        self.__process.start()
+
+        self.__port = receiver.recv()
+
+        return self.getUrl()
+
+    def getUrl(self):
+
+        """
+        FUNCTION ABSTRACT: getUrl()
+
+        DESCRIPTION: This function returns the base URL of the server.
+
+        ARGS: self - the class object
+
+        RETURNS: url - base URL of the server
+        """
+
+        return f"http://127.0.0.1:{self.__port}"
+
+    def stop(self):
+
+        """
+        FUNCTION ABSTRACT: stop()
+
+        DESCRIPTION: This function stops the server process.
+
+        ARGS: self - the class object
+
+        RETURNS: None
+        """
+
+        if (self.__process != None):
+
+            self.__process.terminate()
+            self.__process.join()
+
+            self.__process = None
+
+if __name__ == "__main__":
+
+    # Define the command line options
+    parser = argparse.ArgumentParser(description = "Serve synthetic Spotify search / top-tracks responses locally.")
+    parser.add_argument("--port", type = int, default = 8765, help = "port to listen on")
+    parser.add_argument("--latency-ms", type = float, default = 0.0, help = "latency added to every search / top-tracks request")
+    parser.add_argument("--throttle-rate", type = float, default = 0.0, help = "share of search / top-tracks requests answered with 429 (0 - 1)")
+    parser.add_argument("--retry-after", type = int, default = 1, help = "Retry-After whole seconds sent with every 429 response (as Spotify does)")
+    parser.add_argument("--tracks-per-artist", type = int, default = 10, help = "number of tracks returned for every artist")
+
+    arguments = parser.parse_args()
+
+    options = {"latency": arguments.latency_ms / 1e3, "throttle_rate": arguments.throttle_rate, "retry_after": arguments.retry_after,
+               "tracks_per_artist": arguments.tracks_per_artist}
+
+    print(f"Serving on http://127.0.0.1:{arguments.port} (Ctrl+C to stop)")
+
+    try:
+
+        FakeSpotifyServer.serve(options, arguments.port, None)
+
+    except KeyboardInterrupt:
+
+        pass
@@ -0,0 +1,259 @@
+# Needed for reading command line options
+import argparse
+
+# Needed for writing the results to a file
+import json
+
+# Needed for importing the application's modules from the repository root
+import os
+import sys
+
+# Needed for timing each stage
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Needed for connecting to a local Redis Stack instance
+import redis
+
+# Includes for the application classes being measured
+from SpotifyDataAccessor import SpotifyDataAccessor
+from RedisDataAccessor import RedisDataAccessor
+from IngestPipeline import IngestPipeline
+from TrackFrameBuilder import TrackFrameBuilder
+from TrackAnalysis import TrackAnalyzer
+
+# Needed for serving synthetic Spotify responses locally
+from FakeSpotifyServer import FakeSpotifyServer
+
+# Needed for generating the analysis dataset when the tracks cannot be loaded back from the database
+from SyntheticTrackGenerator import SyntheticTrackGenerator
+
+class PipelineBenchmark:
+
+    """
+    CLASS ABSTRACT: PipelineBenchmark
+
+    DESCRIPTION:
+        This class measures the whole pipeline offline: tracks are fetched from a local stand-in for the
+        Spotify API (FakeSpotifyServer) and written to a local Redis Stack instance or an in-process
+        fakeredis. For every dataset size it reports the throughput of each stage: fetch, ingest (fetch and
+        write together), re-ingest (every track unchanged), load (Redis to dataframe) and analysis.
+    """
+
+    def __init__(self, spotify_url, redis_connection, fake_redis = False, tracks_per_artist = 10, fetch_workers = 8, write_workers = 2,
+                 requests_per_second = 100000):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type PipelineBenchmark.
+
+        ARGS:
+            self - the class object
+            spotify_url - base URL of the FakeSpotifyServer
+            redis_connection - Redis connection to benchmark against (its database is flushed before every dataset size)
+            fake_redis - flag for whether redis_connection is a fakeredis connection (no RediSearch, no load stage)
+            tracks_per_artist - number of tracks the FakeSpotifyServer returns for every artist
+            fetch_workers - number of IngestPipeline fetch workers
+            write_workers - number of IngestPipeline write workers
+            requests_per_second - request scheduler budget (high by default, so that the scheduler does not limit the measurement)
+
+        RETURNS: None
+        """
+
+        self.__spotify_url = spotify_url
+        self.__redis_connection = redis_connection
+        self.__fake_redis = fake_redis
+        self.__tracks_per_artist = tracks_per_artist
+        self.__fetch_workers = fetch_workers
+        self.__write_workers = write_workers
+        self.__requests_per_second = requests_per_second
+
+    def getThroughput(self, track_count, seconds):
+
+        """
+        FUNCTION ABSTRACT: getThroughput()
+
+        DESCRIPTION: This function returns the result of one stage.
+
+        ARGS:
+            self - the class object
+            track_count - number of tracks the stage processed
+            seconds - number of seconds the stage took
+
+        RETURNS: result - Python dictionary with tracks, seconds and tracks_per_second
+        """
+
+        return {"tracks": track_count, "seconds": seconds, "tracks_per_second": track_count / seconds if seconds > 0 else 0.0}
+
+    def buildSyntheticDataFrame(self, track_count):
+
+        """
+        FUNCTION ABSTRACT: buildSyntheticDataFrame()
+
+        DESCRIPTION: This function builds the track dataframe straight from synthetic tracks (used for the analysis stage when the load stage is skipped).
+
+        ARGS:
+            self - the class object
+            track_count - number of tracks in the dataframe
+
+        RETURNS: track_dataframe - the dataframe
+        """
+
+        tracks = list(SyntheticTrackGenerator().generateTracks(track_count, self.__tracks_per_artist))
+
+        frame_builder = TrackFrameBuilder()
+        frame_builder.appendBatch({
+            "Track Name": [track["name"] for track in tracks],
+            "Artist Name": [track["artists"][0]["name"] for track in tracks],
+            "Album Name": [track["album"]["name"] for track in tracks],
+            "Duration (ms)": [track["duration_ms"] for track in tracks],
+            "Explicit": [track["explicit"] for track in tracks],
+            "Popularity": [track["popularity"] for track in tracks]
+        })
+
+        return frame_builder.build()
+
+    def runSize(self, track_count):
+
+        """
+        FUNCTION ABSTRACT: runSize()
+
+        DESCRIPTION: This function runs every stage on an empty database for one dataset size.
+
+        ARGS:
+            self - the class object
+            track_count - number of tracks to ingest (rounded up to a whole number of artists)
+
+        RETURNS: results - Python dictionary of stage name -> result (see getThroughput()), plus the Spotify request counters
+        """
+
+        # Start from an empty database
+        self.__redis_connection.flushdb()
+
+        # Define the artists the FakeSpotifyServer knows about
+        artist_count = -(-track_count // self.__tracks_per_artist)
+        artist_names = [f"Artist {index}" for index in range(artist_count)]
+
+        spotify_accessor = SpotifyDataAccessor("benchmark", "benchmark", pool_size = self.__fetch_workers, requests_per_second = self.__requests_per_second,
+                                               api_url = self.__spotify_url, accounts_url = self.__spotify_url)
+        redis_accessor = RedisDataAccessor(create_index = not self.__fake_redis, redis_connection = self.__redis_connection)
+
+        results = {}
+
+        # Ingest every track into the empty database (every track is written)
+        ingest_statistics = IngestPipeline(spotify_accessor, redis_accessor, self.__fetch_workers, self.__write_workers).run(artist_names)
+
+        results["fetch"] = self.getThroughput(ingest_statistics["fetch"]["tracks"], ingest_statistics["fetch"]["elapsed_seconds"])
+        results["ingest"] = self.getThroughput(ingest_statistics["write"]["tracks"], ingest_statistics["elapsed_seconds"])
+
+        # Ingest the same tracks again (every track is unchanged, so only the content hashes are compared)
+        ingest_statistics = IngestPipeline(spotify_accessor, redis_accessor, self.__fetch_workers, self.__write_workers).run(artist_names)
+
+        results["reingest"] = self.getThroughput(ingest_statistics["write"]["tracks"], ingest_statistics["elapsed_seconds"])
+
+        # Load every track back into a dataframe (fakeredis answers JSON.MGET projections in a different shape than Redis Stack, so it is skipped there)
+        if (self.__fake_redis == False):
+
+            start = time.perf_counter()
+            track_dataframe = redis_accessor.populateDataFrame()
+
+            results["load"] = self.getThroughput(len(track_dataframe), time.perf_counter() - start)
+
+        else:
+
+            track_dataframe = self.buildSyntheticDataFrame(track_count)
+
+        # Run every analysis on the dataframe
+        start = time.perf_counter()
+        TrackAnalyzer().analyze(track_dataframe)
+
+        results["analysis"] = self.getThroughput(len(track_dataframe), time.perf_counter() - start)
+
+        results["requests"] = spotify_accessor.getRequestStatistics()
+
+        spotify_accessor.close()
+
+        return results
+
+    def run(self, track_counts):
+
+        """
+        FUNCTION ABSTRACT: run()
+
+        DESCRIPTION: This function runs every dataset size and outputs a throughput table.
+
+        ARGS:
+            self - the class object
+            track_counts - list of dataset sizes (numbers of tracks)
+
+        RETURNS: results - Python dictionary of dataset size -> results of runSize()
+        """
+
+        results = {}
+
+        print(f"{'tracks':>9}  {'stage':<9} {'seconds':>9} {'tracks/s':>11}")
+
+        for track_count in track_counts:
+
+            results[track_count] = self.runSize(track_count)
+
+            for stage, result in results[track_count].items():
+
+                if (stage != "requests"):
+
+                    print(f"{track_count:>9}  {stage:<9} {result['seconds']:>9.3f} {result['tracks_per_second']:>11,.0f}")
+
+            print(f"{track_count:>9}  requests: {results[track_count]['requests']}")
+
+        return results
+
+if __name__ == "__main__":
+
+    # Define the command line options
+    parser = argparse.ArgumentParser(description = "Benchmark fetch, ingest, load and analysis throughput offline.")
+    parser.add_argument("--tracks", default = "10,1000,10000", help = "comma-separated dataset sizes (e.g. 10,1000,100000,1000000)")
+    parser.add_argument("--tracks-per-artist", type = int, default = 10, help = "number of tracks returned for every artist")
+    parser.add_argument("--latency-ms", type = float, default = 0.0, help = "latency added to every search / top-tracks request")
+    parser.add_argument("--throttle-rate", type = float, default = 0.0, help = "share of search / top-tracks requests answered with 429 (0 - 1)")
+    parser.add_argument("--retry-after", type = int, default = 1, help = "Retry-After whole seconds sent with every 429 response (as Spotify does)")
+    parser.add_argument("--fetch-workers", type = int, default = 8, help = "number of fetch workers")
+    parser.add_argument("--write-workers", type = int, default = 2, help = "number of write workers")
+    parser.add_argument("--redis-url", default = "redis://localhost:6379/15", help = "Redis Stack database to benchmark against (it is FLUSHED)")
+    parser.add_argument("--fakeredis", action = "store_true", help = "use an in-process fakeredis instead of --redis-url (skips the load stage)")
+    parser.add_argument("--output", help = "optional path of a JSON file to write the results to")
+
+    arguments = parser.parse_args()
+
+    # Connect to the database to benchmark against
+    if (arguments.fakeredis == True):
+
+        # Needed only for the in-process database, so that fakeredis stays an optional dependency
+        import fakeredis
+
+        redis_connection = fakeredis.FakeRedis(decode_responses = True)
+
+    else:
+
+        redis_connection = redis.Redis.from_url(arguments.redis_url, decode_responses = True)
+
+    # Start the local Spotify stand-in and run every dataset size against it
+    server = FakeSpotifyServer(arguments.latency_ms / 1e3, arguments.throttle_rate, arguments.retry_after, arguments.tracks_per_artist)
+
+    try:
+
+        benchmark = PipelineBenchmark(server.start(), redis_connection, arguments.fakeredis, arguments.tracks_per_artist,
+                                      arguments.fetch_workers, arguments.write_workers)
+
+        results = benchmark.run([int(count) for count in arguments.tracks.split(",")])
+
+    finally:
+
+        server.stop()
+
+    if (arguments.output != None):
+
+        with open(arguments.output, "w") as file:
+
+            json.dump(results, file, indent = 4)
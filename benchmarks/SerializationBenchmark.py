@@ -0,0 +1,189 @@
+# Needed for reading command line options
+import argparse
+
+# Needed to serialize tracks the way redis-py does
+import json
+
+# Needed for timing encode / decode passes
+import time
+
+# Needed for generating synthetic tracks to serialize
+from SyntheticTrackGenerator import SyntheticTrackGenerator
+
+class SerializationBenchmark:
+
+    """
+    CLASS ABSTRACT: SerializationBenchmark
+
+    DESCRIPTION:
+        This class compares storing tracks in RedisJSON as double-encoded JSON strings (the old
+        json().set(key, path, json.dumps(track)) call) against storing them as native JSON documents. It
+        measures client-side encode / decode time and payload size, and, when a Redis URL is given, the
+        server-side memory used per key.
+    """
+
+    def __init__(self, track_count = 10000, redis_url = None):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type SerializationBenchmark.
+
+        ARGS:
+            self - the class object
+            track_count - number of synthetic tracks to serialize
+            redis_url - optional URL of a Redis Stack instance to measure memory per key on (e.g. redis://localhost:6379)
+
+        RETURNS: None
+        """
+
+        self.__tracks = list(SyntheticTrackGenerator().generateTracks(track_count))
+        self.__redis_url = redis_url
+
+    def measureClientSide(self, double_encoded):
+
+        """
+        FUNCTION ABSTRACT: measureClientSide()
+
+        DESCRIPTION:
+            This function measures what the client pays to encode and decode every track. redis-py serializes
+            any value passed to json().set() with json.dumps, so a pre-encoded string is serialized twice (and
+            has to be decoded twice on the way back).
+
+        ARGS:
+            self - the class object
+            double_encoded - flag for the storage format (True = JSON string, False = native JSON document)
+
+        RETURNS: result - Python dictionary with encode_us and decode_us (microseconds per track) and bytes_per_track
+        """
+
+        # Time the encoding of every track into the payload sent to Redis
+        start = time.perf_counter()
+
+        if (double_encoded == True):
+
+            payloads = [json.dumps(json.dumps(track)) for track in self.__tracks]
+
+        else:
+
+            payloads = [json.dumps(track) for track in self.__tracks]
+
+        encode_seconds = time.perf_counter() - start
+
+        # Time the decoding of every payload back into a track
+        start = time.perf_counter()
+
+        if (double_encoded == True):
+
+            for payload in payloads:
+
+                json.loads(json.loads(payload))
+
+        else:
+
+            for payload in payloads:
+
+                json.loads(payload)
+
+        decode_seconds = time.perf_counter() - start
+
+        # Return the per-track averages
+        return {
+            "encode_us": (encode_seconds / len(payloads)) * 1e6,
+            "decode_us": (decode_seconds / len(payloads)) * 1e6,
+            "bytes_per_track": sum(len(payload.encode("utf-8")) for payload in payloads) / len(payloads)
+        }
+
+    def measureServerSide(self, double_encoded, sample_size = 100):
+
+        """
+        FUNCTION ABSTRACT: measureServerSide()
+
+        DESCRIPTION: This function stores a sample of tracks under temporary keys and reports the average MEMORY USAGE per key.
+
+        ARGS:
+            self - the class object
+            double_encoded - flag for the storage format (True = JSON string, False = native JSON document)
+            sample_size - number of tracks to store
+
+        RETURNS: memory_per_key - average number of bytes Redis reports per key
+        """
+
+        # Needed only for the server-side measurement, so that the client-side one runs without Redis installed
+        import redis
+
+        # Connect to the Redis Stack instance
+        connection = redis.Redis.from_url(self.__redis_url, decode_responses = True)
+
+        # Define the temporary keys to store the sample under
+        keys = [f"benchmark:serialization:{index}" for index in range(min(sample_size, len(self.__tracks)))]
+
+        try:
+
+            # Store the sample in the requested format
+            pipeline = connection.pipeline(transaction = False)
+
+            for key, track in zip(keys, self.__tracks):
+
+                pipeline.json().set(key, "$", json.dumps(track) if double_encoded == True else track)
+
+            pipeline.execute()
+
+            # Ask Redis how much memory each key uses
+            pipeline = connection.pipeline(transaction = False)
+
+            for key in keys:
+
+                pipeline.memory_usage(key, samples = 0)
+
+            usages = pipeline.execute()
+
+        finally:
+
+            # Remove the temporary keys
+            connection.delete(*keys)
+
+        return sum(usages) / len(usages)
+
+    def run(self):
+
+        """
+        FUNCTION ABSTRACT: run()
+
+        DESCRIPTION: This function runs every measurement for both storage formats and outputs a comparison table.
+
+        ARGS: self - the class object
+
+        RETURNS: results - Python dictionary of measurements, keyed by storage format
+        """
+
+        # Define an empty dictionary to pack with the measurements of each storage format
+        results = {}
+
+        for label, double_encoded in (("string (before)", True), ("native (after)", False)):
+
+            results[label] = self.measureClientSide(double_encoded)
+
+            if (self.__redis_url != None):
+
+                results[label]["redis_bytes_per_key"] = self.measureServerSide(double_encoded)
+
+        # Output the comparison table
+        print(f"Serialization benchmark ({len(self.__tracks)} tracks)")
+
+        for label, result in results.items():
+
+            print(f"  {label:<16} " + "  ".join(f"{name}={value:,.1f}" for name, value in result.items()))
+
+        return results
+
+if __name__ == "__main__":
+
+    # Define the command line options
+    parser = argparse.ArgumentParser(description = "Compare double-encoded and native JSON track storage.")
+    parser.add_argument("--tracks", type = int, default = 10000, help = "number of synthetic tracks to serialize")
+    parser.add_argument("--redis-url", default = None, help = "Redis Stack URL to measure memory per key on")
+
+    arguments = parser.parse_args()
+
+    SerializationBenchmark(arguments.tracks, arguments.redis_url).run()
@@ -0,0 +1,150 @@
+# Needed for generating reproducible random track data
+import random
+
+class SyntheticTrackGenerator:
+
+    """
+    CLASS ABSTRACT: SyntheticTrackGenerator
+
+    DESCRIPTION:
+        This class generates synthetic tracks shaped like the ones returned by the Spotify top-tracks
+        endpoint (album, artists, available markets, etc.), so that benchmarks can run without the Spotify API.
+    """
+
+    # Define the markets listed on every synthetic track and album (Spotify lists ~180, which dominates the payload size)
+    MARKETS = [f"{chr(65 + (index // 26))}{chr(65 + (index % 26))}" for index in range(180)]
+
+    def __init__(self, seed = 0):
+
+        """
+        FUNCTION ABSTRACT: Constructor
+
+        DESCRIPTION: Creates an object of type SyntheticTrackGenerator.
+
+        ARGS:
+            self - the class object
+            seed - seed for the random number generator (the same seed always generates the same tracks)
+
+        RETURNS: None
+        """
+
+        self.__random = random.Random(seed)
+
+    def generateId(self):
+
+        """
+        FUNCTION ABSTRACT: generateId()
+
+        DESCRIPTION: This function generates a random 22 character ID in Spotify's base-62 format.
+
+        ARGS: self - the class object
+
+        RETURNS: id - the generated ID
+        """
+
+        alphabet = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+        return "".join(self.__random.choice(alphabet) for _ in range(22))
+
+    def generateArtist(self, artist_index, artist_id = None):
+
+        """
+        FUNCTION ABSTRACT: generateArtist()
+
+        DESCRIPTION: This function generates a synthetic artist as returned by the Spotify search endpoint.
+
+        ARGS:
+            self - the class object
+            artist_index - number of the artist (used to build a unique name)
+            artist_id - optional Spotify ID to give the artist (defaults to a random one)
+
+        RETURNS: artist - Python dictionary containing the artist's id, name, type and uri
+        """
+
+        if (artist_id == None):
+
+            artist_id = self.generateId()
+
+        return {
+            "external_urls": {"spotify": f"https://open.spotify.com/artist/{artist_id}"},
+            "href": f"https://api.spotify.com/v1/artists/{artist_id}",
+            "id": artist_id,
+            "name": f"Artist {artist_index}",
+            "type": "artist",
+            "uri": f"spotify:artist:{artist_id}"
+        }
+
+    def generateTrack(self, artist):
+
+        """
+        FUNCTION ABSTRACT: generateTrack()
+
+        DESCRIPTION: This function generates a synthetic track for an artist, shaped like a Spotify top-tracks item.
+
+        ARGS:
+            self - the class object
+            artist - the artist generated by generateArtist()
+
+        RETURNS: track - Python dictionary containing the track
+        """
+
+        track_id = self.generateId()
+        album_id = self.generateId()
+
+        return {
+            "album": {
+                "album_type": "album",
+                "artists": [artist],
+                "available_markets": self.MARKETS,
+                "external_urls": {"spotify": f"https://open.spotify.com/album/{album_id}"},
+                "href": f"https://api.spotify.com/v1/albums/{album_id}",
+                "id": album_id,
+                "images": [{"height": size, "url": f"https://i.scdn.co/image/{self.generateId()}", "width": size} for size in (640, 300, 64)],
+                "name": f"Album {self.__random.randint(1, 20)} by {artist['name']}",
+                "release_date": f"{self.__random.randint(1960, 2024)}-01-01",
+                "release_date_precision": "day",
+                "total_tracks": self.__random.randint(8, 16),
+                "type": "album",
+                "uri": f"spotify:album:{album_id}"
+            },
+            "artists": [artist],
+            "available_markets": self.MARKETS,
+            "disc_number": 1,
+            "duration_ms": self.__random.randint(120000, 480000),
+            "explicit": self.__random.random() < 0.2,
+            "external_ids": {"isrc": f"US{self.__random.randint(10 ** 9, 10 ** 10 - 1)}"},
+            "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+            "href": f"https://api.spotify.com/v1/tracks/{track_id}",
+            "id": track_id,
+            "is_local": False,
+            "name": f"Track {self.__random.randint(1, 10 ** 6)}",
+            "popularity": self.__random.randint(0, 100),
+            "preview_url": None,
+            "track_number": self.__random.randint(1, 16),
+            "type": "track",
+            "uri": f"spotify:track:{track_id}"
+        }
+
+    def generateTracks(self, track_count, tracks_per_artist = 10):
+
+        """
+        FUNCTION ABSTRACT: generateTracks()
+
+        DESCRIPTION: This function generates track_count synthetic tracks, tracks_per_artist at a time for each synthetic artist.
+
+        ARGS:
+            self - the class object
+            track_count - total number of tracks to generate
+            tracks_per_artist - number of tracks generated per artist (Spotify returns a top 10)
+
+        RETURNS: tracks - generator of track Python dictionaries
+        """
+
+        for index in range(track_count):
+
+            # Start a new artist every tracks_per_artist tracks
+            if ((index % tracks_per_artist) == 0):
+
+                artist = self.generateArtist(index // tracks_per_artist)
+
+            yield self.generateTrack(artist)
@@ -1,48 +1,204 @@
-# Needed to access Redis database 
+# Needed to access Redis database
 import redis
 
 # Needed to access config.yaml file containing connection credentials for the Redis database
 import yaml
 
-def loadConfig():
+# Needed for reading environment variable overrides and checking whether config.yaml exists
+import os
+
+# Needed for creating the cached configuration and the shared connection pool only once when several threads ask at the same time
+import threading
+
+# Define the environment variables that override config.yaml, and the redis config key and type each one overrides
+ENVIRONMENT_OVERRIDES = {
+    "REDIS_HOST": ("host", str),
+    "REDIS_PORT": ("port", int),
+    "REDIS_DB": ("logical_db", int),
+    "REDIS_USER": ("user", str),
+    "REDIS_PASSWORD": ("password", str),
+    "REDIS_MAX_CONNECTIONS": ("max_connections", int),
+    "REDIS_BLOCKING_POOL": ("blocking_pool", lambda value: value.lower() in ("1", "true", "yes")),
+    "REDIS_POOL_TIMEOUT": ("pool_timeout", float),
+    "REDIS_HEALTH_CHECK_INTERVAL": ("health_check_interval", int),
+    "REDIS_SOCKET_KEEPALIVE": ("socket_keepalive", lambda value: value.lower() in ("1", "true", "yes")),
+    "REDIS_SOCKET_TIMEOUT": ("socket_timeout", float)
+}
+
+# Define the defaults of the connection pool settings (config.yaml and the environment variables above override them). The db key of
+# config.yaml is the Redis Cloud database number (not a logical database index) and is not used to connect, so the logical database
+# index has its own logical_db key
+POOL_DEFAULTS = {
+    "logical_db": 0,
+    "max_connections": 20,
+    "blocking_pool": True,
+    "pool_timeout": 20.0,
+    "health_check_interval": 30,
+    "socket_keepalive": True,
+    "socket_timeout": None
+}
+
+def loadConfig(path = None):
 
     """
     FUNCTION ABSTRACT: loadConfig()
 
-    DESCRIPTION: This function loads the configuration from the YAML file.
+    DESCRIPTION:
+        This function loads the configuration from the YAML file (if it exists), then applies the REDIS_*
+        environment variable overrides on top, so that the connection can be configured without config.yaml.
+
+    ARGS: path - optional path of the YAML file (defaults to the CONFIG_FILE environment variable, or config.yaml)
+
+    RETURNS: dict - configuration data
+    """
+
+    # Define the YAML file to load
+    if (path == None):
+
+        path = os.getenv("CONFIG_FILE", "config.yaml")
+
+    # Open the config.yaml file in read format, if there is one
+    loaded_config = {}
+
+    if (os.path.exists(path) == True):
+
+        with open(path, "r") as file:
+
+            loaded_config = yaml.safe_load(file) or {}
+
+    # Apply every environment variable override that is set
+    redis_config = dict(loaded_config.get("redis") or {})
+
+    for variable, (key, convert) in ENVIRONMENT_OVERRIDES.items():
+
+        if (os.getenv(variable) != None):
+
+            redis_config[key] = convert(os.getenv(variable))
+
+    loaded_config["redis"] = redis_config
+
+    # Return the loaded configuration data
+    return loaded_config
+
+def getConfig():
+
+    """
+    FUNCTION ABSTRACT: getConfig()
+
+    DESCRIPTION: This function returns the configuration, loading it on first use (so that importing this module does not need config.yaml).
 
     ARGS: None
 
     RETURNS: dict - configuration data
     """
 
-    # Open the config.yaml file in read format
-    with open("config.yaml", "r") as file:
+    global config
+
+    # Load the configuration once, the first time it is needed
+    if (config == None):
+
+        with lock:
+
+            if (config == None):
+
+                config = loadConfig()
+
+    return config
+
+def getConnectionPool():
+
+    """
+    FUNCTION ABSTRACT: getConnectionPool()
+
+    DESCRIPTION:
+        This function returns the connection pool shared by every Redis connection in the process, creating it
+        on first use. The pool holds at most max_connections connections. By default it is a blocking pool, so
+        a worker thread that finds every connection in use waits (up to pool_timeout seconds) for one to be
+        returned instead of opening yet another connection. Idle connections are health-checked before reuse
+        and kept alive with TCP keepalive, so connections dropped by Redis Cloud are replaced instead of failing.
+
+    ARGS: None
+
+    RETURNS: ConnectionPool - the shared connection pool
+    """
+
+    global connection_pool
+
+    # Create the pool once, the first time it is needed
+    if (connection_pool == None):
+
+        with lock:
+
+            if (connection_pool == None):
+
+                # Load the configuration credentials, with the pool defaults for any setting that is not configured
+                redis_config = {**POOL_DEFAULTS, **getConfig()["redis"]}
+
+                # Define the settings of every connection in the pool
+                connection_settings = {
+                    "host": redis_config["host"],
+                    "port": redis_config["port"],
+                    "db": redis_config["logical_db"],
+                    "username": redis_config.get("user"),
+                    "password": redis_config.get("password"),
+                    "decode_responses": True,
+                    "health_check_interval": redis_config["health_check_interval"],
+                    "socket_keepalive": redis_config["socket_keepalive"],
+                    "socket_timeout": redis_config["socket_timeout"],
+                    "max_connections": redis_config["max_connections"]
+                }
+
+                # Create a blocking pool (waits for a free connection) or a regular one (raises when every connection is in use)
+                if (redis_config["blocking_pool"] == True):
+
+                    connection_pool = redis.BlockingConnectionPool(timeout = redis_config["pool_timeout"], **connection_settings)
+
+                else:
+
+                    connection_pool = redis.ConnectionPool(**connection_settings)
 
-        # Return the loaded configuration data
-        return yaml.safe_load(file)
+    return connection_pool
 
 def getRedisConnection():
 
     """
     FUNCTION ABSTRACT: getRedisConnection()
-    
-    DESCRIPTION: This function creates a Redis database connection using the configuration.
+
+    DESCRIPTION: This function creates a Redis database connection using the configuration. Every connection draws from the shared connection pool.
 
     ARGS: None
 
     RETURNS: Redis - Redis connection object
     """
 
-    # Return a Redis database connection instance using the configuration credentials from config.yaml
-    return redis.Redis(
-        host = config["redis"]["host"],
-        port = config["redis"]["port"],
-        db = 0,
-        decode_responses = True,
-        username = config["redis"]["user"],
-        password = config["redis"]["password"]
-    )
+    # Return a Redis database connection instance backed by the shared connection pool
+    return redis.Redis(connection_pool = getConnectionPool())
+
+def closeConnectionPool():
+
+    """
+    FUNCTION ABSTRACT: closeConnectionPool()
+
+    DESCRIPTION: This function closes every connection in the shared connection pool (a new pool is created on the next getRedisConnection() call).
+
+    ARGS: None
+
+    RETURNS: None
+    """
+
+    global connection_pool
+
+    with lock:
+
+        if (connection_pool != None):
+
+            connection_pool.disconnect()
+
+            connection_pool = None
+
+# Define the cached configuration (loaded by getConfig() on first use) and the shared connection pool (created by getConnectionPool() on first use)
+config = None
+connection_pool = None
 
-# Call loadConfig() to load the configuration from the config.yaml file
-config = loadConfig()
\ No newline at end of file
+# Define the lock guarding their creation (reentrant, since getConnectionPool() calls getConfig() while holding it)
+lock = threading.RLock()
@@ -1,6 +1,12 @@
-# Includes for user-defined classes
+# Includes for user-defined classes (the analysis and plotting classes load pandas / matplotlib / seaborn, so they are imported
+# inside the subcommands that need them, and ingest-only runs start without them)
 from SpotifyDataAccessor import SpotifyDataAccessor
 from RedisDataAccessor import RedisDataAccessor
+from ArtistIdCache import ArtistIdCache
+from ResponseCache import ResponseCache
+from IngestPipeline import IngestPipeline
+from ArtistCatalog import ArtistCatalog
+from Metrics import metrics
 
 # Needed to load in .env file where Spotify API keys are stored
 from dotenv import load_dotenv
@@ -8,124 +14,415 @@ from dotenv import load_dotenv
 # Needed to retrieve environment variables containing Spotify API keys
 import os
 
-# Needed for using dataframes
-import pandas
-
-# Needed for plotting data
-import matplotlib.pyplot as plot
-
-# Needed for plotting data
-import seaborn as seaborn
-import seaborn.objects as seaborn_objects
-
-# Color codes for plotting data
-red = '#ef4444'
-green = '#84cc16'
-orange = '#fb923c'
-blue = '#22d3ee'
-gray = '#475569'
-
-######################################
-# STEP 1: Read JSON from Spotify API #
-######################################
-
-# Load in the .env file and set up API key variables for use in the SpotifyDataAccessor class
-load_dotenv()
-client_id = os.getenv("CLIENT_ID")
-client_secret = os.getenv("CLIENT_SECRET")
-
-# Initialize a SpotifyDataAccessor object, used to request data from the Spotify API
-spotifyDataAccessor = SpotifyDataAccessor(client_id, client_secret)
-
-# Initialize a RedisDataAccessor object, used to store and retrieve data from Redis
-redisDataAccessor = RedisDataAccessor()
-
-# Request an access token from Spotify
-access_token = spotifyDataAccessor.requestAccessToken()
-
-# Retrieve the top 10 tracks for different artists (returns Python dictionaries for each)
-aerosmith_tracks = spotifyDataAccessor.getTopTracksForArtist(access_token, "Aerosmith")
-acdc_tracks = spotifyDataAccessor.getTopTracksForArtist(access_token, "AC/DC")
-black_sabbath_tracks = spotifyDataAccessor.getTopTracksForArtist(access_token, "Black Sabbath")
-bon_jovi_tracks = spotifyDataAccessor.getTopTracksForArtist(access_token, "Bon Jovi")
-guns_n_roses_tracks = spotifyDataAccessor.getTopTracksForArtist(access_token, "Guns N' Roses")
-journey_tracks = spotifyDataAccessor.getTopTracksForArtist(access_token, "Journey")
-kiss_tracks = spotifyDataAccessor.getTopTracksForArtist(access_token, "KISS")
-metallica_tracks = spotifyDataAccessor.getTopTracksForArtist(access_token, "Metallica")
-motley_crue_tracks = spotifyDataAccessor.getTopTracksForArtist(access_token, "Mötley Crüe")
-van_halen_tracks = spotifyDataAccessor.getTopTracksForArtist(access_token, "Van Halen")
-
-#################################
-# STEP 2: Insert Into RedisJSON #
-#################################
-
-# Define a key value to use for inserting unique key values into the Redis database
-key_index = 0
-
-# Store the top 10 tracks for each artist
-key_index = redisDataAccessor.storeTracks(key_index, aerosmith_tracks)
-key_index = redisDataAccessor.storeTracks(key_index, acdc_tracks)
-key_index = redisDataAccessor.storeTracks(key_index, black_sabbath_tracks)
-key_index = redisDataAccessor.storeTracks(key_index, bon_jovi_tracks)
-key_index = redisDataAccessor.storeTracks(key_index, guns_n_roses_tracks)
-key_index = redisDataAccessor.storeTracks(key_index, journey_tracks)
-key_index = redisDataAccessor.storeTracks(key_index, kiss_tracks)
-key_index = redisDataAccessor.storeTracks(key_index, metallica_tracks)
-key_index = redisDataAccessor.storeTracks(key_index, motley_crue_tracks)
-key_index = redisDataAccessor.storeTracks(key_index, van_halen_tracks)
-
-############################
-# STEP 3: Perform Analysis #
-############################
-
-# Populate a Pandas dataframe with all of the items in the Redis database
-track_dataframe = redisDataAccessor.populateDataFrame()
-
-#######################################
-# ANALYSIS 1: Duration VS. Popularity #
-#######################################
-
-# Copy into a new dataframe with duration and popularity
-duration_dataframe = track_dataframe[["Duration (ms)", "Popularity"]].copy()
-
-# Plot a line graph for duration vs. popularity to see if track length has a correlation with popularity
-(seaborn_objects.Plot(data = duration_dataframe, x = "Popularity", y = "Duration (ms)")
-                    .add(seaborn_objects.Dot(alpha = 0.5, color = red))
-                    .add(seaborn_objects.Line(color = red, linewidth = 3), seaborn_objects.PolyFit(order = 1))
-                    .label(x = "Popularity (0 - 100)", y = "Duration (ms)")
-                    .theme({**seaborn.axes_style("whitegrid"), "grid.linestyle": ":"})).show()
-
-# This dataset seems to show that tracks around the 250,000 ms duration (about 4 minutes) tend to be more popular
-
-################################################
-# ANALYSIS 2: Explicit Language VS. Popularity #
-################################################
-
-# Copy into a new dataframe with explicit language and popularity
-explicit_dataframe = track_dataframe[["Explicit", "Popularity"]].copy()
-
-# Plot a line graph for explicit vs. popularity to see if explicit language has a correlation with popularity
-(seaborn_objects.Plot(data = explicit_dataframe, x = "Popularity", y = "Explicit")
-                    .add(seaborn_objects.Dot(alpha = 0.5, color = red))
-                    .add(seaborn_objects.Line(color = red, linewidth = 3), seaborn_objects.PolyFit(order = 1))
-                    .label(x = "Popularity (0 - 100)", y = "Explicit (true / false)")
-                    .theme({**seaborn.axes_style("whitegrid"), "grid.linestyle": ":"})).show()
-
-# This dataset seems to show that tracks without explicit language tend to be more popular
-
-#####################################
-# ANALYSIS 3: Artist VS. Popularity #
-#####################################
-
-# Copy into a new dataframe with artist names and popularity
-artist_dataframe = track_dataframe[["Artist Name", "Popularity"]].copy()
-
-# Plot a dot plot graph to see which artist has higher popularity
-(seaborn_objects.Plot(data = artist_dataframe, x = 'Artist Name', y = 'Popularity')
-                    .add(seaborn_objects.Dot(alpha = 0.5, color = red))
-                    .label(x = 'Artist Name', y = 'Popularity (0 - 100)')
-                    .theme({**seaborn.axes_style("whitegrid"), "grid.linestyle": ":"})).show()
-
-# This dataset seems to show that for the 10 selected artists:
-#     - Black Sabbath and KISS generally had the lowest popularity
-#     - AC/DC, Guns N' Roses, and Bon Jovi generally had the highest popularity
+# Needed for reading the subcommand and its options from the command line
+import argparse
+
+# Needed for writing fetched tracks to a file
+import json
+
+# Needed for fetching a catalog in chunks
+from itertools import islice
+
+# Define the default artist catalog file
+DEFAULT_ARTISTS_FILE = "artists.txt"
+
+def createSpotifyAccessor():
+
+    """
+    FUNCTION ABSTRACT: createSpotifyAccessor()
+
+    DESCRIPTION: This function creates the SpotifyDataAccessor, using the API keys from the .env file (artist IDs and top tracks are cached in Redis between runs).
+
+    ARGS: None
+
+    RETURNS: spotifyDataAccessor - the SpotifyDataAccessor
+    """
+
+    # Load in the .env file and set up API key variables for use in the SpotifyDataAccessor class
+    load_dotenv()
+    client_id = os.getenv("CLIENT_ID")
+    client_secret = os.getenv("CLIENT_SECRET")
+
+    return SpotifyDataAccessor(client_id, client_secret, artist_id_cache = ArtistIdCache(), response_cache = ResponseCache())
+
+def getArtistNames(arguments):
+
+    """
+    FUNCTION ABSTRACT: getArtistNames()
+
+    DESCRIPTION: This function returns the artists to retrieve top tracks for, from the Redis set given by --artists-key or else the file given by --artists-file.
+
+    ARGS: arguments - the parsed command line options
+
+    RETURNS: artist_names - generator of artist names (or of Spotify artist IDs, with --by-id)
+    """
+
+    artistCatalog = ArtistCatalog()
+
+    if (arguments.artists_key != None):
+
+        return artistCatalog.readRedisSet(arguments.artists_key)
+
+    return artistCatalog.readFile(arguments.artists_file)
+
+def runFetch(arguments):
+
+    """
+    FUNCTION ABSTRACT: runFetch()
+
+    DESCRIPTION: This function fetches the top tracks of every artist without storing them in Redis, optionally writing them to a JSON Lines file.
+
+    ARGS: arguments - the parsed command line options
+
+    RETURNS: None
+    """
+
+    spotifyDataAccessor = createSpotifyAccessor()
+
+    # Define counters for the number of fetched artists and tracks
+    artist_count = 0
+    track_count = 0
+
+    artist_names = getArtistNames(arguments)
+    output_file = open(arguments.output, "w", encoding = "utf-8") if arguments.output != None else None
+
+    try:
+
+        # Fetch the catalog a chunk at a time, so that only one chunk of tracks is held in memory
+        while True:
+
+            chunk = list(islice(artist_names, arguments.chunk_size))
+
+            if (len(chunk) == 0):
+
+                break
+
+            with metrics.timer("stage_seconds", {"stage": "fetch"}):
+
+                tracks_by_artist = spotifyDataAccessor.getTopTracksForArtists(chunk, arguments.fetch_workers, arguments.by_id)
+
+            for artist_name, tracks in tracks_by_artist.items():
+
+                if (tracks == None):
+
+                    continue
+
+                artist_count = artist_count + 1
+                track_count = track_count + len(tracks)
+
+                # Write one line per artist
+                if (output_file != None):
+
+                    output_file.write(json.dumps({"artist": artist_name, "tracks": tracks}) + "\n")
+
+    finally:
+
+        if (output_file != None):
+
+            output_file.close()
+
+        spotifyDataAccessor.close()
+
+    # Output how many tracks were fetched, how many requests were throttled, and how often the caches saved a request
+    print(f"Fetched {track_count} tracks for {artist_count} artists")
+    print(f"Spotify requests: {spotifyDataAccessor.getRequestStatistics()}")
+    print(f"Spotify caches: {spotifyDataAccessor.getCacheStatistics()}")
+
+def runIngest(arguments):
+
+    """
+    FUNCTION ABSTRACT: runIngest()
+
+    DESCRIPTION: This function streams the top tracks of every artist from the Spotify API into RedisJSON.
+
+    ARGS: arguments - the parsed command line options
+
+    RETURNS: None
+    """
+
+    spotifyDataAccessor = createSpotifyAccessor()
+
+    # Initialize a RedisDataAccessor object, used to store and retrieve data from Redis
+    redisDataAccessor = RedisDataAccessor()
+
+    # Initialize an IngestPipeline object, used to fetch from Spotify and write to Redis at the same time
+    ingestPipeline = IngestPipeline(spotifyDataAccessor, redisDataAccessor, arguments.fetch_workers, arguments.write_workers)
+
+    # Fetch the top 10 tracks for every artist and upsert them into Redis (only new or changed tracks are rewritten)
+    with metrics.timer("stage_seconds", {"stage": "ingest"}):
+
+        ingest_statistics = ingestPipeline.run(getArtistNames(arguments), arguments.by_id)
+
+    spotifyDataAccessor.close()
+
+    # Output the throughput of each stage, how many requests were throttled, and how often the caches saved a request
+    print(f"Fetch stage: {ingest_statistics['fetch']}")
+    print(f"Write stage: {ingest_statistics['write']}")
+    print(f"Spotify requests: {spotifyDataAccessor.getRequestStatistics()}")
+    print(f"Spotify caches: {spotifyDataAccessor.getCacheStatistics()}")
+
+def runAnalysis(redisDataAccessor):
+
+    """
+    FUNCTION ABSTRACT: runAnalysis()
+
+    DESCRIPTION: This function loads the stored tracks into a dataframe, runs all three analyses on it and outputs their results.
+
+    ARGS: redisDataAccessor - the RedisDataAccessor to load the tracks from
+
+    RETURNS:
+        track_dataframe - the track dataframe
+        analysis_results - TrackAnalysisResults for the dataframe
+    """
+
+    # Needed only for analyzing (imported here, so that ingest-only runs never load pandas)
+    from SnapshotCache import SnapshotCache
+    from TrackAnalysis import TrackAnalyzer
+
+    # Populate a Pandas dataframe with all of the items in the Redis database (from the local snapshot when nothing was ingested since it was taken)
+    with metrics.timer("stage_seconds", {"stage": "load"}):
+
+        track_dataframe = SnapshotCache(redisDataAccessor).load()
+
+    # Run all three analyses in one vectorized pass over the dataframe
+    with metrics.timer("stage_seconds", {"stage": "analysis"}):
+
+        analysis_results = TrackAnalyzer().analyze(track_dataframe)
+
+    # ANALYSIS 1: Output the line fitted to duration vs. popularity to see if track length has a correlation with popularity
+    print(f"Duration vs. popularity: slope = {analysis_results.duration.fit.slope} ms per point, r = {analysis_results.duration.fit.r}")
+
+    # This dataset seems to show that tracks around the 250,000 ms duration (about 4 minutes) tend to be more popular
+
+    # ANALYSIS 2: Output the average popularity of explicit and clean tracks to see if explicit language has a correlation with popularity
+    print(f"Explicit tracks: {analysis_results.explicit.explicit_count} tracks, {analysis_results.explicit.explicit_mean} average popularity")
+    print(f"Clean tracks: {analysis_results.explicit.clean_count} tracks, {analysis_results.explicit.clean_mean} average popularity")
+
+    # This dataset seems to show that tracks without explicit language tend to be more popular
+
+    # ANALYSIS 3: Output the per-artist popularity aggregated server-side by the RediSearch index
+    for row in redisDataAccessor.getPopularityByArtist():
+
+        print(f"{row['artist']}: {row['average_popularity']:.1f} average popularity over {int(row['track_count'])} tracks")
+
+    # This dataset seems to show that for the 10 selected artists:
+    #     - Black Sabbath and KISS generally had the lowest popularity
+    #     - AC/DC, Guns N' Roses, and Bon Jovi generally had the highest popularity
+
+    return track_dataframe, analysis_results
+
+def runAnalyze(arguments):
+
+    """
+    FUNCTION ABSTRACT: runAnalyze()
+
+    DESCRIPTION: This function runs the analyses on the stored tracks, and displays each plot one after the other unless --no-plots is given.
+
+    ARGS: arguments - the parsed command line options
+
+    RETURNS: None
+    """
+
+    track_dataframe, analysis_results = runAnalysis(RedisDataAccessor())
+
+    if (arguments.no_plots == True):
+
+        return
+
+    # Needed only for displaying plots (imported here, so that runs without plots never load seaborn)
+    from TrackPlotter import TrackPlotter
+
+    # Display duration vs. popularity, explicit vs. popularity and artist vs. popularity
+    with metrics.timer("stage_seconds", {"stage": "plot"}):
+
+        TrackPlotter(track_dataframe, analysis_results).showAll()
+
+def runRender(arguments):
+
+    """
+    FUNCTION ABSTRACT: runRender()
+
+    DESCRIPTION: This function runs the analyses on the stored tracks and renders every chart to files, in parallel across processes (no display needed).
+
+    ARGS: arguments - the parsed command line options
+
+    RETURNS: None
+    """
+
+    track_dataframe, analysis_results = runAnalysis(RedisDataAccessor())
+
+    # Needed only for rendering (imported here, so that runs without charts never load matplotlib)
+    from ChartRenderer import ChartRenderer
+
+    # Render every chart (plus one popularity distribution per artist, unless --no-artist-charts is given)
+    with metrics.timer("stage_seconds", {"stage": "render"}):
+
+        chartRenderer = ChartRenderer(track_dataframe, analysis_results, arguments.output_dir, tuple(arguments.formats.split(",")), arguments.processes)
+
+        written_paths, render_errors = chartRenderer.render(include_artists = not arguments.no_artist_charts)
+
+    print(f"Rendered {len(written_paths)} chart files to {arguments.output_dir} ({len(render_errors)} charts failed)")
+
+def runImportArtists(arguments):
+
+    """
+    FUNCTION ABSTRACT: runImportArtists()
+
+    DESCRIPTION: This function copies the artist names from --artists-file into the Redis set named by the key argument, for later use with --artists-key.
+
+    ARGS: arguments - the parsed command line options
+
+    RETURNS: None
+    """
+
+    artistCatalog = ArtistCatalog()
+
+    added_count = artistCatalog.storeRedisSet(arguments.key, artistCatalog.readFile(arguments.artists_file))
+
+    print(f"Added {added_count} new artists to {arguments.key}")
+
+def runAll(arguments):
+
+    """
+    FUNCTION ABSTRACT: runAll()
+
+    DESCRIPTION:
+        This function runs the whole program when no subcommand is given: ingest, then analyze. The plots are
+        displayed, or rendered to files when the CHART_OUTPUT_DIR environment variable is set (e.g. on hosts
+        without a display).
+
+    ARGS: arguments - the parsed command line options
+
+    RETURNS: None
+    """
+
+    runIngest(arguments)
+
+    # When CHART_OUTPUT_DIR is set, render the charts there instead of displaying them
+    if (os.getenv("CHART_OUTPUT_DIR") != None):
+
+        arguments.output_dir = os.getenv("CHART_OUTPUT_DIR")
+        arguments.formats = os.getenv("CHART_FORMATS", "png")
+
+        runRender(arguments)
+
+        return
+
+    runAnalyze(arguments)
+
+def createOptionParsers(subcommand = False):
+
+    """
+    FUNCTION ABSTRACT: createOptionParsers()
+
+    DESCRIPTION:
+        This function defines the options shared by the top-level command and its subcommands. Options of a subcommand
+        that are not given are left out instead of set to their default, so that an option given before the subcommand
+        (e.g. main.py --artists-file big.txt ingest) is not overwritten by the subcommand's default.
+
+    ARGS: subcommand - flag for whether the options are added to a subcommand (True = leave out options that are not given)
+
+    RETURNS:
+        common_parser - options shared by every subcommand
+        artist_file_parser - option of the subcommands that read an artist file
+        catalog_parser - options of the subcommands that fetch the artist catalog
+        write_parser - options of the subcommands that write to Redis
+    """
+
+    # Define the default of every shared option
+    defaults = {
+        "metrics_output": os.getenv("METRICS_OUTPUT"),
+        "profile": os.getenv("METRICS_PROFILE"),
+        "artists_file": DEFAULT_ARTISTS_FILE,
+        "artists_key": None,
+        "by_id": False,
+        "fetch_workers": 8,
+        "write_workers": 2
+    }
+
+    # For a subcommand, leave options that are not given out of the parsed options
+    if (subcommand == True):
+
+        defaults = {name: argparse.SUPPRESS for name in defaults}
+
+    common_parser = argparse.ArgumentParser(add_help = False)
+    common_parser.add_argument("--metrics-output", default = defaults["metrics_output"],
+                               help = "write per-stage metrics here at exit (.prom for Prometheus text format, JSON otherwise, - for standard output)")
+    common_parser.add_argument("--profile", default = defaults["profile"], help = "write a cProfile dump of the main thread here at exit")
+
+    artist_file_parser = argparse.ArgumentParser(add_help = False)
+    artist_file_parser.add_argument("--artists-file", default = defaults["artists_file"], help = "text file listing one artist name per line")
+
+    catalog_parser = argparse.ArgumentParser(add_help = False)
+    catalog_parser.add_argument("--artists-key", default = defaults["artists_key"], help = "Redis set holding the artist names (used instead of --artists-file)")
+    catalog_parser.add_argument("--by-id", action = "store_true", default = defaults["by_id"],
+                                help = "the catalog lists Spotify artist IDs instead of names (skips the search requests)")
+    catalog_parser.add_argument("--fetch-workers", type = int, default = defaults["fetch_workers"], help = "number of artists fetched at the same time")
+
+    write_parser = argparse.ArgumentParser(add_help = False)
+    write_parser.add_argument("--write-workers", type = int, default = defaults["write_workers"], help = "number of threads writing to Redis")
+
+    return common_parser, artist_file_parser, catalog_parser, write_parser
+
+def createParser():
+
+    """
+    FUNCTION ABSTRACT: createParser()
+
+    DESCRIPTION: This function defines the command line subcommands (fetch, ingest, analyze, render, import-artists) and their options.
+
+    ARGS: None
+
+    RETURNS: parser - the command line parser
+    """
+
+    # Define the shared options of the top-level command (with their defaults) and of the subcommands (without them)
+    common_parser, artist_file_parser, catalog_parser, write_parser = createOptionParsers()
+    common_options, artist_file_options, catalog_options, write_options = createOptionParsers(subcommand = True)
+
+    # Define the options of the subcommand that renders charts
+    render_parser = argparse.ArgumentParser(add_help = False)
+    render_parser.add_argument("--output-dir", default = os.getenv("CHART_OUTPUT_DIR", "charts"), help = "directory the chart files are written to")
+    render_parser.add_argument("--formats", default = os.getenv("CHART_FORMATS", "png"), help = "comma-separated file formats (e.g. png,svg)")
+    render_parser.add_argument("--processes", type = int, default = None, help = "number of rendering processes (defaults to one per CPU)")
+    render_parser.add_argument("--no-artist-charts", action = "store_true", help = "skip the per-artist popularity distribution charts")
+
+    parser = argparse.ArgumentParser(description = "Ingest artists' top tracks from the Spotify API into Redis and analyze their popularity.",
+                                     parents = [common_parser, artist_file_parser, catalog_parser, write_parser])
+    parser.set_defaults(function = runAll, no_plots = False, processes = None, no_artist_charts = False)
+
+    subparsers = parser.add_subparsers(title = "subcommands")
+
+    fetch_parser = subparsers.add_parser("fetch", parents = [common_options, artist_file_options, catalog_options], help = "fetch top tracks without storing them")
+    fetch_parser.add_argument("--output", help = "JSON Lines file to write the fetched tracks to (one artist per line)")
+    fetch_parser.add_argument("--chunk-size", type = int, default = 1000, help = "number of artists fetched (and held in memory) at a time")
+    fetch_parser.set_defaults(function = runFetch)
+
+    ingest_parser = subparsers.add_parser("ingest", parents = [common_options, artist_file_options, catalog_options, write_options],
+                                          help = "stream top tracks into Redis")
+    ingest_parser.set_defaults(function = runIngest)
+
+    analyze_parser = subparsers.add_parser("analyze", parents = [common_options], help = "analyze the stored tracks and display the plots")
+    analyze_parser.add_argument("--no-plots", action = "store_true", help = "only output the analysis results")
+    analyze_parser.set_defaults(function = runAnalyze)
+
+    render_subparser = subparsers.add_parser("render", parents = [common_options, render_parser], help = "analyze the stored tracks and render the charts to files")
+    render_subparser.set_defaults(function = runRender)
+
+    import_parser = subparsers.add_parser("import-artists", parents = [common_options, artist_file_options], help = "copy an artist file into a Redis set")
+    import_parser.add_argument("key", help = "Redis set to add the artist names to")
+    import_parser.set_defaults(function = runImportArtists)
+
+    return parser
+
+if __name__ == "__main__":
+
+    arguments = createParser().parse_args()
+
+    # Record per-stage timings, request / byte counts, Redis round trips and cache hit rates, if requested
+    if ((arguments.metrics_output != None) or (arguments.profile != None)):
+
+        metrics.enable(arguments.metrics_output, profile_path = arguments.profile)
+
+    # Run the chosen subcommand (the whole program when none is given)
+    arguments.function(arguments)